@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Online database backups.
+
+Backups use SQLite's online backup API, copying BACKUP_PAGES_PER_STEP pages
+at a time with a short pause in between, so writers keep going while a
+backup runs and a consistent snapshot is still produced even in WAL mode.
+Each copy is verified with PRAGMA integrity_check, gzip-compressed and then
+rotated: the newest BACKUP_KEEP_LAST are kept, plus the newest backup of
+each of the last BACKUP_KEEP_HOURLY hours and BACKUP_KEEP_DAILY days.
+
+    python backup.py [db_path] [--dir DIR] [--no-compress]
+"""
+import argparse
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional, Set, Tuple, Union
+
+from config import (
+    DATABASE_NAME, BACKUP_DIR, BACKUP_PAGES_PER_STEP, BACKUP_STEP_PAUSE, BACKUP_MAX_RESTARTS,
+    BACKUP_KEEP_LAST, BACKUP_KEEP_HOURLY, BACKUP_KEEP_DAILY
+)
+
+# Microseconds keep backups taken in the same second (say a scheduled CLI
+# run and one from the menu) from replacing each other
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S_%f"
+LEGACY_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+BACKUP_NAME = re.compile(r'^(?P<stem>.+)_backup_(?P<time>\d{8}_\d{6}(?:_\d{6})?)\.db(\.gz)?$')
+
+SQLITE_HEADER = b'SQLite format 3\x00'
+
+
+def is_sqlite_file(path: str) -> bool:
+    """Whether a file starts with the SQLite database header"""
+    try:
+        with open(path, 'rb') as file:
+            return file.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    except OSError:
+        return False
+
+
+class _BackupRestarting(Exception):
+    """Raised from the progress callback to stop an incremental backup that keeps restarting"""
+
+
+def copy_database(source: Union[str, sqlite3.Connection], dest_path: str,
+                  pages_per_step: int = BACKUP_PAGES_PER_STEP, pause: float = BACKUP_STEP_PAUSE,
+                  progress: Optional[Callable[[int, int], None]] = None):
+    """
+    Copy a live database (a path, or an open connection to back up through)
+    with the online backup API and verify the copy. Raises
+    sqlite3.DatabaseError if the copy fails its integrity check.
+    
+    SQLite restarts an incremental backup whenever another connection writes
+    to the source; writes through the source connection itself don't. After
+    BACKUP_MAX_RESTARTS restarts the copy is finished in a single step, which
+    in WAL mode still doesn't block writers.
+    """
+    restarts = 0
+    last_remaining = None
+    
+    def step(status, remaining, total):
+        nonlocal restarts, last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > BACKUP_MAX_RESTARTS:
+                raise _BackupRestarting()
+        last_remaining = remaining
+        if progress:
+            progress(total - remaining, total)
+        # Leave the source alone for a moment so writers aren't starved
+        if remaining and pause:
+            time.sleep(pause)
+
+    own_source = isinstance(source, str)
+    source_conn = sqlite3.connect(source) if own_source else source
+    dest = sqlite3.connect(dest_path)
+    try:
+        try:
+            source_conn.backup(dest, pages=pages_per_step, progress=step)
+        except _BackupRestarting:
+            source_conn.backup(dest, pages=-1)
+        result = dest.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != 'ok':
+            raise sqlite3.DatabaseError(f"Backup failed integrity check: {result}")
+    finally:
+        dest.close()
+        if own_source:
+            source_conn.close()
+
+
+def _compress(path: str) -> str:
+    compressed_path = path + '.gz'
+    with open(path, 'rb') as raw, gzip.open(compressed_path + '.tmp', 'wb', compresslevel=6) as packed:
+        shutil.copyfileobj(raw, packed, 1024 * 1024)
+    os.replace(compressed_path + '.tmp', compressed_path)
+    os.remove(path)
+    return compressed_path
+
+
+def list_backups(backup_dir: str, stem: str) -> List[Tuple[datetime, str]]:
+    """Backups of the database named `stem` in `backup_dir`, newest first"""
+    backups = []
+    try:
+        names = os.listdir(backup_dir)
+    except OSError:
+        return backups
+    for name in names:
+        match = BACKUP_NAME.match(name)
+        if match and match.group('stem') == stem:
+            time_format = TIMESTAMP_FORMAT if match.group('time').count('_') == 2 else LEGACY_TIMESTAMP_FORMAT
+            taken = datetime.strptime(match.group('time'), time_format)
+            backups.append((taken, os.path.join(backup_dir, name)))
+    return sorted(backups, reverse=True)
+
+
+def backups_to_keep(backups: Iterable[Tuple[datetime, str]], keep_last: int = BACKUP_KEEP_LAST,
+                    keep_hourly: int = BACKUP_KEEP_HOURLY, keep_daily: int = BACKUP_KEEP_DAILY) -> Set[str]:
+    """
+    Apply the rotation policy to (time, path) pairs sorted newest first:
+    keep the `keep_last` newest, and the newest of each of the most recent
+    `keep_hourly` hours and `keep_daily` days that have a backup.
+    """
+    keep = set()
+    hours, days = set(), set()
+    for index, (taken, path) in enumerate(backups):
+        if index < keep_last:
+            keep.add(path)
+
+        hour = taken.strftime('%Y%m%d%H')
+        if hour not in hours and len(hours) < keep_hourly:
+            hours.add(hour)
+            keep.add(path)
+
+        day = taken.strftime('%Y%m%d')
+        if day not in days and len(days) < keep_daily:
+            days.add(day)
+            keep.add(path)
+    return keep
+
+
+def rotate_backups(backup_dir: str, stem: str) -> List[str]:
+    """Delete backups the rotation policy no longer keeps; returns their paths"""
+    backups = list_backups(backup_dir, stem)
+    keep = backups_to_keep(backups)
+    removed = []
+    for _, path in backups:
+        if path not in keep:
+            try:
+                os.remove(path)
+                removed.append(path)
+            except OSError as e:
+                print(f"⚠️  Could not remove old backup {path}: {e}")
+    return removed
+
+
+def create_backup(db_path: str = DATABASE_NAME, backup_dir: str = BACKUP_DIR, compress: bool = True,
+                  rotate: bool = True, progress: Optional[Callable[[int, int], None]] = None,
+                  source: Optional[sqlite3.Connection] = None) -> str:
+    """
+    Take a verified, optionally compressed backup of `db_path` and rotate
+    old ones; returns its path. Pass the application's open connection as
+    `source` so its own writes don't restart the backup.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    backup_path = os.path.join(backup_dir, f"{stem}_backup_{datetime.now().strftime(TIMESTAMP_FORMAT)}.db")
+
+    temp_path = backup_path + '.tmp'
+    try:
+        copy_database(source or db_path, temp_path, progress=progress)
+        os.replace(temp_path, backup_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    if compress:
+        backup_path = _compress(backup_path)
+    if rotate:
+        rotate_backups(backup_dir, stem)
+    return backup_path
+
+
+def start_backup(db_path: str = DATABASE_NAME, backup_dir: str = BACKUP_DIR,
+                 on_done: Optional[Callable[[Optional[str], Optional[Exception]], None]] = None,
+                 source: Optional[sqlite3.Connection] = None) -> threading.Thread:
+    """
+    Run create_backup() on a background thread and return the thread.
+    `on_done(path, error)` is called from that thread when it finishes.
+    """
+    def run():
+        try:
+            path = create_backup(db_path, backup_dir, source=source)
+        except Exception as e:
+            if on_done:
+                on_done(None, e)
+            return
+        if on_done:
+            on_done(path, None)
+
+    # Not a daemon: exiting the program waits for a running backup to finish
+    thread = threading.Thread(target=run, name='database-backup')
+    thread.start()
+    return thread
+
+
+def main(argv: List[str]) -> int:
+    """Command line entry point: backup.py [db_path] [options]"""
+    parser = argparse.ArgumentParser(description="Take an online backup of the account database")
+    parser.add_argument('db_path', nargs='?', default=DATABASE_NAME)
+    parser.add_argument('--dir', default=BACKUP_DIR, help="backup directory")
+    parser.add_argument('--no-compress', action='store_true', help="keep the backup uncompressed")
+    args = parser.parse_args(argv)
+
+    try:
+        path = create_backup(args.db_path, args.dir, compress=not args.no_compress)
+    except Exception as e:
+        print(f"❌ Backup failed: {e}")
+        return 1
+    print(f"✅ Database backed up to: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: time from launching `python main.py` to the main menu.
+
+Each run starts a fresh interpreter in a scratch directory (so a real
+database isn't touched), waits for the menu to be printed and then exits
+through option 0.
+
+- cold: bytecode caches are empty, so every module is compiled first
+  (the first start after installing or updating)
+- warm: bytecode caches are populated (every later start)
+
+OS file caches are not flushed, so "cold" here means a cold Python, not a
+cold disk. The report also says whether Playwright was imported before the
+menu appeared, which it shouldn't be.
+
+    python benchmarks/bench_startup.py [--runs N] [--json FILE]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MENU_MARKER = b'MAIN MENU'
+
+# Reports the modules loaded once the menu is on screen
+PROBE = (
+    "import sys, runpy\n"
+    "import builtins\n"
+    "def report(prompt=''):\n"
+    "    print('PLAYWRIGHT_LOADED=%s' % ('playwright' in sys.modules), flush=True)\n"
+    "    return '0'\n"
+    "builtins.input = report\n"
+    "path = sys.argv[1]\n"
+    "sys.argv = [path]\n"
+    "runpy.run_path(path, run_name='__main__')\n"
+)
+
+
+def time_to_menu(workdir: str, pycache: str) -> float:
+    """Seconds from process start until the menu is printed"""
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache, PYTHONUNBUFFERED='1', PYTHONPATH=REPO_DIR)
+    # Warm runs need bytecode to be written
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_DIR, 'main.py')], cwd=workdir, env=env,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    )
+    elapsed = None
+    seen = b''
+    for line in process.stdout:
+        seen += line
+        if MENU_MARKER in line:
+            elapsed = time.perf_counter() - started
+            break
+    process.communicate(b'0\n', timeout=30)
+    if elapsed is None:
+        raise RuntimeError(f"Menu never appeared:\n{seen.decode(errors='replace')}")
+    return elapsed
+
+
+def playwright_loaded_at_menu(workdir: str) -> bool:
+    """Whether starting up imported Playwright before the first prompt"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, os.path.join(REPO_DIR, 'main.py')],
+        cwd=workdir, env=dict(os.environ, PYTHONPATH=REPO_DIR), capture_output=True, timeout=60
+    ).stdout.decode(errors='replace')
+    return 'PLAYWRIGHT_LOADED=True' in output
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        'runs': len(samples),
+        'median_ms': round(statistics.median(samples) * 1000, 1),
+        'min_ms': round(min(samples) * 1000, 1),
+        'max_ms': round(max(samples) * 1000, 1)
+    }
+
+
+def run(runs: int) -> Dict[str, object]:
+    workdir = tempfile.mkdtemp(prefix='bench_startup_')
+    try:
+        cold = []
+        for index in range(runs):
+            # A new, empty cache prefix for each cold run
+            cold.append(time_to_menu(workdir, os.path.join(workdir, f'pycache_cold_{index}')))
+
+        warm_cache = os.path.join(workdir, 'pycache_warm')
+        time_to_menu(workdir, warm_cache)  # populate it
+        warm = [time_to_menu(workdir, warm_cache) for _ in range(runs)]
+
+        return {
+            'benchmark': 'startup',
+            'python': sys.version.split()[0],
+            'cold': summarize(cold),
+            'warm': summarize(warm),
+            'playwright_loaded_at_menu': playwright_loaded_at_menu(workdir)
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold and warm time-to-menu")
+    parser.add_argument('--runs', type=int, default=5, help="runs per mode (default: 5)")
+    parser.add_argument('--json', metavar='FILE', help="also write the results to FILE")
+    args = parser.parse_args(argv)
+
+    result = run(max(1, args.runs))
+    for mode in ('cold', 'warm'):
+        stats = result[mode]
+        print(f"{mode:>5}: median {stats['median_ms']} ms "
+              f"(min {stats['min_ms']}, max {stats['max_ms']}, {stats['runs']} runs)")
+    print(f"Playwright imported before the menu: {'yes' if result['playwright_loaded_at_menu'] else 'no'}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(result, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
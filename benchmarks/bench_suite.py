@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: database operations, session validation throughput and
+launch latency, run against synthetic databases and a local stand-in server.
+
+    python benchmarks/bench_suite.py [--sizes 1k,10k] [--validate N] [--concurrency 1,5,10,20]
+                                     [--latency MS] [--jitter MS] [--failure-rate F]
+                                     [--invalid-rate F] [--browser] [--output FILE]
+                                     [--compare OLD.json]
+
+- database: AccountDatabase methods on a copy of each generated database
+  (benchmarks/generate_db.py builds them on first use)
+- validation: validate_account_session one at a time, validate_sessions_concurrently
+  at each concurrency level, and clean_expired_sessions, with every request
+  answered by benchmarks/standin_server.py
+- launch (--browser, needs Playwright's Chromium): restoring a saved session,
+  loading the home page and verifying the login, the steps launch_account
+  takes before handing the window to the user
+
+Results are written as JSON (default benchmarks/results/<time>.json).
+--compare prints the median change of every timing against an earlier run.
+
+Requests that fail on the stand-in (--failure-rate) are ambiguous to the
+HTTP validator, so they exercise the browser fallback; without Chromium
+those checks end as errors. Chromium reaches the stand-in through
+--host-resolver-rules, so pages keep using roblox.com URLs and cookies.
+Users API calls (the HTTP validator and page.request, which Playwright's
+driver sends rather than Chromium) go to the stand-in's own address.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from standin_server import StandInServer  # noqa: E402
+
+# The app's Roblox web host, served by the stand-in over plain HTTP
+WEB_URL = 'http://www.roblox.com'
+
+
+def configure_environment(server: StandInServer):
+    """
+    Point the app at the stand-in. Must run before config is imported,
+    since the URLs are read from the environment at import time.
+    """
+    if 'config' in sys.modules:
+        raise RuntimeError("configure_environment() must run before the app modules are imported")
+    os.environ['ROBLOX_WEB_URL'] = WEB_URL
+    # Requests from Playwright's driver (page.request) and from Python don't
+    # go through Chromium's host mapping, so the users API is addressed directly
+    os.environ['ROBLOX_USERS_API_URL'] = server.url
+
+    import config
+    host, port = server.server_address[:2]
+    config.BROWSER_ARGS.extend([
+        f"--host-resolver-rules=MAP www.roblox.com {host}:{port}",
+        # .ROBLOSECURITY is a Secure cookie; let Chromium send it over plain HTTP here
+        f"--unsafely-treat-insecure-origin-as-secure={WEB_URL},{server.url}",
+    ])
+
+
+def mirror_auth_cookie(manager, server: StandInServer):
+    """
+    Give every restored browser context a copy of the account's auth cookie
+    for the stand-in's address. page.request only sends cookies whose domain
+    matches the request host, and never Secure ones over plain HTTP, so the
+    saved .roblox.com cookie alone wouldn't reach the users API here.
+    """
+    restore = manager._session_context
+
+    @contextlib.asynccontextmanager
+    async def session_context(account, *args, **kwargs):
+        async with restore(account, *args, **kwargs) as context:
+            auth = [c for c in account.get('cookies') or [] if c['name'] == '.ROBLOSECURITY']
+            if auth:
+                await context.add_cookies([{'name': c['name'], 'value': c['value'], 'url': server.url} for c in auth])
+            yield context
+
+    manager._session_context = session_context
+
+
+def timing_stats(samples: List[float]) -> Dict[str, float]:
+    """Summary of durations in seconds, reported in milliseconds"""
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        'runs': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(percentile(50) * 1000, 3),
+        'p95_ms': round(percentile(95) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+        'ops_per_s': round(len(ordered) / sum(ordered), 1) if sum(ordered) else None
+    }
+
+
+def measure(action: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        samples.append(time.perf_counter() - started)
+    return timing_stats(samples)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the app's progress output so it doesn't dominate the timings"""
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def working_copy(source: str, workdir: str) -> str:
+    """Copy a generated database so benchmarks that write leave it untouched"""
+    from backup import copy_database
+
+    path = os.path.join(workdir, os.path.basename(source))
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    copy_database(source, path, pages_per_step=-1, pause=0)
+    return path
+
+
+def bench_database(path: str, rng: random.Random, repeat: int) -> Dict[str, Any]:
+    """Time AccountDatabase reads and batch writes on one database"""
+    from database import AccountDatabase
+    from generate_db import make_account, make_cookies
+
+    results: Dict[str, Any] = {}
+    with AccountDatabase(path) as db, quiet():
+        total = db.get_account_count()['total']
+        summary = [(a['id'], a['username']) for a in db.iter_accounts(['username'])]
+        usernames = [username for _, username in summary]
+        ids = [account_id for account_id, _ in summary]
+        middle_key = db.get_accounts_page(limit=max(1, total // 2))[-1]['page_key']
+
+        point = repeat * 10
+        picks = iter(rng.choices(usernames, k=point * 2))
+        results['get_account'] = measure(lambda: db.get_account(next(picks)), point)
+        results['account_exists'] = measure(lambda: db.account_exists(next(picks)), point)
+        results['get_accounts_page'] = measure(lambda: db.get_accounts_page(), point)
+        results['get_accounts_page_deep'] = measure(lambda: db.get_accounts_page(after=middle_key), point)
+        results['search_accounts'] = measure(lambda: db.search_accounts('star'), repeat)
+        results['get_account_count'] = measure(db.get_account_count, repeat)
+        results['get_cookies_many_500'] = measure(lambda: db.get_cookies_many(rng.sample(ids, min(500, total))), repeat)
+        results['get_accounts_expiring_within_7d'] = measure(
+            lambda: db.get_accounts_expiring_within(7 * 24 * 3600), repeat)
+        results['get_validation_queue_100'] = measure(lambda: db.get_validation_queue(limit=100), repeat)
+        results['get_validation_queue_all'] = measure(db.get_validation_queue, max(1, repeat // 4))
+        results['iter_accounts_scan'] = measure(
+            lambda: sum(1 for _ in db.iter_accounts(['username', 'is_active'])), max(1, repeat // 4))
+
+        # Batch writes of 500 rows; new accounts are removed again at the end
+        now = time.time()
+        new_batches = [[dict(make_account(rng, 10_000_000 + run * 500 + i, now), username=f"bench{run}_{i}")
+                        for i in range(500)] for run in range(repeat)]
+        batches = iter(new_batches)
+        results['add_accounts_500'] = measure(lambda: db.add_accounts(next(batches)), repeat)
+
+        def cookie_updates():
+            return [(u, make_cookies(rng, 1, now), 'bench') for u in rng.sample(usernames, min(500, total))]
+        updates = iter([cookie_updates() for _ in range(repeat)])
+        results['update_cookies_many_500'] = measure(lambda: db.update_cookies_many(next(updates)), repeat)
+
+        results['set_status_many_500'] = measure(
+            lambda: db.set_status_many({u: rng.random() < 0.9 for u in rng.sample(usernames, min(500, total))}),
+            repeat)
+        results['record_validations_500'] = measure(lambda: db.record_validations([
+            {'account_id': i, 'checked_at': time.time(), 'outcome': 'valid', 'method': 'http api',
+             'user_id': None, 'cookie_fingerprint': ''} for i in rng.sample(ids, min(500, total))
+        ]), repeat)
+        results['expire_accounts_locally'] = measure(db.expire_accounts_locally, 1)
+
+        removals = iter([[a['username'] for a in batch] for batch in new_batches])
+        results['remove_accounts_500'] = measure(lambda: db.remove_accounts(next(removals)), repeat)
+
+    results['accounts'] = total
+    results['file_mb'] = round(os.path.getsize(path) / 1024 / 1024, 1)
+    return results
+
+
+async def bench_validation(path: str, server: StandInServer, count: int,
+                           concurrency_levels: List[int]) -> Dict[str, Any]:
+    """Validation throughput against the stand-in server"""
+    from browser_manager import RobloxBrowserManager
+    from config import VALIDATION_CONCURRENCY
+    from database import AccountDatabase
+    from session_validator import HttpSessionValidator
+
+    results: Dict[str, Any] = {}
+    with AccountDatabase(path) as db:
+        usernames = [a['username'] for a, _ in zip(db.iter_accounts(['username'], active_only=True), range(count))]
+        manager = RobloxBrowserManager(db)
+        mirror_auth_cookie(manager, server)
+        # One pooled connection per concurrent check at the highest level
+        manager.http_validator.close()
+        manager.http_validator = HttpSessionValidator(pool_size=max(concurrency_levels))
+        try:
+            with quiet():
+                sequential = usernames[:min(len(usernames), 100)]
+                samples = []
+                for username in sequential:
+                    started = time.perf_counter()
+                    await manager.validate_account_session(username, force=True)
+                    samples.append(time.perf_counter() - started)
+                results['validate_account_session'] = timing_stats(samples)
+
+                for concurrency in concurrency_levels:
+                    started = time.perf_counter()
+                    outcomes = await manager.validate_sessions_concurrently(
+                        usernames, concurrency=concurrency, force=True)
+                    elapsed = time.perf_counter() - started
+                    results[f"validate_sessions_concurrently_c{concurrency}"] = {
+                        'accounts': len(usernames),
+                        'seconds': round(elapsed, 3),
+                        'accounts_per_s': round(len(usernames) / elapsed, 1),
+                        'outcomes': dict(Counter(str(v) for v in outcomes.values()))
+                    }
+
+                # Everything was just checked, so this measures the cache path
+                started = time.perf_counter()
+                await manager.validate_sessions_concurrently(usernames, concurrency=VALIDATION_CONCURRENCY)
+                elapsed = time.perf_counter() - started
+                results['validate_sessions_cached'] = {
+                    'accounts': len(usernames),
+                    'seconds': round(elapsed, 3),
+                    'accounts_per_s': round(len(usernames) / elapsed, 1)
+                }
+
+                started = time.perf_counter()
+                expired = await manager.clean_expired_sessions(force=True, budget=count)
+                elapsed = time.perf_counter() - started
+                results['clean_expired_sessions'] = {
+                    'budget': count,
+                    'seconds': round(elapsed, 3),
+                    'expired': expired
+                }
+        finally:
+            await manager.close()
+
+    results['server_requests'] = dict(server.requests)
+    server.requests.clear()
+    return results
+
+
+async def bench_launch(path: str, server: StandInServer, runs: int) -> Dict[str, Any]:
+    """Session restore, home page load and login verification, headless"""
+    from browser_manager import RobloxBrowserManager
+    from database import AccountDatabase
+
+    phases: Dict[str, List[float]] = {'restore': [], 'navigate': [], 'verify': [], 'total': []}
+    verdicts: Counter = Counter()
+    first_launch = None
+
+    with AccountDatabase(path) as db:
+        usernames = [a['username'] for a, _ in zip(db.iter_accounts(['username']), range(runs + 1))]
+        manager = RobloxBrowserManager(db)
+        mirror_auth_cookie(manager, server)
+        try:
+            with quiet():
+                for index, username in enumerate(usernames):
+                    account = db.get_account(username)
+                    started = time.perf_counter()
+                    async with manager._session_context(account, headless=True,
+                                                        user_agent=account.get('user_agent')) as context:
+                        restored = time.perf_counter()
+                        page = await context.new_page()
+                        await page.goto(manager.roblox_home_url, wait_until='domcontentloaded')
+                        navigated = time.perf_counter()
+                        verdict = await manager._verify_login(page)
+                        finished = time.perf_counter()
+
+                    if index == 0:
+                        # Includes starting Playwright and the browser
+                        first_launch = round((finished - started) * 1000, 1)
+                        continue
+                    phases['restore'].append(restored - started)
+                    phases['navigate'].append(navigated - restored)
+                    phases['verify'].append(finished - navigated)
+                    phases['total'].append(finished - started)
+                    verdicts[verdict.signal.split(' (')[0]] += 1
+        finally:
+            await manager.close()
+
+    results: Dict[str, Any] = {name: timing_stats(samples) for name, samples in phases.items() if samples}
+    results['first_launch_ms'] = first_launch
+    results['verdicts'] = dict(verdicts)
+    return results
+
+
+def flatten(results: Dict[str, Any], prefix: str = '') -> Dict[str, float]:
+    """Every p50_ms (or seconds) value, keyed by its path"""
+    values = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            if 'p50_ms' in value:
+                values[path] = value['p50_ms']
+            elif 'seconds' in value:
+                values[path] = value['seconds'] * 1000
+            else:
+                values.update(flatten(value, path))
+    return values
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]):
+    """Print the change of each timing between two result files"""
+    before, after = flatten(old.get('results', {})), flatten(new.get('results', {}))
+    print(f"\n{'benchmark':<64} {'before':>10} {'after':>10} {'change':>8}")
+    for key in sorted(before.keys() & after.keys()):
+        change = (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+        print(f"{key:<64} {before[key]:>10.2f} {after[key]:>10.2f} {change:>+7.1f}%")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument('--sizes', default='1k,10k', help="database sizes for the database benchmarks")
+    parser.add_argument('--validation-size', default='10k', help="database used for validation and launch")
+    parser.add_argument('--validate', type=int, default=500, metavar='N', help="accounts per validation run")
+    parser.add_argument('--concurrency', default='1,5,10,20', help="concurrency levels to compare")
+    parser.add_argument('--repeat', type=int, default=20, help="repetitions of each database benchmark")
+    parser.add_argument('--latency', type=float, default=50, metavar='MS', help="stand-in response latency")
+    parser.add_argument('--jitter', type=float, default=20, metavar='MS')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="fraction of stand-in requests failing with 503")
+    parser.add_argument('--invalid-rate', type=float, default=0.1, help="fraction of sessions the stand-in rejects")
+    parser.add_argument('--browser', action='store_true', help="also benchmark launch latency (needs Chromium)")
+    parser.add_argument('--launch-runs', type=int, default=10)
+    parser.add_argument('--data-dir', default=os.path.join(BENCH_DIR, 'data'))
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="result file (default: benchmarks/results/<time>.json)")
+    parser.add_argument('--compare', metavar='OLD', help="compare the results with an earlier result file")
+    parser.add_argument('--skip', default='', help="comma-separated parts to skip: database,validation")
+    args = parser.parse_args(argv)
+
+    server = StandInServer(latency=args.latency / 1000, jitter=args.jitter / 1000, failure_rate=args.failure_rate,
+                           invalid_rate=args.invalid_rate, seed=args.seed)
+    configure_environment(server)
+    server.start()
+
+    from generate_db import ensure_database
+    from log import setup_logging
+    import metrics
+
+    # The app's log messages would only add terminal writes to the timings
+    setup_logging(console=False)
+
+    skip = {part.strip() for part in args.skip.split(',') if part.strip()}
+    rng = random.Random(args.seed)
+    results: Dict[str, Any] = {}
+    workdir = tempfile.mkdtemp(prefix='bench_suite_')
+    try:
+        if 'database' not in skip:
+            results['database'] = {}
+            for size in args.sizes.split(','):
+                source = ensure_database(size, args.data_dir, args.seed)
+                print(f"⏱️  Database benchmarks on {size}...")
+                results['database'][size] = bench_database(working_copy(source, workdir), rng, args.repeat)
+
+        source = ensure_database(args.validation_size, args.data_dir, args.seed)
+        # Per-phase breakdowns from the app's own spans
+        metrics.enable()
+        if 'validation' not in skip:
+            print(f"⏱️  Validation benchmarks ({args.validate} accounts, {args.latency:g}ms latency)...")
+            levels = [int(level) for level in args.concurrency.split(',')]
+            metrics.reset()
+            results['validation'] = asyncio.run(
+                bench_validation(working_copy(source, workdir), server, args.validate, levels))
+            results['validation']['phases'] = metrics.snapshot()
+
+        if args.browser:
+            print(f"⏱️  Launch benchmarks ({args.launch_runs} launches)...")
+            metrics.reset()
+            try:
+                results['launch'] = asyncio.run(bench_launch(working_copy(source, workdir), server, args.launch_runs))
+                results['launch']['phases'] = metrics.snapshot()
+            except Exception as e:
+                print(f"⚠️  Launch benchmarks skipped: {e}")
+                results['launch'] = {'skipped': str(e)}
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'revision': git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'args': vars(args)
+        },
+        'results': results
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime('%Y%m%d_%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"✅ Results written to {output}")
+
+    for key, value in sorted(flatten(results).items()):
+        print(f"  {key:<64} {value:>10.2f} ms")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            compare(json.load(file), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
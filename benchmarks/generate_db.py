@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Build synthetic account databases for benchmarking.
+
+Each database is created through AccountDatabase, so it has the current
+schema and normalized cookies, and is filled with realistic accounts: a
+full-length .ROBLOSECURITY cookie plus the tracking cookies Roblox sets,
+varied user agents and display names, about 10% inactive accounts, auth
+cookies expiring anywhere from a few days ago to a year out, earlier
+validation results for about half of the accounts and saved browser storage
+for some. The same seed always produces the same database.
+
+    python benchmarks/generate_db.py [--sizes 1k,10k,100k] [--out-dir DIR] [--seed N] [--force]
+
+Writes DIR/roblox_accounts_<size>.db (default DIR: benchmarks/data).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from itertools import islice
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cookie_utils import normalize_cookies  # noqa: E402
+from database import AccountDatabase, cookie_fingerprint  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DEFAULT_SIZES = ('1k', '10k', '100k')
+BATCH_SIZE = 1000
+STORAGE_STATE_ACCOUNTS = 1000  # accounts given saved browser storage (enough for launch benchmarks)
+
+ROBLOSECURITY_PREFIX = ('_|WARNING:-DO-NOT-SHARE-THIS.--Sharing-this-will-allow-someone-to-log-in-as-you-'
+                        'and-to-steal-your-ROBUX-and-items.|_')
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0',
+]
+
+NAME_PARTS = ['shadow', 'pixel', 'blox', 'ninja', 'star', 'dragon', 'noob', 'pro', 'cool', 'epic', 'super',
+              'dark', 'light', 'fire', 'ice', 'storm', 'builder', 'gamer', 'speedy', 'lucky']
+
+DAY = 24 * 3600
+
+
+def parse_size(label: str) -> int:
+    """'10k' -> 10000, '1m' -> 1000000, '500' -> 500"""
+    label = label.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(label[-1:], 1)
+    return int(label.rstrip('km')) * multiplier
+
+
+def make_cookies(rng: random.Random, user_id: int, now: float) -> List[Dict[str, Any]]:
+    """The cookie set of a logged-in Roblox browser session"""
+    auth_expires = now + rng.uniform(-5 * DAY, 365 * DAY)
+    tracker_created = time.strftime('%m/%d/%Y %I:%M:%S %p', time.gmtime(now - rng.uniform(0, 90 * DAY)))
+    return [
+        {
+            'name': '.ROBLOSECURITY',
+            'value': ROBLOSECURITY_PREFIX + '%X' % rng.getrandbits(3200),
+            'domain': '.roblox.com', 'path': '/', 'expires': auth_expires,
+            'httpOnly': True, 'secure': True, 'sameSite': 'None'
+        },
+        {
+            'name': 'RBXEventTrackerV2',
+            'value': f"CreateDate={tracker_created}&rbxid={user_id}&browserid={rng.getrandbits(40)}",
+            'domain': '.roblox.com', 'path': '/', 'expires': now + 365 * DAY,
+            'httpOnly': False, 'secure': True, 'sameSite': 'Lax'
+        },
+        {
+            'name': 'GuestData',
+            'value': f"UserID=-{rng.getrandbits(30)}",
+            'domain': '.roblox.com', 'path': '/', 'expires': now + 365 * DAY,
+            'httpOnly': False, 'secure': True, 'sameSite': 'Lax'
+        },
+        {
+            'name': 'RBXSessionTracker',
+            'value': f"sessionid={uuid.UUID(int=rng.getrandbits(128))}",
+            'domain': '.roblox.com', 'path': '/', 'expires': -1,
+            'httpOnly': False, 'secure': True, 'sameSite': 'Lax'
+        },
+        {
+            'name': 'rbx-ip2',
+            'value': '%x' % rng.getrandbits(64),
+            'domain': '.roblox.com', 'path': '/', 'expires': now + 3600,
+            'httpOnly': False, 'secure': True, 'sameSite': 'Lax'
+        },
+        {
+            'name': 'RBXSource',
+            'value': f"rbx_acquisition_time={tracker_created}&rbx_acquisition_referrer=&rbx_medium=Direct"
+                     f"&rbx_source=&rbx_campaign=&rbx_adgroup=&rbx_keyword=&rbx_matchtype=&rbx_send_info=1",
+            'domain': '.roblox.com', 'path': '/', 'expires': now + 30 * DAY,
+            'httpOnly': False, 'secure': True, 'sameSite': 'Lax'
+        },
+    ]
+
+
+def make_storage_state(rng: random.Random, user_id: int) -> Dict[str, Any]:
+    """Saved localStorage and sessionStorage, as _capture_storage_state records them"""
+    return {
+        'origins': [{
+            'origin': 'https://www.roblox.com',
+            'localStorage': [
+                {'name': 'RobloxLocaleCode', 'value': 'en_us'},
+                {'name': f"Roblox.Chat.{user_id}.Settings", 'value': '{"isChatVisible":false}'},
+                {'name': 'rbx_theme', 'value': rng.choice(['light', 'dark'])},
+            ]
+        }],
+        'session_storage': {'https://www.roblox.com': {'navigationStartTime': str(rng.getrandbits(40))}}
+    }
+
+
+def make_account(rng: random.Random, index: int, now: float) -> Dict[str, Any]:
+    name = rng.choice(NAME_PARTS) + rng.choice(NAME_PARTS).capitalize()
+    user_id = 1_000_000 + index * 7919 % 9_000_000_000
+    return {
+        'username': f"{name}{index}",
+        'display_name': f"{name} {index}" if rng.random() < 0.7 else None,
+        'user_agent': rng.choice(USER_AGENTS),
+        'session_data': {'logged_in': True, 'login_time': now - rng.uniform(0, 180 * DAY)},
+        'cookies': make_cookies(rng, user_id, now)
+    }
+
+
+def generate_database(path: str, count: int, seed: int = 1) -> Dict[str, Any]:
+    """Create `path` with `count` synthetic accounts; returns a short summary"""
+    rng = random.Random(seed)
+    now = time.time()
+    started = time.perf_counter()
+
+    with AccountDatabase(path) as db:
+        for start in range(0, count, BATCH_SIZE):
+            accounts = [make_account(rng, index, now) for index in range(start, min(count, start + BATCH_SIZE))]
+            db.add_accounts(accounts)
+
+            db.set_status_many({a['username']: False for a in accounts if rng.random() < 0.1})
+
+            # Earlier validation results, so the scheduler has history to rank
+            # by. The database is new, so ids follow insertion order.
+            records = []
+            for index, account in enumerate(accounts, start=start + 1):
+                if rng.random() < 0.5:
+                    records.append({
+                        'account_id': index,
+                        'checked_at': now - rng.uniform(0, 6 * 3600),
+                        'outcome': 'valid' if rng.random() < 0.85 else 'invalid',
+                        'method': rng.choice(['http api', 'http api', 'http api', 'home page']),
+                        'user_id': None,
+                        'cookie_fingerprint': cookie_fingerprint(normalize_cookies(account['cookies']))
+                    })
+            db.record_validations(records)
+
+        with_storage = [(a['id'], a['username']) for a in islice(db.iter_accounts(['username']), STORAGE_STATE_ACCOUNTS)]
+        for account_id, username in with_storage:
+            db.update_account(username, storage_state=make_storage_state(rng, account_id))
+
+        counts = db.get_account_count()
+
+    return {
+        'path': path,
+        'accounts': counts['total'],
+        'active': counts['active'],
+        'bytes': os.path.getsize(path),
+        'seconds': round(time.perf_counter() - started, 2)
+    }
+
+
+def database_path(size: str, out_dir: str = DATA_DIR) -> str:
+    return os.path.join(out_dir, f"roblox_accounts_{size.strip().lower()}.db")
+
+
+def ensure_database(size: str, out_dir: str = DATA_DIR, seed: int = 1, force: bool = False) -> str:
+    """Path of the database for `size`, generating it first if needed"""
+    path = database_path(size, out_dir)
+    if force or not os.path.exists(path):
+        os.makedirs(out_dir, exist_ok=True)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        summary = generate_database(path, parse_size(size), seed)
+        print(f"🗄️  Generated {summary['accounts']} accounts in {summary['path']} "
+              f"({summary['bytes'] / 1024 / 1024:.1f} MB, {summary['seconds']}s)")
+    return path
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic account databases")
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES), help="comma-separated, e.g. 1k,10k,100k")
+    parser.add_argument('--out-dir', default=DATA_DIR)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--force', action='store_true', help="regenerate databases that already exist")
+    args = parser.parse_args(argv)
+
+    for size in args.sizes.split(','):
+        print(f"✅ {ensure_database(size, args.out_dir, args.seed, args.force)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
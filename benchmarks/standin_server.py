@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of Roblox the account manager talks to.
+
+    GET /v1/users/authenticated   200 with {id, name, displayName}, or 401
+    GET /home                     logged-in home page, or 302 to /login
+    GET /login                    login page
+    GET /games                    games page
+    GET /                         302 to /home
+
+A session is valid unless its .ROBLOSECURITY value hashes into the
+`invalid_rate` fraction, so the same cookie always gets the same answer and
+user id. Every request waits `latency` seconds (plus up to `jitter`), and a
+`failure_rate` fraction are answered with 503 instead.
+
+    python benchmarks/standin_server.py [--port 8080] [--latency MS] [--jitter MS]
+                                        [--failure-rate F] [--invalid-rate F]
+
+Point the app at it with ROBLOX_USERS_API_URL and ROBLOX_WEB_URL, e.g.
+ROBLOX_USERS_API_URL=http://127.0.0.1:8080 ROBLOX_WEB_URL=http://127.0.0.1:8080.
+Cookies are scoped to .roblox.com, so a browser only sends them here when
+roblox.com hosts are mapped onto the server (see bench_suite.py).
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+AUTH_COOKIE_NAME = '.ROBLOSECURITY'
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Log in to Roblox</title></head>
+<body><form id="login-form" action="/login" method="post">
+<input id="login-username" name="username"><input id="login-password" name="password" type="password">
+<button id="login-button" type="submit">Log In</button>
+</form></body></html>"""
+
+HOME_PAGE = """<!DOCTYPE html>
+<html><head><title>Home - Roblox</title>
+<meta name="user-data" data-userid="{user_id}" data-name="{name}" data-displayname="{name}">
+<script>window.Roblox = {{CurrentUser: {{userId: {user_id}, name: "{name}", displayName: "{name}"}}}};</script>
+</head>
+<body><div class="navbar"><span class="navbar-user" data-testid="navigation-user">{name}</span>
+<span class="robux-display">0</span></div><h1>Home</h1></body></html>"""
+
+GAMES_PAGE = """<!DOCTYPE html>
+<html><head><title>Discover - Roblox</title></head><body><h1>Games</h1></body></html>"""
+
+
+def _fraction(value: str, salt: str) -> float:
+    """Map a string onto [0, 1) deterministically"""
+    digest = hashlib.sha1((salt + value).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real API; the session validator pools connections
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; with Nagle on, every reused
+    # connection would wait ~40 ms for the client's delayed ACK in between
+    disable_nagle_algorithm = True
+    server: "StandInServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _session(self) -> Optional[Tuple[int, str]]:
+        """(user_id, name) for a valid session cookie, otherwise None"""
+        # Split by hand: SimpleCookie gives up on the whole header at the
+        # first value it considers illegal
+        value = None
+        for pair in self.headers.get('Cookie', '').split(';'):
+            name, _, cookie_value = pair.strip().partition('=')
+            if name == AUTH_COOKIE_NAME:
+                value = cookie_value
+        if value is None or len(value) < 30:
+            return None
+        if _fraction(value, 'invalid') < self.server.invalid_rate:
+            return None
+        user_id = 1_000_000 + int(_fraction(value, 'user') * 9_000_000_000)
+        return user_id, f"User{user_id}"
+
+    def _send(self, status: int, body: str = '', content_type: str = 'text/html; charset=utf-8',
+              headers: Optional[Dict[str, str]] = None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+        self.server.count(self.path.split('?')[0], status)
+
+    def _json(self, status: int, payload: Dict):
+        self._send(status, json.dumps(payload), 'application/json')
+
+    def do_GET(self):
+        self.server.delay()
+        if self.server.should_fail():
+            self._send(503, 'Service Unavailable', 'text/plain')
+            return
+
+        path = self.path.split('?')[0].rstrip('/') or '/'
+        if path == '/v1/users/authenticated':
+            session = self._session()
+            if session is None:
+                self._json(401, {'errors': [{'code': 0, 'message': 'Unauthorized'}]})
+            else:
+                user_id, name = session
+                self._json(200, {'id': user_id, 'name': name, 'displayName': name})
+        elif path == '/home':
+            session = self._session()
+            if session is None:
+                self._send(302, headers={'Location': '/login?ReturnUrl=%2Fhome'})
+            else:
+                user_id, name = session
+                self._send(200, HOME_PAGE.format(user_id=user_id, name=name))
+        elif path == '/':
+            self._send(302, headers={'Location': '/home'})
+        elif path == '/login':
+            self._send(200, LOGIN_PAGE)
+        elif path == '/games':
+            self._send(200, GAMES_PAGE)
+        else:
+            self._send(404, 'Not Found', 'text/plain')
+
+    do_HEAD = do_GET
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded stand-in server with configurable latency and failures"""
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, invalid_rate: float = 0.0, seed: Optional[int] = None):
+        super().__init__((host, port), StandInHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.invalid_rate = invalid_rate
+        self.requests: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay(self):
+        if self.latency or self.jitter:
+            with self._lock:
+                extra = self._random.uniform(0, self.jitter)
+            time.sleep(self.latency + extra)
+
+    def should_fail(self) -> bool:
+        if not self.failure_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+    def count(self, path: str, status: int):
+        with self._lock:
+            self.requests[f"{path} {status}"] += 1
+
+    def start(self) -> str:
+        """Serve on a background thread; returns the base URL"""
+        self._thread = threading.Thread(target=self.serve_forever, name='standin-server', daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Roblox endpoints the app uses")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0, metavar='MS', help="added to every response")
+    parser.add_argument('--jitter', type=float, default=0, metavar='MS', help="extra random latency, up to MS")
+    parser.add_argument('--failure-rate', type=float, default=0, help="fraction of requests answered with 503")
+    parser.add_argument('--invalid-rate', type=float, default=0.1, help="fraction of sessions that are expired")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    server = StandInServer(args.host, args.port, args.latency / 1000, args.jitter / 1000,
+                           args.failure_rate, args.invalid_rate, args.seed)
+    print(f"Stand-in Roblox server on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    for key, count in sorted(server.requests.items()):
+        print(f"{count:8d}  {key}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,55 +1,346 @@
+from __future__ import annotations
+
 import asyncio
 import os
 import subprocess
 import time
 import json
-from typing import Dict, List, Optional, Any
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page
-from database import AccountDatabase
+import logging
+from collections import namedtuple
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Any
+from database import AccountDatabase, cookie_fingerprint
+from config import (
+    BROWSER_ARGS, BROWSER_POOL_MAX_CONTEXTS, VALIDATION_CONCURRENCY, VALIDATION_TIMEOUT, ROBLOX_USERS_API_URL,
+    LOGIN_TIMEOUT, LOGIN_VERIFY_BUDGET, VALIDATION_CACHE_TTL, VALIDATION_LEAN_PROFILE,
+    LEAN_BLOCKED_RESOURCE_TYPES, LEAN_ALLOWED_HOSTS, LEAN_VIEWPORT, PAGE_LOAD_TIMEOUT,
+    ROBLOX_WEB_URL, ROBLOX_LOGIN_URL, ROBLOX_HOME_URL, ROBLOX_GAMES_URL
+)
+from session_validator import HttpSessionValidator, AUTHENTICATED_PATH, VALID, INVALID
+from log import get_logger, event
+import log
+import metrics
 
-class RobloxBrowserManager:
+if TYPE_CHECKING:
+    # Playwright itself is imported on first browser launch; it costs more
+    # than the rest of startup put together
+    from playwright.async_api import Browser, BrowserContext, Page, Playwright
+
+logger = get_logger(__name__)
+
+# Outcome of a login check: which signal decided it and how long it took
+LoginVerdict = namedtuple('LoginVerdict', ['logged_in', 'signal', 'elapsed'])
+
+AUTH_COOKIE_NAMES = ['.ROBLOSECURITY', 'ROBLOSECURITY', '_RobloxSecurity', 'RobloxSecurity']
+
+USER_ELEMENT_SELECTORS = [
+    '[data-testid="navigation-user"]',
+    '.navbar-user',
+    '#navigation-user',
+    '[data-testid="avatar-card-username"]',
+    '.menu-user-name',
+    '.header-username',
+    '.nav-robux-amount',
+    '[class*="user"]',
+    '[id*="user"]',
+    '.navbar .navbar-user',
+    '.top-nav-user',
+    '.app-header .user'
+]
+
+LOGGED_IN_SELECTORS = [
+    '.robux-display',
+    '.user-menu',
+    '.notification-blue',
+    '[data-testid="user-avatar"]',
+    '.navbar-robux',
+    '.top-nav .user'
+]
+
+USER_DATA_SCRIPT = """
+    () => {
+        // Check for Roblox user data in global variables
+        if (window.Roblox) {
+            if (window.Roblox.CurrentUser && window.Roblox.CurrentUser.userId) {
+                return {
+                    source: 'Roblox.CurrentUser',
+                    userId: window.Roblox.CurrentUser.userId,
+                    displayName: window.Roblox.CurrentUser.displayName,
+                    username: window.Roblox.CurrentUser.name
+                };
+            }
+            
+            // Check for other user data locations
+            if (window.Roblox.Users && window.Roblox.Users.authenticatedUserId) {
+                return {
+                    source: 'Roblox.Users',
+                    userId: window.Roblox.Users.authenticatedUserId
+                };
+            }
+        }
+        
+        // Check for meta tags with user info
+        const userMeta = document.querySelector('meta[name="user-data"]');
+        if (userMeta) {
+            try {
+                const content = userMeta.getAttribute('data-userid') || userMeta.getAttribute('content');
+                if (content) {
+                    const userData = JSON.parse(content);
+                    return {
+                        source: 'meta[user-data]',
+                        ...userData
+                    };
+                }
+            } catch(e) {}
+        }
+        
+        // Check for user ID in script tags
+        const scripts = document.querySelectorAll('script');
+        for (const script of scripts) {
+            const content = script.textContent || '';
+            const userIdMatch = content.match(/["']?userId["']?\\s*:\\s*(\\d+)/);
+            if (userIdMatch) {
+                return {
+                    source: 'script-userId',
+                    userId: parseInt(userIdMatch[1])
+                };
+            }
+        }
+        
+        return null;
+    }
+"""
+
+# sessionStorage isn't part of Playwright's storage_state, so it is read from
+# the page when a session is saved and written back by an init script
+SESSION_STORAGE_CAPTURE_SCRIPT = """
+    () => {
+        const items = {};
+        for (let i = 0; i < sessionStorage.length; i++) {
+            const key = sessionStorage.key(i);
+            items[key] = sessionStorage.getItem(key);
+        }
+        return [location.origin, items];
+    }
+"""
+
+SESSION_STORAGE_RESTORE_SCRIPT = """
+    (saved) => {
+        const items = saved[location.origin];
+        if (!items) return;
+        for (const [key, value] of Object.entries(items)) {
+            if (sessionStorage.getItem(key) === null) sessionStorage.setItem(key, value);
+        }
+    }
+"""
+
+
+class ValidationMeter:
+    """
+    Traffic and memory used by one validation context: requests that went
+    out and the bytes they moved, requests blocked by the lean profile, and
+    the page's JS heap at the end.
+    """
+    
     def __init__(self):
-        self.db = AccountDatabase()
-        self.roblox_login_url = "https://www.roblox.com/login"
-        self.roblox_home_url = "https://www.roblox.com/"
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+        self.js_heap: Optional[float] = None
+        self._pending = set()
+    
+    def attach(self, context: BrowserContext):
+        context.on('requestfinished', self._on_request_finished)
+    
+    def _on_request_finished(self, request):
+        # request.sizes() is async; track the task so finish() can await it
+        task = asyncio.ensure_future(self._count(request))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+    
+    async def _count(self, request):
+        self.requests += 1
+        try:
+            sizes = await request.sizes()
+            self.bytes += (sizes['requestHeadersSize'] + sizes['requestBodySize'] +
+                           sizes['responseHeadersSize'] + sizes['responseBodySize'])
+        except Exception:
+            pass
+    
+    async def sample_memory(self, context: BrowserContext, page: Page):
+        """Read the page's used JS heap through the Chrome DevTools Protocol"""
+        try:
+            session = await context.new_cdp_session(page)
+            await session.send('Performance.enable')
+            metrics = await session.send('Performance.getMetrics')
+            self.js_heap = next((m['value'] for m in metrics['metrics'] if m['name'] == 'JSHeapUsedSize'), None)
+            await session.detach()
+        except Exception:
+            pass
+    
+    async def finish(self):
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+    
+    def summary(self) -> str:
+        heap = f"{self.js_heap / 1048576:.1f} MB" if self.js_heap is not None else "n/a"
+        return (f"{self.bytes / 1024:.1f} KB in {self.requests} requests "
+                f"({self.blocked} blocked), JS heap {heap}")
+
+
+class BrowserPool:
+    """
+    Keep one headless and one headed Chromium warm and hand out fresh,
+    isolated contexts on top of them
+    """
+    def __init__(self, max_contexts_per_browser: int = BROWSER_POOL_MAX_CONTEXTS):
+        self.max_contexts_per_browser = max_contexts_per_browser
+        self._playwright: Optional[Playwright] = None
+        self._browsers: Dict[bool, Browser] = {}
+        self._served: Dict[bool, int] = {True: 0, False: 0}
+        self._active: Dict[bool, int] = {True: 0, False: 0}
+        self._lock: Optional[asyncio.Lock] = None
+    
+    async def get_browser(self, headless: bool = True) -> Browser:
+        """
+        Return a running browser for the requested mode, launching or
+        replacing it if it crashed or has served enough contexts
+        """
+        if self._lock is None:
+            # Created lazily so the lock binds to the running event loop
+            self._lock = asyncio.Lock()
+        
+        async with self._lock:
+            browser = self._browsers.get(headless)
+            
+            if browser is not None and not browser.is_connected():
+                logger.warning("⚠️  %s browser disconnected, relaunching...", 'Headless' if headless else 'Headed',
+                               extra=event('browser.disconnected', headless=headless))
+                browser = None
+            elif (browser is not None
+                  and self._served[headless] >= self.max_contexts_per_browser
+                  and self._active[headless] == 0):
+                # Recycle long-lived browsers to keep memory usage bounded
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+                browser = None
+            
+            if browser is None:
+                if self._playwright is None:
+                    from playwright.async_api import async_playwright
+                    with metrics.span('browser.playwright_start'):
+                        self._playwright = await async_playwright().start()
+                with metrics.span('browser.launch'):
+                    browser = await self._playwright.chromium.launch(headless=headless, args=BROWSER_ARGS)
+                browser.on("disconnected", lambda b, mode=headless: self._forget(mode, b))
+                self._browsers[headless] = browser
+                self._served[headless] = 0
+            
+            return browser
+    
+    def _forget(self, headless: bool, browser: Browser):
+        """Drop a browser that went away so the next request relaunches it"""
+        if self._browsers.get(headless) is browser:
+            del self._browsers[headless]
+    
+    @asynccontextmanager
+    async def context(self, headless: bool = True, **kwargs) -> AsyncIterator[BrowserContext]:
+        """
+        Open a fresh browser context, closing it again when the block exits
+        """
+        browser = await self.get_browser(headless)
+        try:
+            with metrics.span('browser.new_context'):
+                context = await browser.new_context(**kwargs)
+        except Exception:
+            if browser.is_connected():
+                raise
+            # The browser died between lookup and use, try once more on a new one
+            browser = await self.get_browser(headless)
+            with metrics.span('browser.new_context'):
+                context = await browser.new_context(**kwargs)
+        
+        self._served[headless] += 1
+        self._active[headless] += 1
+        try:
+            yield context
+        finally:
+            self._active[headless] -= 1
+            try:
+                await context.close()
+            except Exception:
+                pass
+    
+    async def start(self, headless: bool = True, headed: bool = False):
+        """Launch browsers ahead of time so the first operation doesn't pay for it"""
+        if headless:
+            await self.get_browser(True)
+        if headed:
+            await self.get_browser(False)
+    
+    async def close(self):
+        """Close all pooled browsers and stop Playwright"""
+        for browser in list(self._browsers.values()):
+            try:
+                await browser.close()
+            except Exception:
+                pass
+        self._browsers.clear()
+        self._served = {True: 0, False: 0}
+        self._active = {True: 0, False: 0}
+        
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+        self._lock = None
+
+class RobloxBrowserManager:
+    def __init__(self, db: Optional[AccountDatabase] = None):
+        self.db = db if db is not None else AccountDatabase()
+        self.pool = BrowserPool()
+        self.http_validator = HttpSessionValidator()
+        self.roblox_login_url = ROBLOX_LOGIN_URL
+        self.roblox_home_url = ROBLOX_HOME_URL
+    
+    async def close(self):
+        """Release the pooled browsers and HTTP connections"""
+        await self.pool.close()
+        self.http_validator.close()
         
     async def login_and_save_session(self, username: str) -> bool:
         """
         Open browser for user to login and save session data
         """
         try:
-            async with async_playwright() as p:
-                # Launch browser with GUI for user interaction
-                browser = await p.chromium.launch(
-                    headless=False,
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-web-security',
-                        '--allow-running-insecure-content'
-                    ]
-                )
-                
-                context = await browser.new_context(
-                    viewport={'width': 1280, 'height': 720},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                )
-                
+            # Headed browser with GUI for user interaction
+            async with self.pool.context(
+                headless=False,
+                viewport={'width': 1280, 'height': 720},
+                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            ) as context:
                 page = await context.new_page()
                 
                 # Navigate to Roblox login page
                 await page.goto(self.roblox_login_url, wait_until='networkidle')
                 
-                print("🌐 Browser opened! Please login to your Roblox account...")
-                print("⏳ Waiting for login completion...")
+                logger.info("🌐 Browser opened! Please login to your Roblox account...", extra=event('login.opened'))
+                logger.info("⏳ Waiting for login completion...")
                 
                 # Wait for user to login and be redirected to home page
                 login_successful = await self._wait_for_login(page)
                 
                 if login_successful:
-                    print("✓ Login detected! Saving session data...")
+                    logger.info("✓ Login detected! Saving session data...",
+                                extra=event('login.detected', username=username))
                     
-                    # Get cookies and other session data
-                    cookies = await context.cookies()
+                    # Get cookies, browser storage and other session data
+                    storage_state = await self._capture_storage_state(context, page)
                     user_agent = await page.evaluate("navigator.userAgent")
                     
                     # Try to get user info from the page
@@ -59,62 +350,94 @@ class RobloxBrowserManager:
                     success = self.db.add_account(
                         username=username,
                         display_name=display_name,
-                        cookies=cookies,
+                        cookies=storage_state['cookies'],
                         user_agent=user_agent,
-                        session_data={'logged_in': True, 'login_time': time.time()}
+                        session_data={'logged_in': True, 'login_time': time.time()},
+                        storage_state=storage_state
                     )
                     
-                    await browser.close()
                     return success
                 else:
-                    print("❌ Login timeout or failed")
-                    await browser.close()
+                    logger.warning("❌ Login timeout or failed", extra=event('login.failed', username=username))
                     return False
                     
         except Exception as e:
-            print(f"❌ Error during login process: {str(e)}")
+            logger.error("❌ Error during login process: %s", e, extra=event('login.error', username=username))
             return False
     
-    async def _wait_for_login(self, page: Page, timeout: int = 300) -> bool:
+    @staticmethod
+    def _is_post_login_url(url: str) -> bool:
+        """Whether a URL is a Roblox page outside the login flow"""
+        return ('roblox.com' in url or url.startswith(ROBLOX_WEB_URL)) and 'login' not in url.lower()
+    
+    @staticmethod
+    def _has_auth_cookie(cookies: List[Dict]) -> bool:
+        """Whether the cookie list holds a plausible .ROBLOSECURITY cookie"""
+        return any(c['name'] == '.ROBLOSECURITY' and len(c.get('value', '')) > 50 for c in cookies)
+    
+    @metrics.timed('login.wait')
+    async def _wait_for_login(self, page: Page, timeout: int = LOGIN_TIMEOUT) -> bool:
         """
-        Wait for user to complete login process
+        Wait for user to complete login process. Resolves as soon as a
+        navigation leaves the login page with the auth cookie set, the
+        authenticated-user API returns a user, or a response sets the
+        .ROBLOSECURITY cookie. Returns False on timeout or if the page closes.
         """
-        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        done: asyncio.Future = loop.create_future()
         
-        while time.time() - start_time < timeout:
+        def finish(signal: Optional[str]):
+            if not done.done():
+                done.set_result(signal)
+        
+        async def check_cookie(signal: str):
             try:
-                current_url = page.url
-                
-                # Check if we're on the home page (indicates successful login)
-                if 'roblox.com' in current_url and 'login' not in current_url:
-                    # Additional check: look for elements that indicate logged-in state
-                    try:
-                        # Look for user navigation elements
-                        nav_user = await page.wait_for_selector(
-                            '[data-testid="navigation-user"], .navbar-user, #navigation-user', 
-                            timeout=3000
-                        )
-                        if nav_user:
-                            await asyncio.sleep(2)  # Give time for page to fully load
-                            return True
-                    except:
-                        pass
-                
-                # Check for authentication cookies
-                cookies = await page.context.cookies()
-                auth_cookies = [c for c in cookies if c['name'] in ['.ROBLOSECURITY', 'RBXSessionTracker']]
-                if auth_cookies and len(auth_cookies) >= 1:
-                    # Verify the cookie has a proper value
-                    for cookie in auth_cookies:
-                        if cookie['name'] == '.ROBLOSECURITY' and len(cookie['value']) > 50:
-                            return True
-                
-                await asyncio.sleep(2)
+                if self._has_auth_cookie(await page.context.cookies()):
+                    finish(signal)
+            except Exception:
+                pass
+        
+        async def on_navigated(frame):
+            if frame == page.main_frame and self._is_post_login_url(frame.url):
+                await check_cookie('navigation')
+        
+        async def on_response(response):
+            try:
+                if AUTHENTICATED_PATH in response.url:
+                    if response.status == 200:
+                        user_data = await response.json()
+                        if user_data and user_data.get('id'):
+                            finish('authenticated API')
+                    return
                 
+                set_cookie = await response.header_value('set-cookie')
+                if set_cookie and '.ROBLOSECURITY=' in set_cookie:
+                    await check_cookie('auth cookie')
             except Exception:
-                await asyncio.sleep(2)
+                pass
+        
+        def on_close(_page):
+            finish(None)
         
-        return False
+        page.on("framenavigated", on_navigated)
+        page.on("response", on_response)
+        page.on("close", on_close)
+        try:
+            # The session may already be logged in before any event fires
+            if self._is_post_login_url(page.url):
+                await check_cookie('navigation')
+            
+            signal = await asyncio.wait_for(asyncio.shield(done), timeout)
+        except asyncio.TimeoutError:
+            signal = None
+        finally:
+            page.remove_listener("framenavigated", on_navigated)
+            page.remove_listener("response", on_response)
+            page.remove_listener("close", on_close)
+        
+        if signal:
+            logger.debug("✓ Login detected via %s", signal, extra=event('login.signal', signal=signal))
+        return signal is not None
     
     async def _extract_user_info(self, page: Page) -> Optional[str]:
         """
@@ -148,7 +471,7 @@ class RobloxBrowserManager:
             return None
             
         except Exception as e:
-            print(f"Could not extract user info: {e}")
+            logger.debug("Could not extract user info: %s", e)
             return None
     
     async def launch_with_account(self, account: Dict[str, Any]) -> bool:
@@ -160,7 +483,8 @@ class RobloxBrowserManager:
             return await self._launch_roblox_browser(account, close_after=True)
             
         except Exception as e:
-            print(f"❌ Error launching Roblox: {str(e)}")
+            logger.error("❌ Error launching Roblox: %s", e,
+                         extra=event('launch.error', username=account.get('username')))
             return False
     
     async def _launch_roblox_app(self, account: Dict[str, Any]) -> bool:
@@ -194,13 +518,13 @@ class RobloxBrowserManager:
                                 break
             
             if not roblox_exe:
-                print("❌ Roblox desktop app not found")
+                logger.warning("❌ Roblox desktop app not found")
                 return False
             
             # Launch Roblox with a web browser session first
             success = await self._launch_roblox_browser(account, close_after=False)
             if success:
-                print("🚀 Launching Roblox desktop application...")
+                logger.info("🚀 Launching Roblox desktop application...")
                 
                 # Launch Roblox app (it will use the browser session)
                 subprocess.Popen([roblox_exe], shell=True)
@@ -209,163 +533,149 @@ class RobloxBrowserManager:
             return False
             
         except Exception as e:
-            print(f"Error launching Roblox app: {e}")
+            logger.error("Error launching Roblox app: %s", e)
             return False
     
+    async def _capture_storage_state(self, context: BrowserContext, page: Page) -> Dict[str, Any]:
+        """
+        Snapshot a logged-in context: Playwright's storage_state (cookies and
+        localStorage) plus the current page's sessionStorage, which
+        storage_state does not cover.
+        """
+        state = await context.storage_state()
+        try:
+            origin, items = await page.evaluate(SESSION_STORAGE_CAPTURE_SCRIPT)
+            if items:
+                state['session_storage'] = {origin: items}
+        except Exception as e:
+            logger.warning("⚠️  Could not read sessionStorage: %s", e)
+        return state
+    
+    @asynccontextmanager
+    async def _session_context(self, account: Dict[str, Any], headless: bool = True,
+                               **kwargs) -> AsyncIterator[BrowserContext]:
+        """
+        Open a pooled context with the account's saved session restored by a
+        single new_context(storage_state=...) call. Only if the browser
+        rejects that batch are the cookies added one at a time, to isolate
+        and skip the bad ones instead of losing the whole session.
+        """
+        # Stored cookies are already normalized, so they go to Playwright as-is
+        saved = account.get('storage_state') or {}
+        cookies = account.get('cookies') or []
+        state = {'cookies': cookies, 'origins': saved.get('origins', [])}
+        
+        # Launch failures propagate from here; only new_context() rejecting
+        # the saved state below falls back to adding cookies one by one
+        await self.pool.get_browser(headless)
+        
+        entered = False
+        try:
+            async with self.pool.context(headless=headless, storage_state=state, **kwargs) as context:
+                entered = True
+                await self._restore_session_storage(context, saved)
+                yield context
+            return
+        except Exception as e:
+            if entered:
+                raise
+            logger.warning("⚠️  Saved session was rejected (%s), adding cookies one by one...", e,
+                           extra=event('session.rejected', username=account.get('username')))
+        
+        async with self.pool.context(headless=headless, **kwargs) as context:
+            await self._add_cookies_isolating(context, cookies)
+            await self._restore_session_storage(context, saved)
+            yield context
+    
+    @metrics.timed('session.add_cookies')
+    async def _add_cookies_isolating(self, context: BrowserContext, cookies: List[Dict]) -> int:
+        """Add cookies one at a time, skipping any the browser rejects"""
+        added_count = 0
+        for cookie in cookies:
+            try:
+                await context.add_cookies([cookie])
+                added_count += 1
+            except Exception as e:
+                logger.warning("❌ Skipping bad cookie %s (%s): %s", cookie['name'], cookie.get('domain'), e,
+                               extra=event('session.cookie_rejected', bulk=True, cookie=cookie['name'],
+                                           domain=cookie.get('domain')))
+        
+        logger.info("✓ Loaded %d/%d cookies", added_count, len(cookies),
+                    extra=event('session.cookies_loaded', added=added_count, total=len(cookies)))
+        return added_count
+    
+    @metrics.timed('session.restore_storage')
+    async def _restore_session_storage(self, context: BrowserContext, saved: Dict[str, Any]):
+        """Refill saved sessionStorage as soon as a page of its origin loads"""
+        if saved.get('session_storage'):
+            await context.add_init_script(
+                f"({SESSION_STORAGE_RESTORE_SCRIPT})({json.dumps(saved['session_storage'])})"
+            )
+    
     async def _launch_roblox_browser(self, account: Dict[str, Any], close_after: bool = True) -> bool:
         """
         Launch Roblox in browser with saved session and enhanced error handling
         """
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=False,
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-web-security',
-                        '--disable-dev-shm-usage',
-                        '--no-sandbox'
-                    ]
-                )
-                
-                context = await browser.new_context(
-                    viewport={'width': 1280, 'height': 720},
-                    user_agent=account.get('user_agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'),
-                    java_script_enabled=True,
-                    ignore_https_errors=True
-                )
-                
+            started = time.perf_counter()
+            if account.get('cookies'):
+                logger.info("🔄 Restoring saved session for %s...", account['username'])
+            else:
+                logger.warning("⚠️  No saved cookies available - will need to login",
+                               extra=event('launch.no_cookies', username=account['username']))
+            
+            async with self._session_context(
+                account,
+                headless=False,
+                viewport={'width': 1280, 'height': 720},
+                user_agent=account.get('user_agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'),
+                java_script_enabled=True,
+                ignore_https_errors=True
+            ) as context:
                 page = await context.new_page()
+                restore_time = time.perf_counter() - started
+                metrics.observe('launch.restore', restore_time)
+                logger.info("⏱️  Session restored in %.2fs", restore_time,
+                            extra=event('launch.restored', username=account['username'],
+                                        seconds=round(restore_time, 3)))
                 
-                # First, try to add saved cookies if available
-                if account.get('cookies'):
+                # Navigate to Roblox home page
+                logger.info("🌐 Navigating to Roblox...")
+                with metrics.span('launch.goto_home'):
                     try:
-                        print(f"🔄 Loading saved cookies for {account['username']}...")
-                        # Enhanced cookie processing
-                        valid_cookies = []
-                        for cookie in account['cookies']:
-                            if cookie.get('name') and cookie.get('value'):
-                                # Create a clean cookie object
-                                clean_cookie = {
-                                    'name': cookie['name'],
-                                    'value': cookie['value'],
-                                    'domain': cookie.get('domain', '.roblox.com'),
-                                    'path': cookie.get('path', '/'),
-                                }
-                                
-                                # Add optional fields if they exist and are valid
-                                if cookie.get('secure') is not None:
-                                    clean_cookie['secure'] = bool(cookie['secure'])
-                                if cookie.get('httpOnly') is not None:
-                                    clean_cookie['httpOnly'] = bool(cookie['httpOnly'])
-                                if cookie.get('sameSite') and cookie['sameSite'] in ['Strict', 'Lax', 'None']:
-                                    clean_cookie['sameSite'] = cookie['sameSite']
-                                
-                                # Handle expires - only add if it's a future timestamp
-                                if cookie.get('expires') and cookie['expires'] != -1:
-                                    try:
-                                        import datetime
-                                        expire_time = datetime.datetime.fromtimestamp(cookie['expires'])
-                                        if expire_time > datetime.datetime.now():
-                                            clean_cookie['expires'] = cookie['expires']
-                                    except:
-                                        # If expire parsing fails, make it a session cookie
-                                        pass
-                                
-                                # Ensure domain is correct for Roblox
-                                if not clean_cookie['domain'].endswith('roblox.com'):
-                                    clean_cookie['domain'] = '.roblox.com'
-                                
-                                # Special handling for .ROBLOSECURITY cookie
-                                if cookie['name'] == '.ROBLOSECURITY':
-                                    clean_cookie['secure'] = True
-                                    clean_cookie['httpOnly'] = True
-                                    clean_cookie['sameSite'] = 'None'
-                                    clean_cookie['domain'] = '.roblox.com'
-                                
-                                valid_cookies.append(clean_cookie)
-                        
-                        if valid_cookies:
-                            # Clear any existing cookies first
-                            try:
-                                await context.clear_cookies()
-                            except:
-                                pass  # Ignore clear errors
-                            
-                            # Add cookies one by one with error handling
-                            added_count = 0
-                            for cookie in valid_cookies:
-                                try:
-                                    await context.add_cookies([cookie])
-                                    added_count += 1
-                                    if cookie['name'] == '.ROBLOSECURITY':
-                                        print(f"✓ Successfully added .ROBLOSECURITY cookie")
-                                except Exception as e:
-                                    print(f"⚠️  Failed to add cookie {cookie['name']}: {e}")
-                                    # Try with minimal cookie info
-                                    try:
-                                        minimal_cookie = {
-                                            'name': cookie['name'],
-                                            'value': cookie['value'],
-                                            'domain': '.roblox.com',
-                                            'path': '/'
-                                        }
-                                        await context.add_cookies([minimal_cookie])
-                                        added_count += 1
-                                        print(f"✓ Added {cookie['name']} with minimal config")
-                                    except Exception as e2:
-                                        print(f"❌ Completely failed to add {cookie['name']}: {e2}")
-                            
-                            print(f"✓ Successfully loaded {added_count}/{len(valid_cookies)} cookies")
-                            
-                            # Verify .ROBLOSECURITY cookie was added
-                            test_cookies = await context.cookies()
-                            roblosecurity_found = any(c['name'] == '.ROBLOSECURITY' for c in test_cookies)
-                            if roblosecurity_found:
-                                print("✅ .ROBLOSECURITY cookie verified in context")
-                            else:
-                                print("❌ .ROBLOSECURITY cookie not found in context after adding")
-                                
-                        else:
-                            print("⚠️  No valid cookies found in account data")
+                        await page.goto(self.roblox_home_url, wait_until='networkidle', timeout=30000)
                     except Exception as e:
-                        print(f"⚠️  Critical error adding cookies: {e}")
-                        # Continue without cookies
-                        pass
-                else:
-                    print("⚠️  No saved cookies available - will need to login")
-                
-                # Navigate to Roblox home page
-                print("🌐 Navigating to Roblox...")
-                try:
-                    await page.goto(self.roblox_home_url, wait_until='networkidle', timeout=30000)
-                except Exception as e:
-                    print(f"⚠️  Navigation timeout, trying alternative approach: {e}")
-                    await page.goto(self.roblox_home_url, wait_until='domcontentloaded')
-                    await asyncio.sleep(3)
+                        logger.warning("⚠️  Navigation timeout, trying alternative approach: %s", e)
+                        await page.goto(self.roblox_home_url, wait_until='domcontentloaded')
+                        await asyncio.sleep(3)
                 
                 # Check if login is still valid
-                print("🔍 Verifying login status...")
-                is_logged_in = await self._verify_login_status(page)
+                logger.info("🔍 Verifying login status...")
+                with metrics.span('launch.verify'):
+                    is_logged_in = await self._verify_login_status(page)
                 
                 if is_logged_in:
-                    print(f"✅ Successfully logged in as: {account['username']}")
+                    logger.info("✅ Successfully logged in as: %s", account['username'],
+                                extra=event('launch.logged_in', username=account['username']))
+                    metrics.observe('launch.ready', time.perf_counter() - started)
                     
                     # Navigate to games page
                     try:
-                        print("🎮 Navigating to games page...")
-                        await page.goto("https://www.roblox.com/games", wait_until='networkidle', timeout=15000)
+                        logger.info("🎮 Navigating to games page...")
+                        with metrics.span('launch.goto_games'):
+                            await page.goto(ROBLOX_GAMES_URL, wait_until='networkidle', timeout=15000)
                     except Exception as e:
-                        print(f"⚠️  Games page navigation error: {str(e)}, continuing anyway...")
+                        logger.warning("⚠️  Games page navigation error: %s, continuing anyway...", e)
                     
                     if not close_after:
-                        print("🌐 Browser session ready! You can browse and play games directly in the browser.")
+                        logger.info("🌐 Browser session ready! "
+                                    "You can browse and play games directly in the browser.")
                         # Keep browser open for a while to maintain session
                         await asyncio.sleep(5)
                     else:
-                        print("🎮 Browser ready! You can now play Roblox games directly in the browser.")
-                        print("💡 Tip: Browse games and click 'Play' to start playing directly in browser.")
-                        print("🌐 Browser will stay open - close manually when done playing.")
+                        logger.info("🎮 Browser ready! You can now play Roblox games directly in the browser.")
+                        logger.info("💡 Tip: Browse games and click 'Play' to start playing directly in browser.")
+                        logger.info("🌐 Browser will stay open - close manually when done playing.")
                         
                         # Keep browser open indefinitely until user closes it
                         try:
@@ -375,288 +685,236 @@ class RobloxBrowserManager:
                         except:
                             pass
                     
-                    # Don't auto-close browser anymore
-                    # if close_after:
-                    #     await browser.close()
-                    
+                    # The context is released when this block exits; the
+                    # pooled browser itself stays warm for the next launch
                     return True
                 else:
-                    print("❌ Session expired or invalid.")
+                    logger.warning("❌ Session expired or invalid.",
+                                   extra=event('launch.expired', username=account['username']))
+            
+            # Offer to refresh session once the failed context is closed;
+            # queued messages are written out before the prompt
+            log.flush()
+            print("🔄 Would you like to refresh the session? This will open a login page.")
+            try:
+                # Give user choice to refresh session
+                refresh_choice = input("Press 'y' to refresh session, or any other key to cancel: ").lower().strip()
+                
+                if refresh_choice == 'y':
+                    logger.info("🔄 Refreshing session...")
                     
-                    # Offer to refresh session
-                    print("🔄 Would you like to refresh the session? This will open a login page.")
-                    try:
-                        # Give user choice to refresh session
-                        refresh_choice = input("Press 'y' to refresh session, or any other key to cancel: ").lower().strip()
-                        
-                        if refresh_choice == 'y':
-                            print("🔄 Refreshing session...")
-                            await browser.close()
-                            
-                            # Try to refresh session
-                            refresh_success = await self.refresh_account_session(account['username'])
-                            if refresh_success:
-                                print("✅ Session refreshed! Please try launching again.")
-                                return True
-                            else:
-                                print("❌ Failed to refresh session")
-                                return False
-                        else:
-                            await browser.close()
-                            print("❌ Session refresh cancelled")
-                            return False
-                            
-                    except KeyboardInterrupt:
-                        await browser.close()
-                        print("\n❌ Operation cancelled by user")
+                    # Try to refresh session
+                    refresh_success = await self.refresh_account_session(account['username'])
+                    if refresh_success:
+                        logger.info("✅ Session refreshed! Please try launching again.")
+                        return True
+                    else:
+                        logger.warning("❌ Failed to refresh session")
                         return False
+                else:
+                    logger.info("❌ Session refresh cancelled")
+                    return False
+                    
+            except KeyboardInterrupt:
+                logger.info("\n❌ Operation cancelled by user")
+                return False
                     
         except Exception as e:
-            print(f"❌ Error launching browser session: {e}")
+            logger.error("❌ Error launching browser session: %s", e,
+                         extra=event('launch.error', username=account.get('username')))
             return False
     
     async def _verify_login_status(self, page: Page) -> bool:
         """
         Verify if the user is still logged in with enhanced checks
         """
+        verdict = await self._verify_login(page)
+        return verdict.logged_in
+    
+    @metrics.timed('login.verify')
+    async def _verify_login(self, page: Page, budget: float = LOGIN_VERIFY_BUDGET) -> LoginVerdict:
+        """
+        Decide whether the page is logged in within `budget` seconds.
+        
+        Cheap signals (URL, auth cookie, authenticated API) run first and
+        can settle the question on their own. Otherwise the DOM and
+        JavaScript probes run side by side and the first positive one wins.
+        The verdict records which signal decided and how long it took.
+        """
+        start = time.perf_counter()
+        
+        def remaining() -> float:
+            return max(0.0, budget - (time.perf_counter() - start))
+        
+        def decide(logged_in: bool, signal: str) -> LoginVerdict:
+            verdict = LoginVerdict(logged_in, signal, round(time.perf_counter() - start, 3))
+            logger.info("%s Login %s (%s, %.2fs)", '✅' if logged_in else '❌',
+                        'confirmed' if logged_in else 'not confirmed', signal, verdict.elapsed,
+                        extra=event('login.verdict', logged_in=logged_in, signal=signal, seconds=verdict.elapsed))
+            return verdict
+        
         try:
-            # Wait for page to fully load
-            await page.wait_for_load_state('networkidle', timeout=15000)
-            await asyncio.sleep(3)  # Additional wait for dynamic content
-            
             current_url = page.url
-            print(f"🔍 Checking login status on: {current_url}")
+            logger.debug("🔍 Checking login status on: %s", current_url)
             
-            # First check: If we're on login page, definitely not logged in
+            # If we're on the login page, definitely not logged in
             if any(keyword in current_url.lower() for keyword in ['login', 'authenticate', 'signin']):
-                print("❌ Redirected to login page")
-                return False
+                return decide(False, 'login page URL')
             
-            # Second check: Enhanced cookie validation
+            # No usable auth cookie means no session, whatever the page shows
             cookies = await page.context.cookies()
-            print(f"🔍 Found {len(cookies)} total cookies")
-            
-            # Find all Roblox related cookies
-            roblox_cookies = [c for c in cookies if 'roblox' in c.get('domain', '').lower()]
-            print(f"🔍 Found {len(roblox_cookies)} Roblox cookies")
-            
-            auth_cookie = None
-            for cookie in cookies:
-                if cookie['name'] == '.ROBLOSECURITY':
-                    auth_cookie = cookie
-                    break
-            
-            if not auth_cookie:
-                # Try alternative cookie names
-                alt_names = ['ROBLOSECURITY', '_RobloxSecurity', 'RobloxSecurity']
-                for name in alt_names:
-                    alt_cookie = next((c for c in cookies if c['name'] == name), None)
-                    if alt_cookie:
-                        auth_cookie = alt_cookie
-                        print(f"✓ Found alternative auth cookie: {name}")
-                        break
-            
+            auth_cookie = next((c for c in cookies if c['name'] in AUTH_COOKIE_NAMES), None)
             if not auth_cookie:
-                print("❌ No authentication cookie found")
-                # Try to see what cookies we do have
                 cookie_names = [c['name'] for c in cookies if 'roblox' in c.get('domain', '').lower()]
                 if cookie_names:
-                    print(f"📋 Available Roblox cookies: {', '.join(cookie_names)}")
-                return False
+                    logger.debug("📋 Available Roblox cookies: %s", ', '.join(cookie_names))
+                return decide(False, 'missing auth cookie')
+            if len(auth_cookie.get('value', '')) < 30:
+                return decide(False, 'short auth cookie')
             
-            cookie_value = auth_cookie.get('value', '')
-            if len(cookie_value) < 30:  # Reduced minimum length
-                print(f"❌ Auth cookie too short: {len(cookie_value)} chars")
-                return False
-            
-            print(f"✓ Found valid auth cookie: {cookie_value[:30]}... (length: {len(cookie_value)})")
+            # Playwright reads a timeout of 0 as "wait forever", so a spent
+            # budget has to stop here rather than reach the request
+            if remaining() <= 0:
+                return decide(False, 'time budget exhausted')
             
-            # Third check: Try to access Roblox API endpoint to verify auth
+            # The authenticated-user endpoint answers definitively when it answers at all
             try:
-                print("🔍 Verifying authentication via API...")
-                response = await page.request.get("https://users.roblox.com/v1/users/authenticated", 
-                                                fail_on_status_code=False)
+                with metrics.span('login.verify.api'):
+                    response = await page.request.get(
+                        ROBLOX_USERS_API_URL + AUTHENTICATED_PATH,
+                        fail_on_status_code=False,
+                        timeout=max(1.0, remaining() * 1000)
+                    )
                 if response.status == 200:
                     user_data = await response.json()
                     if user_data and user_data.get('id'):
-                        print(f"✅ API verification successful - User ID: {user_data.get('id')}")
-                        return True
+                        return decide(True, f"authenticated API (user {user_data['id']})")
+                elif response.status == 401:
+                    return decide(False, 'authenticated API (401)')
                 else:
-                    print(f"⚠️  API returned status {response.status}")
+                    logger.warning("⚠️  API returned status %s", response.status)
             except Exception as e:
-                print(f"⚠️  API check failed: {e}")
+                logger.warning("⚠️  API check failed: %s", e)
             
-            # Fourth check: Look for user navigation elements with multiple selectors
-            user_selectors = [
-                '[data-testid="navigation-user"]',
-                '.navbar-user',
-                '#navigation-user',
-                '[data-testid="avatar-card-username"]',
-                '.menu-user-name',
-                '.header-username',
-                '.nav-robux-amount',
-                '[class*="user"]',
-                '[id*="user"]',
-                '.navbar .navbar-user',
-                '.top-nav-user',
-                '.app-header .user'
+            # Inconclusive so far: race the page probes against the remaining budget
+            probes_started = time.perf_counter()
+            probes = [
+                asyncio.ensure_future(self._probe_user_element(page, remaining())),
+                asyncio.ensure_future(self._probe_page_javascript(page, remaining())),
+                asyncio.ensure_future(self._probe_page_markers(page, remaining()))
             ]
-            
-            for selector in user_selectors:
-                try:
-                    element = await page.wait_for_selector(selector, timeout=2000)
-                    if element:
-                        text = await element.text_content()
-                        if text and text.strip() and not text.strip().lower() in ['login', 'sign in']:
-                            print(f"✓ Found user element: {text.strip()[:30]}...")
-                            return True
-                except:
-                    continue
-            
-            # Fifth check: Try to get user data from JavaScript
             try:
-                user_data = await page.evaluate("""
-                    () => {
-                        // Check for Roblox user data in global variables
-                        if (window.Roblox) {
-                            if (window.Roblox.CurrentUser && window.Roblox.CurrentUser.userId) {
-                                return {
-                                    source: 'Roblox.CurrentUser',
-                                    userId: window.Roblox.CurrentUser.userId,
-                                    displayName: window.Roblox.CurrentUser.displayName,
-                                    username: window.Roblox.CurrentUser.name
-                                };
-                            }
-                            
-                            // Check for other user data locations
-                            if (window.Roblox.Users && window.Roblox.Users.authenticatedUserId) {
-                                return {
-                                    source: 'Roblox.Users',
-                                    userId: window.Roblox.Users.authenticatedUserId
-                                };
-                            }
-                        }
-                        
-                        // Check for meta tags with user info
-                        const userMeta = document.querySelector('meta[name="user-data"]');
-                        if (userMeta) {
-                            try {
-                                const content = userMeta.getAttribute('data-userid') || userMeta.getAttribute('content');
-                                if (content) {
-                                    const userData = JSON.parse(content);
-                                    return {
-                                        source: 'meta[user-data]',
-                                        ...userData
-                                    };
-                                }
-                            } catch(e) {}
-                        }
-                        
-                        // Check for user ID in script tags
-                        const scripts = document.querySelectorAll('script');
-                        for (const script of scripts) {
-                            const content = script.textContent || '';
-                            const userIdMatch = content.match(/["']?userId["']?\\s*:\\s*(\\d+)/);
-                            if (userIdMatch) {
-                                return {
-                                    source: 'script-userId',
-                                    userId: parseInt(userIdMatch[1])
-                                };
-                            }
-                        }
-                        
-                        return null;
-                    }
-                """)
-                
-                if user_data and user_data.get('userId'):
-                    print(f"✅ JavaScript verification successful: {user_data}")
-                    return True
-                    
-            except Exception as e:
-                print(f"⚠️  JavaScript check failed: {e}")
-            
-            # Sixth check: Check page title and content for login indicators
-            title = await page.title()
-            if any(keyword in title.lower() for keyword in ['home', 'dashboard', 'profile', 'discover']) and 'login' not in title.lower():
-                page_content = await page.content()
-                if any(indicator in page_content.lower() for indicator in ['logout', 'sign out', 'account settings']):
-                    print("✓ Found logout/settings in page content - likely logged in")
-                    return True
-            
-            # Seventh check: Look for specific Roblox logged-in page elements
-            logged_in_selectors = [
-                '.robux-display',
-                '.user-menu',
-                '.notification-blue',
-                '[data-testid="user-avatar"]',
-                '.navbar-robux',
-                '.top-nav .user'
-            ]
-            
-            for selector in logged_in_selectors:
-                try:
-                    element = await page.query_selector(selector)
-                    if element:
-                        print(f"✓ Found logged-in indicator: {selector}")
-                        return True
-                except:
-                    continue
+                pending = set(probes)
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, timeout=remaining(), return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not done:
+                        return decide(False, 'time budget exhausted')
+                    for task in done:
+                        signal = task.result() if not task.exception() else None
+                        if signal:
+                            return decide(True, signal)
+            finally:
+                for task in probes:
+                    task.cancel()
+                metrics.observe('login.verify.probes', time.perf_counter() - probes_started)
             
-            print("❌ No login indicators found despite having auth cookie")
-            return False
+            return decide(False, 'no login indicators')
             
         except Exception as e:
-            print(f"❌ Error verifying login status: {e}")
-            return False
+            logger.error("❌ Error verifying login status: %s", e)
+            return LoginVerdict(False, f"error: {e}", round(time.perf_counter() - start, 3))
+    
+    async def _probe_user_element(self, page: Page, timeout: float) -> Optional[str]:
+        """Wait for a user navigation element that shows a name"""
+        selector = ', '.join(USER_ELEMENT_SELECTORS)
+        try:
+            await page.wait_for_selector(selector, timeout=timeout * 1000)
+            texts = await page.eval_on_selector_all(
+                selector, "els => els.map(e => (e.textContent || '').trim())"
+            )
+        except Exception:
+            return None
+        
+        for text in texts:
+            if text and text.lower() not in ['login', 'sign in']:
+                return f"user element ({text[:30]})"
+        return None
+    
+    async def _probe_page_javascript(self, page: Page, timeout: float) -> Optional[str]:
+        """Look for the signed-in user in Roblox's page globals"""
+        try:
+            await page.wait_for_load_state('domcontentloaded', timeout=timeout * 1000)
+            user_data = await page.evaluate(USER_DATA_SCRIPT)
+        except Exception:
+            return None
+        
+        if user_data and user_data.get('userId'):
+            return f"JavaScript ({user_data.get('source')})"
+        return None
+    
+    async def _probe_page_markers(self, page: Page, timeout: float) -> Optional[str]:
+        """Look for logged-in-only page elements or logout/settings text"""
+        try:
+            await page.wait_for_load_state('domcontentloaded', timeout=timeout * 1000)
+            marker = await page.query_selector(', '.join(LOGGED_IN_SELECTORS))
+            if marker:
+                return 'logged-in page element'
+            
+            title = (await page.title()).lower()
+            if any(keyword in title for keyword in ['home', 'dashboard', 'profile', 'discover']) and 'login' not in title:
+                # Search the rendered text in the page instead of pulling the whole HTML over
+                has_account_text = await page.evaluate(
+                    """() => {
+                        const text = (document.body && document.body.innerText || '').toLowerCase();
+                        return ['logout', 'sign out', 'account settings'].some(k => text.includes(k));
+                    }"""
+                )
+                if has_account_text:
+                    return 'logout/settings text'
+        except Exception:
+            pass
+        return None
     
     async def refresh_account_session(self, username: str) -> bool:
         """
         Refresh account session by re-logging in with enhanced flow
         """
-        print(f"🔄 Refreshing session for: {username}")
+        logger.info("🔄 Refreshing session for: %s", username)
         
         try:
             # First check if account exists
             account = self.db.get_account(username)
             if not account:
-                print(f"❌ Account '{username}' not found in database")
+                logger.warning("❌ Account '%s' not found in database", username,
+                               extra=event('refresh.failed', username=username, reason='not found'))
                 return False
             
-            print(f"🔄 Opening browser for session refresh...")
+            logger.info("🔄 Opening browser for session refresh...")
             
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=False,
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-web-security',
-                        '--no-sandbox'
-                    ]
-                )
-                
-                context = await browser.new_context(
-                    viewport={'width': 1280, 'height': 720},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                )
-                
+            async with self.pool.context(
+                headless=False,
+                viewport={'width': 1280, 'height': 720},
+                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            ) as context:
                 page = await context.new_page()
                 
                 # Clear any existing cookies and go to login page
                 await page.goto(self.roblox_login_url, wait_until='networkidle')
                 
-                print("🌐 Browser opened for session refresh!")
-                print(f"👤 Please login with account: {username}")
-                print("⏳ Waiting for login completion...")
+                logger.info("🌐 Browser opened for session refresh!")
+                logger.info("👤 Please login with account: %s", username)
+                logger.info("⏳ Waiting for login completion...")
                 
                 # Wait for user to login
                 login_successful = await self._wait_for_login(page)
                 
                 if login_successful:
-                    print("✅ Login successful! Updating session data...")
+                    logger.info("✅ Login successful! Updating session data...")
                     
-                    # Get new cookies and session data
-                    new_cookies = await context.cookies()
+                    # Get new cookies, browser storage and session data
+                    storage_state = await self._capture_storage_state(context, page)
                     new_user_agent = await page.evaluate("navigator.userAgent")
                     display_name = await self._extract_user_info(page)
                     
@@ -664,27 +922,81 @@ class RobloxBrowserManager:
                     update_success = self.db.update_account(
                         username=username,
                         display_name=display_name or account.get('display_name'),
-                        cookies=new_cookies,
+                        cookies=storage_state['cookies'],
                         user_agent=new_user_agent,
-                        session_data={'logged_in': True, 'refresh_time': time.time()}
+                        session_data={'logged_in': True, 'refresh_time': time.time()},
+                        storage_state=storage_state
                     )
                     
-                    await browser.close()
-                    
                     if update_success:
-                        print(f"✅ Session refreshed successfully for '{username}'!")
+                        logger.info("✅ Session refreshed successfully for '%s'!", username,
+                                    extra=event('refresh.done', username=username))
                         return True
                     else:
-                        print("❌ Failed to update account data in database")
+                        logger.error("❌ Failed to update account data in database",
+                                     extra=event('refresh.failed', username=username, reason='database'))
                         return False
                 else:
-                    print("❌ Login timeout or failed during refresh")
-                    await browser.close()
+                    logger.warning("❌ Login timeout or failed during refresh",
+                                   extra=event('refresh.failed', username=username, reason='login'))
                     return False
                     
         except Exception as e:
-            print(f"❌ Error refreshing session: {str(e)}")
+            logger.error("❌ Error refreshing session: %s", e,
+                         extra=event('refresh.failed', username=username, reason='error'))
+            return False
+    
+    async def renew_session(self, username: str) -> bool:
+        """
+        Reload Roblox headlessly with an account's saved session and store the
+        cookies and storage the site hands back, with no user interaction.
+        Returns False, leaving the account as it was, unless the users API
+        confirms the renewed session.
+        """
+        account = self.db.get_account(username)
+        if not account or not account.get('cookies'):
+            logger.warning("❌ %s: No saved session to renew", username,
+                           extra=event('session.renew_failed', bulk=True, username=username, reason='no session'))
+            return False
+        
+        try:
+            async with self._session_context(
+                account,
+                headless=True,
+                user_agent=account.get('user_agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+            ) as context:
+                # No lean profile here: the site's scripts are what refresh the
+                # cookies and storage being captured
+                page = await context.new_page()
+                await page.goto(self.roblox_home_url, wait_until='domcontentloaded', timeout=PAGE_LOAD_TIMEOUT * 1000)
+                
+                if not self._is_post_login_url(page.url):
+                    logger.warning("❌ %s: Saved session no longer logs in", username,
+                                   extra=event('session.renew_failed', bulk=True, username=username, reason='expired'))
+                    return False
+                
+                storage_state = await self._capture_storage_state(context, page)
+            
+            # The injected cookie stays in the jar whether or not Roblox still
+            # accepts it, and a logged-out landing page passes the URL check,
+            # so only the users API can confirm the session before it is stored
+            outcome, _ = await self.http_validator.check_async(storage_state['cookies'], account.get('user_agent'))
+        except Exception as e:
+            logger.error("❌ %s: Error renewing session: %s", username, e,
+                         extra=event('session.renew_failed', bulk=True, username=username, reason='error'))
+            return False
+        
+        if outcome != VALID:
+            reason = 'expired' if outcome == INVALID else 'unconfirmed'
+            logger.warning("❌ %s: Renewed session not confirmed by the users API (%s)", username, outcome,
+                           extra=event('session.renew_failed', bulk=True, username=username, reason=reason))
+            return False
+        
+        if not self.db.update_account(username, cookies=storage_state['cookies'], storage_state=storage_state):
             return False
+        self.db.update_account_status(username, True)
+        logger.info("✅ %s: Session renewed", username, extra=event('session.renewed', bulk=True, username=username))
+        return True
     
     def get_roblox_protocol_handler(self) -> bool:
         """
@@ -703,121 +1015,301 @@ class RobloxBrowserManager:
             # Not on Windows or winreg not available
             return False
     
-    async def validate_account_session(self, username: str) -> bool:
+    async def validate_account_session(self, username: str, force: bool = False) -> bool:
+        """
+        Validate if an account's session is still active without opening browser.
+        A result recorded within VALIDATION_CACHE_TTL is reused unless the
+        account's cookies changed since, or `force` is set.
         """
-        Validate if an account's session is still active without opening browser
+        is_valid, record = await self._validate_session(username, force)
+        if record:
+            self.db.record_validations([record])
+        return bool(is_valid)
+    
+    @metrics.timed('validate.session')
+    async def _validate_session(self, username: str, force: bool = False,
+                                timeout: Optional[float] = None) -> Tuple[Optional[bool], Optional[Dict]]:
+        """
+        Validate one account, returning (is_valid, record). `record` is the
+        fresh result to store, or None when a cached result was reused.
+        A check that errors or exceeds `timeout` reached no verdict: it is
+        reported as None, so the account keeps its status, and recorded with
+        outcome 'error' so the failure counts towards the account's priority
+        but is never reused.
+        """
+        account = self.db.get_account(username)
+        if not account:
+            return False, None
+        
+        cookies = account.get('cookies') or []
+        fingerprint = cookie_fingerprint(cookies)
+        
+        if not force:
+            cached = self.db.get_validation(account['id'])
+            if (cached and cached['outcome'] in ('valid', 'invalid')
+                    and cached['cookie_fingerprint'] == fingerprint
+                    and time.time() - cached['checked_at'] < VALIDATION_CACHE_TTL):
+                age = int(time.time() - cached['checked_at'])
+                logger.info("⏭️  %s: %s %ss ago via %s, skipping",
+                            username, cached['outcome'], age, cached['method'],
+                            extra=event('validate.cached', bulk=True, username=username, outcome=cached['outcome'],
+                                        method=cached['method'], age=age))
+                return cached['outcome'] == 'valid', None
+        
+        try:
+            is_valid, method, user_id = await asyncio.wait_for(self._check_session(username, account), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️  %s: Validation timed out after %ss", username, timeout,
+                           extra=event('validate.timeout', bulk=True, username=username, timeout=timeout))
+            is_valid, method, user_id = None, 'timeout', None
+        
+        if method in ('error', 'timeout'):
+            # No verdict; only a check that rejected the session deactivates
+            is_valid, outcome = None, 'error'
+        else:
+            outcome = 'valid' if is_valid else 'invalid'
+        
+        return is_valid, {
+            'account_id': account['id'],
+            'checked_at': time.time(),
+            'outcome': outcome,
+            'method': method,
+            'user_id': user_id,
+            'cookie_fingerprint': fingerprint
+        }
+    
+    async def _check_session(self, username: str, account: Dict[str, Any]) -> Tuple[bool, str, Optional[int]]:
+        """
+        Check an account's session against Roblox. Returns (is_valid,
+        method, user_id); method is 'error' when no definite answer was reached.
         """
         try:
-            account = self.db.get_account(username)
-            if not account or not account.get('cookies'):
-                return False
-            
             # Check if we have the essential cookie
-            cookies = account['cookies']
+            cookies = account.get('cookies') or []
             auth_cookie = next((c for c in cookies if c['name'] == '.ROBLOSECURITY'), None)
             if not auth_cookie or len(auth_cookie.get('value', '')) < 30:
-                print(f"❌ {username}: No valid auth cookie in database")
-                return False
+                logger.info("❌ %s: No valid auth cookie in database", username,
+                            extra=event('validate.result', bulk=True, username=username, outcome='invalid',
+                                        method='no auth cookie'))
+                return False, 'no auth cookie', None
             
-            print(f"🔍 Validating session for {username}...")
+            logger.debug("🔍 Validating session for %s...", username,
+                         extra=event('validate.start', bulk=True, username=username))
             
-            # Quick validation using headless browser
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent=account.get('user_agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-                )
-                
-                # Add cookies with enhanced processing
-                try:
-                    valid_cookies = []
-                    for cookie in cookies:
-                        if cookie.get('name') and cookie.get('value'):
-                            # Create clean cookie with proper attributes
-                            clean_cookie = {
-                                'name': cookie.get('name', ''),
-                                'value': cookie.get('value', ''),
-                                'domain': cookie.get('domain', '.roblox.com'),
-                                'path': cookie.get('path', '/'),
-                                'secure': cookie.get('secure', True),
-                                'httpOnly': cookie.get('httpOnly', False)
-                            }
-                            
-                            # Fix domain issues
-                            if not clean_cookie['domain'].endswith('roblox.com'):
-                                clean_cookie['domain'] = '.roblox.com'
-                            
-                            # Sanitize sameSite attribute
-                            same_site = cookie.get('sameSite', 'Lax')
-                            if same_site in ['Strict', 'Lax', 'None']:
-                                clean_cookie['sameSite'] = same_site
-                            else:
-                                clean_cookie['sameSite'] = 'Lax'
-                            
-                            valid_cookies.append(clean_cookie)
+            # Cheap browserless check first; only ambiguous answers need Chromium
+            with metrics.span('validate.http'):
+                outcome, user_id = await self.http_validator.check_async(cookies, account.get('user_agent'))
+            if outcome == VALID:
+                logger.info("✅ %s: API validation successful - User ID: %s", username, user_id,
+                            extra=event('validate.result', bulk=True, username=username, outcome='valid',
+                                        method='http api', user_id=user_id))
+                return True, 'http api', user_id
+            if outcome == INVALID:
+                logger.info("❌ %s: API rejected the session", username,
+                            extra=event('validate.result', bulk=True, username=username, outcome='invalid',
+                                        method='http api'))
+                return False, 'http api', None
+            
+            logger.info("⚠️  %s: API result inconclusive, falling back to browser check", username,
+                        extra=event('validate.fallback', bulk=True, username=username))
+            
+            # Quick validation using the pooled headless browser
+            user_agent = account.get('user_agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+            options = self._lean_context_options() if VALIDATION_LEAN_PROFILE else {}
+            with metrics.span('validate.browser'):
+                async with self._session_context(account, headless=True, user_agent=user_agent, **options) as context:
+                    meter = ValidationMeter()
+                    # Counting bytes and sampling the heap cost extra round trips
+                    # to the browser, so only do it when the report is written
+                    report = log.will_emit(logger, logging.INFO, bulk=True)
+                    if report:
+                        meter.attach(context)
+                    if VALIDATION_LEAN_PROFILE:
+                        await self._block_nonessential_requests(context, meter)
                     
-                    await context.add_cookies(valid_cookies)
-                except Exception as e:
-                    print(f"⚠️  Error adding cookies for validation: {e}")
-                
-                page = await context.new_page()
-                
-                try:
-                    # Try API endpoint first (fastest method)
-                    response = await page.request.get("https://users.roblox.com/v1/users/authenticated", 
-                                                    fail_on_status_code=False)
-                    if response.status == 200:
-                        user_data = await response.json()
-                        if user_data and user_data.get('id'):
-                            print(f"✅ {username}: API validation successful")
-                            await browser.close()
-                            return True
-                except Exception as e:
-                    print(f"⚠️  API validation failed for {username}: {e}")
+                    page = await context.new_page()
+                    try:
+                        return await self._check_session_in_page(username, context, page)
+                    finally:
+                        if report:
+                            await meter.sample_memory(context, page)
+                            await meter.finish()
+                            logger.info("📦 %s: %s", username, meter.summary(),
+                                        extra=event('validate.browser_usage', bulk=True, username=username,
+                                                    bytes=meter.bytes, requests=meter.requests,
+                                                    blocked=meter.blocked, js_heap=meter.js_heap))
                 
-                # Fallback: Load home page and check
+        except Exception as e:
+            logger.error("❌ %s: Validation error: %s", username, e,
+                         extra=event('validate.result', bulk=True, username=username, outcome='error'))
+            return False, 'error', None
+    
+    async def _check_session_in_page(self, username: str, context: BrowserContext,
+                                     page: Page) -> Tuple[bool, str, Optional[int]]:
+        """Browser half of _check_session: the users API, then the home page"""
+        try:
+            # Try API endpoint first (fastest method)
+            response = await page.request.get(ROBLOX_USERS_API_URL + AUTHENTICATED_PATH, 
+                                            fail_on_status_code=False)
+            if response.status == 200:
+                user_data = await response.json()
+                if user_data and user_data.get('id'):
+                    logger.info("✅ %s: API validation successful", username,
+                                extra=event('validate.result', bulk=True, username=username, outcome='valid',
+                                            method='browser api', user_id=user_data.get('id')))
+                    return True, 'browser api', user_data.get('id')
+        except Exception as e:
+            logger.warning("⚠️  API validation failed for %s: %s", username, e,
+                           extra=event('validate.browser_api_failed', bulk=True, username=username))
+        
+        # Fallback: Load home page and check
+        try:
+            await page.goto(ROBLOX_WEB_URL + "/home", wait_until='domcontentloaded', timeout=10000)
+            
+            # Check for auth cookie after page load
+            new_cookies = await context.cookies()
+            auth_cookie_after = next((c for c in new_cookies if c['name'] == '.ROBLOSECURITY'), None)
+            
+            is_valid = auth_cookie_after is not None and len(auth_cookie_after.get('value', '')) > 30
+            logger.info("%s %s: Page validation %s", '✅' if is_valid else '❌', username,
+                        'successful' if is_valid else 'failed',
+                        extra=event('validate.result', bulk=True, username=username,
+                                    outcome='valid' if is_valid else 'invalid', method='home page'))
+            return is_valid, 'home page', None
+            
+        except Exception as e:
+            logger.error("❌ %s: Page validation error: %s", username, e,
+                         extra=event('validate.result', bulk=True, username=username, outcome='error'))
+            return False, 'error', None
+    
+    @staticmethod
+    def _lean_context_options() -> Dict[str, Any]:
+        """new_context() options for a headless context that only reads cookies"""
+        return {
+            'viewport': LEAN_VIEWPORT,
+            'device_scale_factor': 1,
+            'service_workers': 'block',
+            'accept_downloads': False,
+            'reduced_motion': 'reduce'
+        }
+    
+    @staticmethod
+    def _is_allowed_host(url: str) -> bool:
+        """Whether a request goes to a host the lean profile lets through"""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            return True  # data:, blob: and the like never touch the network
+        
+        host = parts.hostname or ''
+        allowed = LEAN_ALLOWED_HOSTS + [urlsplit(url).hostname or '' for url in (ROBLOX_WEB_URL, ROBLOX_USERS_API_URL)]
+        return any(host == name or host.endswith('.' + name) for name in allowed if name)
+    
+    async def _block_nonessential_requests(self, context: BrowserContext, meter: ValidationMeter):
+        """Abort requests for non-essential resource types and third-party hosts"""
+        async def handle(route):
+            request = route.request
+            if request.resource_type in LEAN_BLOCKED_RESOURCE_TYPES or not self._is_allowed_host(request.url):
+                meter.blocked += 1
+                await route.abort()
+            else:
+                await route.continue_()
+        
+        await context.route('**/*', handle)
+    
+    async def validate_sessions_concurrently(
+        self,
+        usernames: Iterable[str],
+        concurrency: int = VALIDATION_CONCURRENCY,
+        timeout: float = VALIDATION_TIMEOUT,
+        on_result: Optional[Callable[[str, Optional[bool]], None]] = None,
+        force: bool = False
+    ) -> Dict[str, Optional[bool]]:
+        """
+        Validate many accounts at once with at most `concurrency` checks in
+        flight. Each result is reported through `on_result` as soon as it
+        finishes; accounts that time out or error are reported as None.
+        `usernames` is consumed lazily, so it can be a streaming iterator.
+        Fresh results are recorded in one transaction at the end.
+        """
+        pending = iter(usernames)
+        results: Dict[str, Optional[bool]] = {}
+        records: List[Dict] = []
+        
+        async def worker():
+            # Each worker pulls the next username only once it is free
+            for username in pending:
                 try:
-                    await page.goto("https://www.roblox.com/home", wait_until='domcontentloaded', timeout=10000)
-                    
-                    # Check for auth cookie after page load
-                    new_cookies = await context.cookies()
-                    auth_cookie_after = next((c for c in new_cookies if c['name'] == '.ROBLOSECURITY'), None)
-                    
-                    await browser.close()
-                    
-                    is_valid = auth_cookie_after is not None and len(auth_cookie_after.get('value', '')) > 30
-                    print(f"{'✅' if is_valid else '❌'} {username}: Page validation {'successful' if is_valid else 'failed'}")
-                    return is_valid
-                    
+                    is_valid, record = await self._validate_session(username, force, timeout)
+                    if record:
+                        records.append(record)
                 except Exception as e:
-                    await browser.close()
-                    print(f"❌ {username}: Page validation error: {e}")
-                    return False
+                    logger.error("⚠️  Error checking %s: %s", username, e,
+                                 extra=event('validate.result', bulk=True, username=username, outcome='error'))
+                    is_valid = None
                 
-        except Exception as e:
-            print(f"❌ {username}: Validation error: {e}")
-            return False
+                results[username] = is_valid
+                if on_result:
+                    on_result(username, is_valid)
+        
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        self.db.record_validations(records)
+        return results
     
-    async def clean_expired_sessions(self) -> int:
+    async def clean_expired_sessions(self, concurrency: int = VALIDATION_CONCURRENCY,
+                                     timeout: float = VALIDATION_TIMEOUT, force: bool = False,
+                                     budget: Optional[int] = None,
+                                     on_result: Optional[Callable[[str, Optional[bool]], None]] = None) -> int:
         """
-        Check all accounts and mark expired sessions as inactive
+        Check all accounts and mark expired sessions as inactive.
+        
+        Accounts whose auth cookie has expired by its stored expiry time are
+        marked without a network call. The rest are checked most urgent first
+        (see get_validation_queue); with a `budget`, only that many are
+        checked. Accounts with a fresh cached result are not checked again
+        unless `force` is set. `on_result` is called for every account as
+        its outcome is known, as in validate_sessions_concurrently().
         """
-        accounts = self.db.get_active_accounts()
-        expired_count = 0
+        expired_locally = self.db.expire_accounts_locally()
+        for username in expired_locally:
+            logger.warning("⌛ Auth cookie expired for: %s", username,
+                           extra=event('validate.expired_locally', bulk=True, username=username))
+            if on_result:
+                on_result(username, False)
         
-        print(f"🔍 Checking {len(accounts)} active accounts for expired sessions...")
+        # Only usernames are needed up front; each check loads its own cookies
+        queue = self.db.get_validation_queue(limit=budget)
+        usernames = [row['username'] for row in queue]
         
-        for account in accounts:
-            try:
-                is_valid = await self.validate_account_session(account['username'])
-                if not is_valid:
-                    print(f"❌ Session expired for: {account['username']}")
-                    self.db.update_account_status(account['username'], False)
-                    expired_count += 1
-                else:
-                    print(f"✅ Session valid for: {account['username']}")
-            except Exception as e:
-                print(f"⚠️  Error checking {account['username']}: {e}")
+        active = self.db.get_account_count()['active']
+        if budget is not None and len(usernames) < active:
+            logger.info("🔍 Checking the %d most at-risk of %d active accounts...", len(usernames), active,
+                        extra=event('validate.started', queued=len(usernames), active=active))
+        else:
+            logger.info("🔍 Checking %d active accounts for expired sessions...", active,
+                        extra=event('validate.started', queued=len(usernames), active=active))
+        
+        def report(username: str, is_valid: Optional[bool]):
+            if is_valid:
+                logger.info("✅ Session valid for: %s", username,
+                            extra=event('validate.session_valid', bulk=True, username=username))
+            elif is_valid is False:
+                logger.warning("❌ Session expired for: %s", username,
+                               extra=event('validate.session_expired', bulk=True, username=username))
+            if on_result:
+                on_result(username, is_valid)
+        
+        results = await self.validate_sessions_concurrently(
+            usernames, concurrency=concurrency, timeout=timeout, on_result=report, force=force
+        )
+        
+        # Accounts that errored or timed out keep their current status
+        expired = {username: False for username, is_valid in results.items() if is_valid is False}
+        self.db.set_status_many(expired)
         
-        print(f"🧹 Found {expired_count} expired sessions")
-        return expired_count
\ No newline at end of file
+        expired_count = len(expired) + len(expired_locally)
+        unchecked = sum(1 for is_valid in results.values() if is_valid is None)
+        logger.info("🧹 Found %d expired sessions (%d checked, %d could not be checked)",
+                    expired_count, len(results), unchecked,
+                    extra=event('validate.finished', expired=expired_count, checked=len(results),
+                                valid=len(results) - len(expired) - unchecked, unchecked=unchecked))
+        return expired_count
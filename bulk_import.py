@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Bulk account import from many cookie files at once.
+
+A source is a directory (every *.json file in it), a glob pattern, or an
+NDJSON file with one account per line, optionally .gz or .zst compressed as
+written by exporter.py ('-' reads NDJSON from stdin). Files
+are parsed and their cookies normalized in a process pool, accounts are
+written in batched transactions, and progress is checkpointed after every
+batch so an interrupted import resumes where it stopped.
+
+    python bulk_import.py SOURCE [--batch-size N] [--workers N] [--restart]
+
+A cookie file is any format the single-account import accepts; the account
+is named after the file (alice.json -> alice) unless the JSON is an object
+with a 'username' field. An NDJSON line is an object with 'username' and
+'cookies' in any of those formats, plus optional 'user_agent' and
+'display_name'.
+"""
+import argparse
+import glob
+import gzip
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import DEFAULT_USER_AGENT, IMPORT_BATCH_SIZE, IMPORT_CHECKPOINT_FILE
+from cookie_utils import cookies_from_json
+from database import AccountDatabase
+from log import setup_logging
+
+
+def _account_from_json(data: Any, default_username: Optional[str]) -> Dict[str, Any]:
+    """Build an import record from parsed JSON, or one with an 'error' key"""
+    username = default_username
+    user_agent = display_name = None
+    if isinstance(data, dict) and isinstance(data.get('username'), str):
+        username = data['username'].strip()
+        user_agent = data.get('user_agent')
+        display_name = data.get('display_name')
+        if 'cookies' in data:
+            data = data['cookies']
+        else:
+            data = {k: v for k, v in data.items() if k not in ('username', 'user_agent', 'display_name')}
+
+    if not username:
+        return {'error': "no username"}
+
+    cookies = cookies_from_json(data)
+    if not cookies:
+        return {'username': username, 'error': "no valid cookies"}
+
+    return {
+        'username': username,
+        'display_name': display_name,
+        'user_agent': user_agent or DEFAULT_USER_AGENT,
+        'cookies': cookies
+    }
+
+
+def parse_file(path: str) -> Dict[str, Any]:
+    """Parse one cookie file (runs in a worker process)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+    except (OSError, ValueError) as e:
+        return {'error': str(e)}
+    return _account_from_json(data, os.path.splitext(os.path.basename(path))[0])
+
+
+def parse_line(line: str) -> Dict[str, Any]:
+    """Parse one NDJSON line (runs in a worker process)"""
+    try:
+        data = json.loads(line)
+    except ValueError as e:
+        return {'error': str(e)}
+    return _account_from_json(data, None)
+
+
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl', '.ndjson.gz', '.jsonl.gz', '.ndjson.zst', '.jsonl.zst')
+
+
+def _read_lines(path: str) -> Iterator[str]:
+    # Exports written by exporter.py may be gzip or zstd compressed
+    if path.endswith('.gz'):
+        file = gzip.open(path, 'rt', encoding='utf-8')
+    elif path.endswith('.zst'):
+        import zstandard
+        file = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb')), encoding='utf-8')
+    else:
+        file = open(path, 'r', encoding='utf-8')
+    with file:
+        for line in file:
+            if line.strip():
+                yield line
+
+
+def _open_source(source: str) -> Tuple[str, Iterator[str]]:
+    """Return the parser kind ('file' or 'line') and the items of a source"""
+    if source == '-':
+        return 'line', (line for line in sys.stdin if line.strip())
+
+    if source.endswith(NDJSON_EXTENSIONS) and os.path.isfile(source):
+        return 'line', _read_lines(source)
+
+    if os.path.isdir(source):
+        pattern = os.path.join(source, '*.json')
+    else:
+        pattern = source
+    # Sorted so a resumed import sees the files in the same order
+    return 'file', iter(sorted(glob.glob(pattern, recursive=True)))
+
+
+def _load_checkpoint(path: str, source: str) -> Tuple[int, Dict[str, int]]:
+    """Items of `source` already imported and their counts, per the checkpoint file"""
+    stats = {'added': 0, 'updated': 0, 'failed': 0}
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            checkpoint = json.load(file)
+    except (OSError, ValueError):
+        return 0, stats
+    if checkpoint.get('source') != os.path.abspath(source):
+        print(f"⚠️  Ignoring checkpoint for a different source: {checkpoint.get('source')}")
+        return 0, stats
+    stats.update(checkpoint.get('stats', {}))
+    return int(checkpoint.get('position', 0)), stats
+
+
+def _save_checkpoint(path: str, source: str, position: int, stats: Dict[str, int]):
+    # Written to a temporary file and renamed, so a crash never leaves half a checkpoint
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump({'source': os.path.abspath(source), 'position': position, 'stats': stats}, file)
+    os.replace(temp_path, path)
+
+
+def _write_batch(db: AccountDatabase, records: List[Dict[str, Any]], stats: Dict[str, int]):
+    """Insert new accounts and update existing ones, one transaction each"""
+    accounts = [r for r in records if 'error' not in r]
+    stats['failed'] += len(records) - len(accounts)
+
+    # Results line up with the records, so a username repeated within the
+    # batch updates only with its later records, not the one just added
+    updates = []
+    for account, (_, result) in zip(accounts, db.add_accounts(accounts)):
+        if result == 'added':
+            stats['added'] += 1
+        elif result == 'exists':
+            updates.append((account['username'], account['cookies'], account['user_agent']))
+        else:
+            stats['failed'] += 1
+
+    for _, result in db.update_cookies_many(updates):
+        stats['updated' if result == 'updated' else 'failed'] += 1
+
+
+def bulk_import(source: str, db: Optional[AccountDatabase] = None, batch_size: int = IMPORT_BATCH_SIZE,
+                workers: Optional[int] = None, checkpoint_path: str = IMPORT_CHECKPOINT_FILE,
+                restart: bool = False) -> Dict[str, int]:
+    """
+    Import every account in `source`, resuming from the checkpoint unless
+    `restart` is set. Returns counts of added, updated and failed items.
+    """
+    db = db or AccountDatabase()
+    kind, items = _open_source(source)
+    parser = parse_file if kind == 'file' else parse_line
+
+    if restart:
+        position, stats = 0, {'added': 0, 'updated': 0, 'failed': 0}
+    else:
+        position, stats = _load_checkpoint(checkpoint_path, source)
+    if position:
+        print(f"⏩ Resuming after {position} already imported items")
+        items = islice(items, position, None)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            batch = list(islice(items, batch_size))
+            if not batch:
+                break
+
+            records = list(executor.map(parser, batch, chunksize=max(1, len(batch) // 32)))
+            for index, (item, record) in enumerate(zip(batch, records)):
+                if 'error' in record:
+                    label = item if kind == 'file' else f"record {position + index + 1}"
+                    print(f"⚠️  Skipped {label}: {record['error']}")
+            _write_batch(db, records, stats)
+
+            position += len(batch)
+            _save_checkpoint(checkpoint_path, source, position, stats)
+            print(f"📥 {position} items processed "
+                  f"({stats['added']} added, {stats['updated']} updated, {stats['failed']} failed)")
+
+    # A finished import needs no checkpoint; the next run starts fresh
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return stats
+
+
+def main(argv: List[str]) -> int:
+    """Command line entry point: bulk_import.py SOURCE [options]"""
+    parser = argparse.ArgumentParser(description="Import many accounts from cookie files or NDJSON")
+    parser.add_argument('source', help="directory, glob pattern, NDJSON file, or '-' for NDJSON on stdin")
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help="accounts per transaction")
+    parser.add_argument('--workers', type=int, help="parser processes (default: CPU count)")
+    parser.add_argument('--checkpoint', default=IMPORT_CHECKPOINT_FILE, help="checkpoint file path")
+    parser.add_argument('--restart', action='store_true', help="ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    with AccountDatabase() as db:
+        stats = bulk_import(args.source, db, batch_size=args.batch_size, workers=args.workers,
+                            checkpoint_path=args.checkpoint, restart=args.restart)
+    print(f"✅ Import finished: {stats['added']} added, {stats['updated']} updated, {stats['failed']} failed")
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Non-interactive command line interface for scripted and scheduled runs.
+
+    python main.py validate [selectors] [--concurrency N] [--timeout S] [--force] [--budget N]
+    python main.py list     [selectors] [--columns a,b,...]
+    python main.py import   SOURCE [--batch-size N] [--workers N] [--restart]
+    python main.py export   OUTPUT [--columns ...] [--active-only] [--updated-since T] [--watermark F]
+    python main.py refresh  [selectors] [--concurrency N] [--timeout S] [--interactive]
+    python main.py backup   [--dir DIR] [--no-compress]
+
+Nothing prompts. Results are printed to stdout as NDJSON, one object per
+account as soon as it is done; progress messages go to stderr. Selectors
+are usernames, --from-file (one per line, '-' for stdin), --prefix,
+--search, --active-only and --inactive-only; they combine as AND.
+
+Every command also takes --metrics [FILE] to write per-phase timings
+(p50/p95/p99) when it finishes, and the logging options --log-level,
+--log-module MODULE=LEVEL, --quiet (per-account progress is left out,
+summaries and failures remain), --log-format json and --log-file FILE.
+
+Exit codes: 0 everything succeeded, 1 some accounts are invalid or failed,
+2 usage or fatal error, 3 some accounts could not be checked (errors or
+timeouts) but none failed.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from contextlib import redirect_stdout
+from itertools import islice
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional
+
+from config import (
+    VALIDATION_CONCURRENCY, VALIDATION_TIMEOUT, LOGIN_TIMEOUT, IMPORT_BATCH_SIZE, BACKUP_DIR, METRICS_FILE
+)
+from database import AccountDatabase, ACCOUNT_COLUMNS
+import log
+import metrics
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_ERROR = 2
+EXIT_INCONCLUSIVE = 3
+
+COMMANDS = ('validate', 'list', 'import', 'export', 'refresh', 'backup')
+
+DEFAULT_LIST_COLUMNS = ('username', 'display_name', 'is_active', 'created_at', 'updated_at')
+
+
+class Output:
+    """Writes NDJSON result lines and keeps count of the outcomes"""
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+        self.failed = 0
+        self.inconclusive = 0
+
+    def emit(self, record: Dict[str, Any]):
+        self.stream.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        self.stream.flush()
+
+    def result(self, username: str, ok: Optional[bool], **fields):
+        """Emit one account's outcome; None means it could not be determined"""
+        if ok is False:
+            self.failed += 1
+        elif ok is None:
+            self.inconclusive += 1
+        self.emit({'username': username, 'ok': ok, **fields})
+
+    def exit_code(self) -> int:
+        if self.failed:
+            return EXIT_FAILED
+        if self.inconclusive:
+            return EXIT_INCONCLUSIVE
+        return EXIT_OK
+
+
+def _add_selectors(parser: argparse.ArgumentParser):
+    parser.add_argument('usernames', nargs='*', help="accounts to include (default: all)")
+    parser.add_argument('--from-file', metavar='FILE', help="read usernames from FILE, one per line ('-' for stdin)")
+    parser.add_argument('--prefix', help="only usernames starting with PREFIX")
+    parser.add_argument('--search', help="only accounts matching a username/display name search")
+    status = parser.add_mutually_exclusive_group()
+    status.add_argument('--active-only', action='store_true', help="only active accounts")
+    status.add_argument('--inactive-only', action='store_true', help="only inactive accounts")
+
+
+def _has_selectors(args: argparse.Namespace) -> bool:
+    return bool(args.usernames or args.from_file or args.prefix or args.search
+                or args.active_only or args.inactive_only)
+
+
+def select_usernames(db: AccountDatabase, args: argparse.Namespace, output: Output) -> Iterator[str]:
+    """
+    Stream the usernames matching the selectors. Explicitly named accounts
+    that don't exist are reported as failed results.
+    """
+    names = set(args.usernames)
+    if args.from_file:
+        file = sys.stdin if args.from_file == '-' else open(args.from_file, 'r', encoding='utf-8')
+        with file:
+            names.update(line.strip() for line in file if line.strip())
+    matches = None
+    if args.search:
+        matches = {a['username'] for a in db.search_accounts(args.search, limit=-1)}
+    prefix = args.prefix.lower() if args.prefix else None
+
+    seen = set()
+    for account in db.iter_accounts(['username', 'is_active'], active_only=args.active_only):
+        username = account['username']
+        if args.inactive_only and account['is_active']:
+            continue
+        if names and username not in names:
+            continue
+        if prefix and not username.lower().startswith(prefix):
+            continue
+        if matches is not None and username not in matches:
+            continue
+        seen.add(username)
+        yield username
+
+    for username in sorted(names - seen):
+        if not db.account_exists(username):
+            output.result(username, False, error="not found")
+
+
+async def _with_browser(db: AccountDatabase, action: Callable):
+    from browser_manager import RobloxBrowserManager
+
+    manager = RobloxBrowserManager(db)
+    try:
+        return await action(manager)
+    finally:
+        await manager.close()
+
+
+def cmd_validate(db: AccountDatabase, args: argparse.Namespace, output: Output) -> int:
+    """Validate sessions; expired ones are marked inactive"""
+    def report(username: str, is_valid: Optional[bool]):
+        output.result(username, is_valid, valid=is_valid)
+
+    async def run(manager):
+        if not _has_selectors(args):
+            # The whole active set, most at-risk first
+            await manager.clean_expired_sessions(
+                concurrency=args.concurrency, timeout=args.timeout, force=args.force,
+                budget=args.budget, on_result=report
+            )
+            return
+
+        usernames = select_usernames(db, args, output)
+        if args.budget is not None:
+            usernames = islice(usernames, max(0, args.budget))
+        results = await manager.validate_sessions_concurrently(
+            usernames, concurrency=args.concurrency, timeout=args.timeout, on_result=report, force=args.force
+        )
+        db.set_status_many({username: False for username, is_valid in results.items() if is_valid is False})
+
+    asyncio.run(_with_browser(db, run))
+    return output.exit_code()
+
+
+def cmd_list(db: AccountDatabase, args: argparse.Namespace, output: Output) -> int:
+    """List accounts as NDJSON"""
+    columns = [c.strip() for c in args.columns.split(',')] if args.columns else list(DEFAULT_LIST_COLUMNS)
+    unknown = [c for c in columns if c not in ACCOUNT_COLUMNS]
+    if unknown:
+        print(f"Unknown columns: {', '.join(unknown)}", file=sys.stderr)
+        return EXIT_ERROR
+
+    selected = set(select_usernames(db, args, output)) if _has_selectors(args) else None
+    for account in db.iter_accounts(columns + ['username'] if 'username' not in columns else columns):
+        if selected is None or account['username'] in selected:
+            output.emit({column: account[column] for column in columns})
+    return output.exit_code()
+
+
+def cmd_import(db: AccountDatabase, args: argparse.Namespace, output: Output) -> int:
+    """Bulk import from a directory, glob or NDJSON source"""
+    from bulk_import import bulk_import
+
+    stats = bulk_import(args.source, db, batch_size=args.batch_size, workers=args.workers, restart=args.restart)
+    output.emit({'import': args.source, **stats})
+    return EXIT_FAILED if stats['failed'] else EXIT_OK
+
+
+def cmd_export(db: AccountDatabase, args: argparse.Namespace, output: Output) -> int:
+    """Export accounts as NDJSON to a file"""
+    from exporter import export_accounts, to_sql_timestamp, DEFAULT_EXPORT_COLUMNS
+
+    if args.output == '-':
+        print("Use exporter.py to export to stdout; here stdout carries the command's results", file=sys.stderr)
+        return EXIT_ERROR
+
+    columns = [c.strip() for c in args.columns.split(',')] if args.columns else DEFAULT_EXPORT_COLUMNS
+    result = export_accounts(
+        args.output, db, columns=columns, active_only=args.active_only,
+        updated_since=to_sql_timestamp(args.updated_since) if args.updated_since else None,
+        watermark_path=args.watermark
+    )
+    output.emit({'export': args.output, **result})
+    return EXIT_OK
+
+
+def cmd_refresh(db: AccountDatabase, args: argparse.Namespace, output: Output) -> int:
+    """
+    Renew saved sessions headlessly, storing the cookies Roblox hands back.
+    With --interactive, open the login window for each account instead.
+    """
+    usernames = list(select_usernames(db, args, output))
+
+    async def run(manager):
+        if args.interactive:
+            # Someone has to log in, so one window at a time
+            for username in usernames:
+                try:
+                    ok = await asyncio.wait_for(manager.refresh_account_session(username), args.timeout)
+                except asyncio.TimeoutError:
+                    ok = None
+                if ok:
+                    db.update_account_status(username, True)
+                output.result(username, ok)
+            return
+
+        pending = iter(usernames)
+
+        async def worker():
+            for username in pending:
+                try:
+                    ok = await asyncio.wait_for(manager.renew_session(username), args.timeout)
+                except asyncio.TimeoutError:
+                    print(f"⏱️  {username}: Timed out after {args.timeout:g}s")
+                    ok = None
+                output.result(username, ok)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, args.concurrency))))
+
+    asyncio.run(_with_browser(db, run))
+    return output.exit_code()
+
+
+def cmd_backup(db: AccountDatabase, args: argparse.Namespace, output: Output) -> int:
+    """Take a database backup"""
+    from backup import create_backup
+
+    path = create_backup(db.db_path, args.dir, compress=not args.no_compress, source=db.conn)
+    output.emit({'backup': path})
+    return EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='main.py', description="Roblox Account Manager (non-interactive)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    # Options every command takes
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--metrics', metavar='FILE', nargs='?', const=METRICS_FILE,
+                        help="write per-phase timings to FILE (.prom/.txt: Prometheus text, otherwise JSON)")
+    log.add_arguments(common)
+
+    validate = commands.add_parser('validate', parents=[common], help="validate sessions and deactivate expired ones")
+    _add_selectors(validate)
+    validate.add_argument('--concurrency', type=int, default=VALIDATION_CONCURRENCY)
+    validate.add_argument('--timeout', type=float, default=VALIDATION_TIMEOUT, help="seconds per account")
+    validate.add_argument('--force', action='store_true', help="ignore cached validation results")
+    validate.add_argument('--budget', type=int, help="check at most N accounts: the N most at-risk, "
+                          "or the first N selected when there are selectors")
+    validate.set_defaults(handler=cmd_validate)
+
+    list_ = commands.add_parser('list', parents=[common], help="list accounts")
+    _add_selectors(list_)
+    list_.add_argument('--columns', help=f"comma-separated columns (default: {','.join(DEFAULT_LIST_COLUMNS)})")
+    list_.set_defaults(handler=cmd_list)
+
+    import_ = commands.add_parser('import', parents=[common], help="bulk import cookie files or NDJSON")
+    import_.add_argument('source', help="directory, glob pattern, NDJSON file, or '-' for stdin")
+    import_.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+    import_.add_argument('--workers', type=int)
+    import_.add_argument('--restart', action='store_true', help="ignore an existing checkpoint")
+    import_.set_defaults(handler=cmd_import)
+
+    export = commands.add_parser('export', parents=[common], help="export accounts as NDJSON")
+    export.add_argument('output', help="output file (.ndjson, .ndjson.gz, .ndjson.zst)")
+    export.add_argument('--columns')
+    export.add_argument('--active-only', action='store_true')
+    export.add_argument('--updated-since', metavar='TIME', help="ISO 8601, or @SECONDS for a Unix timestamp")
+    export.add_argument('--watermark', metavar='FILE')
+    export.set_defaults(handler=cmd_export)
+
+    refresh = commands.add_parser('refresh', parents=[common], help="renew saved sessions")
+    _add_selectors(refresh)
+    refresh.add_argument('--concurrency', type=int, default=VALIDATION_CONCURRENCY)
+    refresh.add_argument('--timeout', type=float, default=None,
+                         help=f"seconds per account (default: {VALIDATION_TIMEOUT}, "
+                              f"or {LOGIN_TIMEOUT} with --interactive)")
+    refresh.add_argument('--interactive', action='store_true', help="open the login window for each account")
+    refresh.set_defaults(handler=cmd_refresh)
+
+    backup = commands.add_parser('backup', parents=[common], help="take an online database backup")
+    backup.add_argument('--dir', default=BACKUP_DIR)
+    backup.add_argument('--no-compress', action='store_true')
+    backup.set_defaults(handler=cmd_backup)
+
+    return parser
+
+
+def main(argv: List[str]) -> int:
+    """Run one subcommand and return its exit code"""
+    args = build_parser().parse_args(argv)
+    if args.command == 'refresh' and args.timeout is None:
+        args.timeout = LOGIN_TIMEOUT if args.interactive else VALIDATION_TIMEOUT
+
+    if args.metrics:
+        metrics.enable()
+
+    output = Output(sys.stdout)
+    try:
+        # Log messages go to stderr too
+        log.setup_from_args(args, stream=sys.stderr)
+        # Progress messages printed along the way go to stderr, keeping
+        # stdout for NDJSON results
+        with redirect_stdout(sys.stderr), AccountDatabase() as db:
+            return args.handler(db, args, output)
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+        return EXIT_ERROR
+    except Exception as e:
+        output.emit({'error': str(e)})
+        return EXIT_ERROR
+    finally:
+        log.flush()
+        if metrics.is_enabled():
+            print(f"Phase timings written to {metrics.export(args.metrics or METRICS_FILE)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,25 +2,95 @@ import os
 
 # Database configuration
 DATABASE_NAME = "roblox_accounts.db"
+SQLITE_CACHE_SIZE = -16000  # negative = size in KiB (~16 MB page cache)
+SQLITE_STATEMENT_CACHE = 256  # prepared statements kept per connection
+SQLITE_BUSY_TIMEOUT = 5000  # ms to wait on a locked database
+MIGRATION_TIME_BUDGET = 5.0  # seconds a single schema migration may take before it is flagged
+ITER_BATCH_SIZE = 500  # rows fetched per round trip when streaming accounts
+ACCOUNTS_PAGE_SIZE = 20  # accounts shown per page in the menus
 
-# Roblox URLs
-ROBLOX_LOGIN_URL = "https://www.roblox.com/login"
-ROBLOX_HOME_URL = "https://www.roblox.com/"
-ROBLOX_GAMES_URL = "https://www.roblox.com/games"
+# Roblox URLs. ROBLOX_WEB_URL can point the browser at a local stand-in
+# server (see benchmarks/standin_server.py) for testing.
+ROBLOX_WEB_URL = os.environ.get("ROBLOX_WEB_URL", "https://www.roblox.com").rstrip('/')
+ROBLOX_LOGIN_URL = ROBLOX_WEB_URL + "/login"
+ROBLOX_HOME_URL = ROBLOX_WEB_URL + "/"
+ROBLOX_GAMES_URL = ROBLOX_WEB_URL + "/games"
+
+# Base URL of the users API used for browserless session checks. Point it at
+# a local stand-in server (e.g. http://127.0.0.1:8080) for testing.
+ROBLOX_USERS_API_URL = os.environ.get("ROBLOX_USERS_API_URL", "https://users.roblox.com")
 
 # Browser configuration
 BROWSER_ARGS = [
     '--disable-blink-features=AutomationControlled',
     '--disable-web-security',
     '--allow-running-insecure-content',
+    '--disable-dev-shm-usage',
     '--no-sandbox'
 ]
 
+# Browser pool: a warm browser is relaunched after serving this many contexts
+BROWSER_POOL_MAX_CONTEXTS = 50
+
 # Timeouts (in seconds)
 LOGIN_TIMEOUT = 300  # 5 minutes
+LOGIN_VERIFY_BUDGET = 15  # max seconds spent deciding whether a page is logged in
 PAGE_LOAD_TIMEOUT = 30
 BROWSER_LAUNCH_TIMEOUT = 60
 
+# Session validation
+VALIDATION_CONCURRENCY = 5  # accounts validated at the same time
+VALIDATION_TIMEOUT = 30  # seconds allowed per account
+HTTP_VALIDATION_TIMEOUT = 10  # seconds for a single browserless API request
+VALIDATION_CACHE_TTL = 3600  # seconds a validation result is trusted before checking again
+
+# Bulk import
+IMPORT_BATCH_SIZE = 500  # accounts written per transaction
+IMPORT_CHECKPOINT_FILE = "import_checkpoint.json"
+
+# Export
+EXPORT_BATCH_SIZE = 500  # accounts read (and cookies loaded) per query
+
+# Backups (online backup API, gzip-compressed, rotated after each backup)
+BACKUP_DIR = "backups"
+BACKUP_PAGES_PER_STEP = 256  # pages copied before letting writers in again
+BACKUP_STEP_PAUSE = 0.005  # seconds between backup steps
+BACKUP_MAX_RESTARTS = 3  # restarts caused by other writers before finishing in one step
+BACKUP_KEEP_LAST = 5  # most recent backups always kept
+BACKUP_KEEP_HOURLY = 24  # plus the newest backup of each of this many hours
+BACKUP_KEEP_DAILY = 7  # and of each of this many days
+
+# Lean headless profile for browser-based validation: the page is only loaded
+# so its cookies can be read, so nothing that doesn't affect them is fetched
+VALIDATION_LEAN_PROFILE = True  # set False to measure the full page load for comparison
+LEAN_BLOCKED_RESOURCE_TYPES = ['image', 'media', 'font', 'stylesheet', 'texttrack', 'manifest', 'eventsource', 'websocket']
+LEAN_ALLOWED_HOSTS = ['roblox.com']  # requests to any other host (and its subdomains) are blocked
+LEAN_VIEWPORT = {'width': 800, 'height': 600}
+
+# Validation queue priority: auth cookie expiry, time since last check and
+# consecutive failures are each scored and combined with these weights
+SCHEDULE_EXPIRY_HORIZON = 7 * 24 * 3600  # an auth cookie expiring this far out scores half of an imminent one
+SCHEDULE_MAX_STALENESS = 3  # cap, in multiples of VALIDATION_CACHE_TTL; never-checked accounts score this
+SCHEDULE_MAX_FAILURES = 3  # consecutive failures beyond this don't raise priority further
+SCHEDULE_WEIGHTS = {'expiry': 2.0, 'staleness': 1.0, 'failures': 1.0}
+
+# Timing spans (metrics.py): off unless ROBLOX_METRICS is set or --metrics is given
+METRICS_ENABLED = os.environ.get("ROBLOX_METRICS", "") not in ("", "0")
+METRICS_FILE = os.environ.get("ROBLOX_METRICS_FILE", "metrics.json")  # .prom or .txt for Prometheus text format
+METRICS_MAX_SAMPLES = 10000  # durations kept per phase for percentiles
+
+# Logging (log.py): records are written by a background thread
+LOG_LEVEL = os.environ.get("ROBLOX_LOG_LEVEL", "INFO")
+LOG_MODULE_LEVELS = os.environ.get("ROBLOX_LOG_MODULES", "")  # e.g. "database=DEBUG,browser_manager=WARNING"
+LOG_QUIET = os.environ.get("ROBLOX_LOG_QUIET", "") not in ("", "0")  # bulk operations log only summaries and failures
+LOG_FORMAT = os.environ.get("ROBLOX_LOG_FORMAT", "text")  # console output: text or json
+LOG_FILE = os.environ.get("ROBLOX_LOG_FILE") or None  # also write JSON lines here
+
+# Connectivity probe: run in the background at startup and cached
+CONNECTIVITY_CHECK_URL = "https://www.roblox.com/"
+CONNECTIVITY_CHECK_TIMEOUT = 5  # seconds
+CONNECTIVITY_CACHE_TTL = 60  # seconds a probe result is reused
+
 # User Agent
 DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 
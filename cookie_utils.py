@@ -0,0 +1,109 @@
+"""
+Cookie normalization shared by every path that stores cookies.
+
+Cookies are normalized once when they are written (import, login, refresh),
+so what the database holds can be handed to Playwright as-is: launch and
+validation do no per-cookie processing of their own.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+AUTH_COOKIE_NAME = '.ROBLOSECURITY'
+DEFAULT_DOMAIN = '.roblox.com'
+
+# sameSite spellings seen in browser exports, mapped to Playwright's values
+SAME_SITE_VALUES = {
+    'strict': 'Strict',
+    'lax': 'Lax',
+    'none': 'None',
+    'no_restriction': 'None',
+    'unspecified': 'Lax'
+}
+
+
+def is_roblox_domain(domain: str) -> bool:
+    """Whether a cookie domain is roblox.com or one of its subdomains"""
+    host = domain.lstrip('.').lower()
+    return host == 'roblox.com' or host.endswith('.roblox.com')
+
+
+def _expires(cookie: Dict[str, Any]) -> float:
+    # Browser extensions export 'expirationDate'; -1 marks a session cookie
+    value = cookie.get('expires', cookie.get('expirationDate'))
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return -1
+    return value if value > 0 else -1
+
+
+def normalize_cookie(cookie: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Turn a cookie from any supported source into a complete Playwright
+    cookie dict. Returns None for cookies that can't be used: no name or
+    value, or a domain other than roblox.com.
+    """
+    name = cookie.get('name')
+    value = cookie.get('value')
+    if not isinstance(name, str) or not name or value is None or value == '':
+        return None
+
+    domain = cookie.get('domain') or DEFAULT_DOMAIN
+    if not is_roblox_domain(domain):
+        return None
+
+    same_site = SAME_SITE_VALUES.get(str(cookie.get('sameSite') or '').lower(), 'Lax')
+    normalized = {
+        'name': name,
+        'value': str(value),
+        'domain': domain,
+        'path': cookie.get('path') or '/',
+        'expires': _expires(cookie),
+        'httpOnly': bool(cookie.get('httpOnly', False)),
+        # Chromium rejects SameSite=None cookies that aren't secure
+        'secure': bool(cookie.get('secure', True)) or same_site == 'None',
+        'sameSite': same_site
+    }
+
+    if name == AUTH_COOKIE_NAME:
+        normalized.update(domain=DEFAULT_DOMAIN, secure=True, httpOnly=True, sameSite='None')
+
+    return normalized
+
+
+def normalize_cookies(cookies: Optional[Iterable[Any]]) -> List[Dict[str, Any]]:
+    """
+    Normalize a cookie list, dropping unusable entries. When the same
+    (name, domain, path) appears more than once, the last one wins.
+    """
+    normalized: Dict[tuple, Dict[str, Any]] = {}
+    for cookie in cookies or []:
+        if not isinstance(cookie, dict):
+            continue
+        clean = normalize_cookie(cookie)
+        if clean:
+            normalized[(clean['name'], clean['domain'], clean['path'])] = clean
+    return list(normalized.values())
+
+
+def cookies_from_json(json_data: Any) -> List[Dict[str, Any]]:
+    """
+    Extract normalized cookies from any supported JSON export: a list of
+    cookie objects, a simple {name: value} object, or an object holding
+    either under 'cookies' or 'sessionData'.
+    """
+    if isinstance(json_data, list):
+        # Format 1: Array of cookie objects
+        return normalize_cookies(json_data)
+
+    if isinstance(json_data, dict):
+        # Format 2: Simple key-value object
+        if all(isinstance(v, str) for v in json_data.values()):
+            return normalize_cookies({'name': name, 'value': value} for name, value in json_data.items())
+
+        # Format 3: Complex object, look for cookies in common locations
+        if 'cookies' in json_data:
+            return cookies_from_json(json_data['cookies'])
+        if 'sessionData' in json_data:
+            return cookies_from_json(json_data['sessionData'])
+
+    return []
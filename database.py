@@ -1,85 +1,350 @@
 import sqlite3
+import hashlib
 import json
 import os
-from datetime import datetime
-from typing import List, Dict, Optional
+import threading
+import time
+from contextlib import contextmanager
+from collections.abc import Mapping
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Sequence, Tuple
+from config import (
+    DATABASE_NAME, SQLITE_CACHE_SIZE, SQLITE_STATEMENT_CACHE, SQLITE_BUSY_TIMEOUT, ITER_BATCH_SIZE,
+    ACCOUNTS_PAGE_SIZE, VALIDATION_CACHE_TTL, SCHEDULE_EXPIRY_HORIZON, SCHEDULE_MAX_STALENESS,
+    SCHEDULE_MAX_FAILURES, SCHEDULE_WEIGHTS
+)
+from cookie_utils import AUTH_COOKIE_NAME, normalize_cookies
+from metrics import timed
+from log import get_logger, event
+import backup
+import migrations
+
+logger = get_logger(__name__)
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+SQL_VARIABLE_CHUNK = 500
+
+# Display format for dates, applied in SQL
+DISPLAY_DATE_FORMAT = '%Y-%m-%d %H:%M'
+
+COOKIE_COLUMNS = "account_id, name, domain, path, value, expires, http_only, secure, same_site"
+
+def _like_prefix(text: str) -> str:
+    """LIKE pattern matching values that start with `text` (use with ESCAPE '\\')"""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+def cookie_fingerprint(cookies: Optional[List[Dict]]) -> str:
+    """Stable hash of a cookie set, used to tell whether cookies changed"""
+    digest = hashlib.sha256()
+    for name, domain, path, value in sorted(
+        (c.get('name', ''), c.get('domain', ''), c.get('path', '/'), c.get('value', '')) for c in cookies or []
+    ):
+        digest.update(f"{name}\0{domain}\0{path}\0{value}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def _storage_json(storage_state: Optional[Dict]) -> Optional[str]:
+    """Serialize saved browser storage without its cookies, which have their own table"""
+    if not storage_state:
+        return None
+    return json.dumps({key: value for key, value in storage_state.items() if key != 'cookies'})
+
+def _cookie_to_row(account_id: int, cookie: Dict) -> Tuple:
+    """Flatten a Playwright-style cookie dict into a cookies table row"""
+    expires = cookie.get('expires')
+    if expires is not None:
+        try:
+            expires = float(expires)
+        except (TypeError, ValueError):
+            expires = None
+        # -1 (and anything non-positive) marks a session cookie
+        if expires is not None and expires <= 0:
+            expires = None
+    
+    def flag(key):
+        return None if cookie.get(key) is None else int(bool(cookie[key]))
+    
+    return (
+        account_id,
+        cookie['name'],
+        cookie.get('domain') or '',
+        cookie.get('path') or '/',
+        cookie.get('value', ''),
+        expires,
+        flag('httpOnly'),
+        flag('secure'),
+        cookie.get('sameSite')
+    )
+
+def _cookie_from_row(row: sqlite3.Row) -> Dict:
+    """Rebuild a Playwright cookie dict from a cookies table row (stored normalized)"""
+    return {
+        'name': row['name'],
+        'value': row['value'],
+        'domain': row['domain'],
+        'path': row['path'],
+        'expires': row['expires'] if row['expires'] is not None else -1,
+        'httpOnly': bool(row['http_only']),
+        'secure': bool(row['secure']),
+        'sameSite': row['same_site'] or 'Lax'
+    }
+
+# Columns iter_accounts() can project; 'cookies' is loaded from the cookies table
+ACCOUNT_COLUMNS = (
+    'id', 'username', 'display_name', 'user_agent', 'session_data', 'storage_state',
+    'is_active', 'created_at', 'updated_at', 'cookies'
+)
+JSON_COLUMNS = ('session_data', 'storage_state')
+
+_NOT_LOADED = object()
+
+class LazyAccount(Mapping):
+    """
+    Read-only account row that decodes JSON fields and loads cookies only
+    when they are first read
+    """
+    __slots__ = ('_db', '_values')
+    
+    def __init__(self, db: "AccountDatabase", values: Dict[str, Any]):
+        self._db = db
+        self._values = values
+    
+    def __getitem__(self, key: str) -> Any:
+        value = self._values[key]
+        if value is _NOT_LOADED:
+            value = self._db.get_cookies(self._values['id'])
+            self._values[key] = value
+        elif key in JSON_COLUMNS and isinstance(value, str):
+            value = json.loads(value)
+            self._values[key] = value
+        return value
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+    
+    def __len__(self) -> int:
+        return len(self._values)
+    
+    def __repr__(self) -> str:
+        return f"LazyAccount(id={self._values.get('id')}, username={self._values.get('username')!r})"
 
 class AccountDatabase:
-    def __init__(self, db_path: str = "roblox_accounts.db"):
+    def __init__(self, db_path: str = DATABASE_NAME):
         """Initialize the database"""
         self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
         self.init_database()
     
+    def __enter__(self) -> "AccountDatabase":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open and tune the shared connection"""
+        # isolation_level=None leaves transaction control to _transaction()
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=SQLITE_STATEMENT_CACHE
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is durable across application crashes in WAL mode and avoids
+        # an fsync on every commit
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size={int(SQLITE_CACHE_SIZE)}")
+        conn.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The persistent connection, opened on first use"""
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            return self._conn
+    
+    @contextmanager
+    def _reading(self) -> Iterator[sqlite3.Connection]:
+        """Serialize access to the shared connection for a read"""
+        with self._lock:
+            yield self.conn
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block inside one write transaction. Nested use joins the
+        outer transaction instead of committing early.
+        """
+        with self._lock:
+            conn = self.conn
+            if conn.in_transaction:
+                yield conn
+                return
+            
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+    
+    def close(self):
+        """Close the persistent connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
     def init_database(self):
-        """Initialize the database and create tables if they don't exist"""
+        """Initialize the database and bring its schema up to date"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute('''
-                    CREATE TABLE IF NOT EXISTS accounts (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        username TEXT UNIQUE NOT NULL,
-                        display_name TEXT,
-                        cookies TEXT,
-                        user_agent TEXT,
-                        session_data TEXT,
-                        is_active BOOLEAN DEFAULT 1,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                # Create index for faster searches
-                conn.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_username ON accounts(username)
-                ''')
-                
-                conn.commit()
+            with self._lock:
+                migrations.migrate(self.conn)
         except Exception as e:
-            print(f"Error initializing database: {e}")
+            logger.error("Error initializing database: %s", e, extra=event('db.error', operation='init_database'))
             raise
     
+    def _write_cookies(self, conn: sqlite3.Connection, cookies_by_account: Dict[int, Optional[List[Dict]]]):
+        """Replace the stored cookie set of each given account, normalizing it on the way in"""
+        conn.executemany(
+            "DELETE FROM cookies WHERE account_id = ?",
+            [(account_id,) for account_id in cookies_by_account]
+        )
+        conn.executemany(
+            f"INSERT OR REPLACE INTO cookies ({COOKIE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [_cookie_to_row(account_id, cookie)
+             for account_id, cookies in cookies_by_account.items()
+             for cookie in normalize_cookies(cookies)]
+        )
+    
+    def _load_cookies(self, conn: sqlite3.Connection, account_ids: List[int]) -> Dict[int, List[Dict]]:
+        """Fetch the cookies of the given accounts, keyed by account id"""
+        cookies: Dict[int, List[Dict]] = {}
+        for start in range(0, len(account_ids), SQL_VARIABLE_CHUNK):
+            chunk = account_ids[start:start + SQL_VARIABLE_CHUNK]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor = conn.execute(
+                f"SELECT {COOKIE_COLUMNS} FROM cookies WHERE account_id IN ({placeholders}) "
+                f"ORDER BY account_id, rowid",
+                chunk
+            )
+            for row in cursor:
+                cookies.setdefault(row['account_id'], []).append(_cookie_from_row(row))
+        return cookies
+    
+    @timed('db.get_cookies')
+    def get_cookies(self, account_id: int) -> Optional[List[Dict]]:
+        """Get all stored cookies of an account by id"""
+        try:
+            with self._reading() as conn:
+                return self._load_cookies(conn, [account_id]).get(account_id)
+        except Exception as e:
+            logger.error("Error getting cookies: %s", e, extra=event('db.error', operation='get_cookies'))
+            return None
+    
+    @timed('db.get_cookies_many')
+    def get_cookies_many(self, account_ids: List[int]) -> Dict[int, List[Dict]]:
+        """Get the cookies of many accounts in one query per chunk, keyed by account id"""
+        try:
+            with self._reading() as conn:
+                return self._load_cookies(conn, account_ids)
+        except Exception as e:
+            logger.error("Error getting cookies: %s", e, extra=event('db.error', operation='get_cookies_many'))
+            return {}
+    
+    @timed('db.get_cookie')
+    def get_cookie(self, username: str, name: str = AUTH_COOKIE_NAME) -> Optional[Dict]:
+        """Get a single stored cookie of an account, by default the auth cookie"""
+        try:
+            with self._reading() as conn:
+                row = conn.execute(f'''
+                    SELECT {COOKIE_COLUMNS} FROM cookies
+                    WHERE account_id = (SELECT id FROM accounts WHERE username = ?) AND name = ?
+                    ORDER BY expires DESC
+                    LIMIT 1
+                ''', (username, name)).fetchone()
+                return _cookie_from_row(row) if row else None
+        except Exception as e:
+            logger.error("Error getting cookie: %s", e, extra=event('db.error', operation='get_cookie'))
+            return None
+    
+    @timed('db.get_accounts_expiring_within')
+    def get_accounts_expiring_within(self, seconds: float, name: str = AUTH_COOKIE_NAME) -> List[Dict]:
+        """
+        Get accounts whose cookie `name` expires within the given number of
+        seconds (already expired ones included), soonest first
+        """
+        try:
+            with self._reading() as conn:
+                cursor = conn.execute('''
+                    SELECT a.id, a.username, a.is_active, MIN(c.expires) AS expires
+                    FROM cookies c JOIN accounts a ON a.id = c.account_id
+                    WHERE c.name = ? AND c.expires IS NOT NULL AND c.expires <= ?
+                    GROUP BY a.id
+                    ORDER BY expires
+                ''', (name, time.time() + seconds))
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error("Error getting expiring accounts: %s", e,
+                         extra=event('db.error', operation='get_accounts_expiring_within'))
+            return []
+    
+    @timed('db.account_exists')
     def account_exists(self, username: str) -> bool:
         """Check if an account with the given username exists"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._reading() as conn:
                 cursor = conn.execute(
                     "SELECT 1 FROM accounts WHERE username = ?",
                     (username,)
                 )
                 return cursor.fetchone() is not None
         except Exception as e:
-            print(f"Error checking if account exists: {e}")
+            logger.error("Error checking if account exists: %s", e,
+                         extra=event('db.error', operation='account_exists'))
             return False
     
+    @timed('db.add_account')
     def add_account(self, username: str, display_name: Optional[str] = None, 
                    cookies: Optional[List[Dict]] = None, user_agent: Optional[str] = None, 
-                   session_data: Optional[Dict] = None) -> bool:
-        """Add a new account to the database"""
+                   session_data: Optional[Dict] = None, storage_state: Optional[Dict] = None) -> bool:
+        """
+        Add a new account to the database. `storage_state` is the browser
+        storage to restore with the session (Playwright storage_state plus
+        sessionStorage); its cookies are ignored in favour of `cookies`.
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cookies_json = json.dumps(cookies) if cookies else None
-                session_json = json.dumps(session_data) if session_data else None
-                
-                conn.execute('''
+            session_json = json.dumps(session_data) if session_data else None
+            
+            with self._transaction() as conn:
+                cursor = conn.execute('''
                     INSERT INTO accounts 
-                    (username, display_name, cookies, user_agent, session_data)
+                    (username, display_name, user_agent, session_data, storage_state)
                     VALUES (?, ?, ?, ?, ?)
-                ''', (username, display_name, cookies_json, user_agent, session_json))
+                ''', (username, display_name, user_agent, session_json, _storage_json(storage_state)))
                 
-                conn.commit()
+                if cookies:
+                    self._write_cookies(conn, {cursor.lastrowid: cookies})
                 return True
         except sqlite3.IntegrityError:
-            print(f"Account '{username}' already exists!")
+            logger.warning("Account '%s' already exists!", username, extra=event('db.duplicate', username=username))
             return False
         except Exception as e:
-            print(f"Error adding account: {e}")
+            logger.error("Error adding account: %s", e, extra=event('db.error', operation='add_account'))
             return False
     
+    @timed('db.get_account')
     def get_account(self, username: str) -> Optional[Dict]:
         """Get account data by username"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._reading() as conn:
                 cursor = conn.execute('''
                     SELECT * FROM accounts WHERE username = ?
                 ''', (username,))
@@ -87,198 +352,638 @@ class AccountDatabase:
                 row = cursor.fetchone()
                 if row:
                     account = dict(row)
+                    account['cookies'] = self._load_cookies(conn, [account['id']]).get(account['id'])
                     # Parse JSON fields
-                    if account['cookies']:
-                        account['cookies'] = json.loads(account['cookies'])
                     if account['session_data']:
                         account['session_data'] = json.loads(account['session_data'])
+                    if account['storage_state']:
+                        account['storage_state'] = json.loads(account['storage_state'])
                     return account
                 return None
         except Exception as e:
-            print(f"Error getting account: {e}")
+            logger.error("Error getting account: %s", e, extra=event('db.error', operation='get_account'))
             return None
     
+    @timed('db.get_all_accounts')
     def get_all_accounts(self) -> List[Dict]:
         """Get all accounts from the database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._reading() as conn:
                 cursor = conn.execute('''
-                    SELECT id, username, display_name, is_active, created_at, updated_at
+                    SELECT id, username, display_name, is_active,
+                           COALESCE(strftime(?, created_at), created_at) AS created_at, updated_at
                     FROM accounts 
-                    ORDER BY created_at DESC
-                ''')
-                
-                accounts = []
-                for row in cursor.fetchall():
-                    account = dict(row)
-                    # Format the date for better display
-                    if account['created_at']:
-                        try:
-                            dt = datetime.fromisoformat(account['created_at'])
-                            account['created_at'] = dt.strftime("%Y-%m-%d %H:%M")
-                        except:
-                            pass
-                    accounts.append(account)
-                
-                return accounts
+                    ORDER BY accounts.created_at DESC
+                ''', (DISPLAY_DATE_FORMAT,))
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error("Error getting all accounts: %s", e, extra=event('db.error', operation='get_all_accounts'))
+            return []
+    
+    @timed('db.get_accounts_page')
+    def get_accounts_page(self, limit: int = ACCOUNTS_PAGE_SIZE, after: Optional[Tuple[str, int]] = None,
+                          before: Optional[Tuple[str, int]] = None, prefix: Optional[str] = None) -> List[Dict]:
+        """
+        Get one newest-first page of account summaries using keyset
+        pagination on (created_at, id).
+        
+        Every row carries a `page_key`; pass the last row's key as `after`
+        for the next page or the first row's key as `before` for the
+        previous one. `prefix` limits the listing to usernames starting
+        with it (case-insensitive).
+        """
+        conditions = []
+        values: List[Any] = [DISPLAY_DATE_FORMAT]
+        
+        if prefix:
+            conditions.append("username LIKE ? ESCAPE '\\'")
+            values.append(_like_prefix(prefix))
+        
+        if after is not None:
+            conditions.append("(created_at, id) < (?, ?)")
+            values.extend(after)
+        elif before is not None:
+            conditions.append("(created_at, id) > (?, ?)")
+            values.extend(before)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # Walk backwards from `before` and flip the page back afterwards
+        order = "ASC" if before is not None and after is None else "DESC"
+        values.append(limit)
+        
+        try:
+            with self._reading() as conn:
+                cursor = conn.execute(f'''
+                    SELECT id, username, display_name, is_active, created_at AS created_raw,
+                           COALESCE(strftime(?, created_at), created_at) AS created_at
+                    FROM accounts
+                    {where}
+                    ORDER BY accounts.created_at {order}, id {order}
+                    LIMIT ?
+                ''', values)
+                rows = cursor.fetchall()
+            
+            accounts = []
+            for row in rows:
+                account = dict(row)
+                account['page_key'] = (account.pop('created_raw'), account['id'])
+                accounts.append(account)
+            
+            if order == "ASC":
+                accounts.reverse()
+            return accounts
+        except Exception as e:
+            logger.error("Error getting accounts page: %s", e, extra=event('db.error', operation='get_accounts_page'))
+            return []
+    
+    def _has_search_index(self, conn: sqlite3.Connection) -> bool:
+        """Whether the FTS5 search table exists (it is skipped on SQLite builds without FTS5)"""
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'accounts_fts'"
+        ).fetchone() is not None
+    
+    @timed('db.search_accounts')
+    def search_accounts(self, query: str, limit: int = ACCOUNTS_PAGE_SIZE) -> List[Dict]:
+        """
+        Find accounts whose username or display name has words starting
+        with every term of `query`, best matches first
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        
+        try:
+            with self._reading() as conn:
+                if self._has_search_index(conn):
+                    # Quote each term so FTS5 syntax in user input is taken literally
+                    match = ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
+                    cursor = conn.execute('''
+                        SELECT a.id, a.username, a.display_name, a.is_active,
+                               COALESCE(strftime(?, a.created_at), a.created_at) AS created_at
+                        FROM accounts_fts f JOIN accounts a ON a.id = f.rowid
+                        WHERE accounts_fts MATCH ?
+                        ORDER BY f.rank, a.username
+                        LIMIT ?
+                    ''', (DISPLAY_DATE_FORMAT, match, limit))
+                else:
+                    conditions = []
+                    values: List[Any] = [DISPLAY_DATE_FORMAT]
+                    for term in terms:
+                        pattern = _like_prefix(term)
+                        conditions.append(
+                            "(username LIKE ? ESCAPE '\\' OR display_name LIKE ? ESCAPE '\\' "
+                            "OR display_name LIKE ? ESCAPE '\\')"
+                        )
+                        values.extend([pattern, pattern, '% ' + pattern])
+                    values.append(limit)
+                    cursor = conn.execute(f'''
+                        SELECT id, username, display_name, is_active,
+                               COALESCE(strftime(?, created_at), created_at) AS created_at
+                        FROM accounts
+                        WHERE {' AND '.join(conditions)}
+                        ORDER BY username
+                        LIMIT ?
+                    ''', values)
+                return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
-            print(f"Error getting all accounts: {e}")
+            logger.error("Error searching accounts: %s", e, extra=event('db.error', operation='search_accounts'))
             return []
     
+    @timed('db.update_account')
     def update_account(self, username: str, display_name: Optional[str] = None,
                       cookies: Optional[List[Dict]] = None, user_agent: Optional[str] = None,
-                      session_data: Optional[Dict] = None) -> bool:
+                      session_data: Optional[Dict] = None, storage_state: Optional[Dict] = None) -> bool:
         """Update account data"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                updates = []
-                values = []
-                
-                if display_name is not None:
-                    updates.append("display_name = ?")
-                    values.append(display_name)
-                
-                if cookies is not None:
-                    updates.append("cookies = ?")
-                    values.append(json.dumps(cookies))
-                
-                if user_agent is not None:
-                    updates.append("user_agent = ?")
-                    values.append(user_agent)
-                
-                if session_data is not None:
-                    updates.append("session_data = ?")
-                    values.append(json.dumps(session_data))
-                
-                if not updates:
-                    return True
-                
-                updates.append("updated_at = CURRENT_TIMESTAMP")
-                values.append(username)
-                
+            updates = []
+            values = []
+            
+            if display_name is not None:
+                updates.append("display_name = ?")
+                values.append(display_name)
+            
+            if user_agent is not None:
+                updates.append("user_agent = ?")
+                values.append(user_agent)
+            
+            if session_data is not None:
+                updates.append("session_data = ?")
+                values.append(json.dumps(session_data))
+            
+            if storage_state is not None:
+                updates.append("storage_state = ?")
+                values.append(_storage_json(storage_state))
+            
+            if not updates and cookies is None:
+                return True
+            
+            updates.append("updated_at = CURRENT_TIMESTAMP")
+            values.append(username)
+            
+            with self._transaction() as conn:
                 query = f"UPDATE accounts SET {', '.join(updates)} WHERE username = ?"
-                conn.execute(query, values)
-                conn.commit()
+                cursor = conn.execute(query, values)
+                if cursor.rowcount == 0:
+                    return False
                 
-                return conn.total_changes > 0
+                if cookies is not None:
+                    account_ids = self._account_ids(conn, [username])
+                    self._write_cookies(conn, {account_ids[username]: cookies})
+                return True
         except Exception as e:
-            print(f"Error updating account: {e}")
+            logger.error("Error updating account: %s", e, extra=event('db.error', operation='update_account'))
             return False
     
+    @timed('db.update_account_status')
     def update_account_status(self, username: str, is_active: bool) -> bool:
         """Update account active status"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute('''
+            with self._transaction() as conn:
+                cursor = conn.execute('''
                     UPDATE accounts 
                     SET is_active = ?, updated_at = CURRENT_TIMESTAMP
                     WHERE username = ?
                 ''', (is_active, username))
                 
-                conn.commit()
-                return conn.total_changes > 0
+                return cursor.rowcount > 0
         except Exception as e:
-            print(f"Error updating account status: {e}")
+            logger.error("Error updating account status: %s", e,
+                         extra=event('db.error', operation='update_account_status'))
             return False
     
+    @timed('db.set_status_many')
+    def set_status_many(self, statuses: Dict[str, bool]) -> List[Tuple[str, str]]:
+        """
+        Update the active status of many accounts in a single transaction.
+        Returns (username, 'updated' | 'not_found') for every entry.
+        """
+        if not statuses:
+            return []
+        
+        try:
+            with self._transaction() as conn:
+                existing = self._account_ids(conn, statuses)
+                conn.executemany('''
+                    UPDATE accounts 
+                    SET is_active = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE username = ?
+                ''', [(is_active, username) for username, is_active in statuses.items() if username in existing])
+                
+            return [(username, 'updated' if username in existing else 'not_found') for username in statuses]
+        except Exception as e:
+            logger.error("Error updating account statuses: %s", e,
+                         extra=event('db.error', operation='set_status_many'))
+            return [(username, 'error') for username in statuses]
+    
+    @timed('db.remove_account')
     def remove_account(self, username: str) -> bool:
         """Remove an account from the database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("DELETE FROM accounts WHERE username = ?", (username,))
-                conn.commit()
-                return conn.total_changes > 0
+            with self._transaction() as conn:
+                cursor = conn.execute("DELETE FROM accounts WHERE username = ?", (username,))
+                return cursor.rowcount > 0
         except Exception as e:
-            print(f"Error removing account: {e}")
+            logger.error("Error removing account: %s", e, extra=event('db.error', operation='remove_account'))
             return False
     
+    def _account_ids(self, conn: sqlite3.Connection, usernames: Iterable[str]) -> Dict[str, int]:
+        """Map the given usernames that are already stored to their account ids"""
+        usernames = list(dict.fromkeys(usernames))
+        account_ids = {}
+        for start in range(0, len(usernames), SQL_VARIABLE_CHUNK):
+            chunk = usernames[start:start + SQL_VARIABLE_CHUNK]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor = conn.execute(
+                f"SELECT username, id FROM accounts WHERE username IN ({placeholders})", chunk
+            )
+            account_ids.update((row[0], row[1]) for row in cursor)
+        return account_ids
+    
+    @timed('db.add_accounts')
+    def add_accounts(self, accounts: Iterable[Dict[str, Any]]) -> List[Tuple[str, str]]:
+        """
+        Add many accounts in one transaction. Each item takes the same keys
+        as add_account(). Returns (username, 'added' | 'exists') for every
+        item; repeats of a username within the batch count as 'exists'.
+        """
+        accounts = list(accounts)
+        if not accounts:
+            return []
+        
+        try:
+            with self._transaction() as conn:
+                existing = set(self._account_ids(conn, (a['username'] for a in accounts)))
+                
+                results = []
+                rows = []
+                new_cookies = {}
+                for account in accounts:
+                    username = account['username']
+                    if username in existing:
+                        results.append((username, 'exists'))
+                        continue
+                    
+                    existing.add(username)
+                    session_data = account.get('session_data')
+                    rows.append((
+                        username,
+                        account.get('display_name'),
+                        account.get('user_agent'),
+                        json.dumps(session_data) if session_data else None
+                    ))
+                    if account.get('cookies'):
+                        new_cookies[username] = account['cookies']
+                    results.append((username, 'added'))
+                
+                conn.executemany('''
+                    INSERT INTO accounts 
+                    (username, display_name, user_agent, session_data)
+                    VALUES (?, ?, ?, ?)
+                ''', rows)
+                
+                if new_cookies:
+                    account_ids = self._account_ids(conn, new_cookies)
+                    self._write_cookies(conn, {account_ids[u]: c for u, c in new_cookies.items()})
+                
+            return results
+        except Exception as e:
+            logger.error("Error adding accounts: %s", e, extra=event('db.error', operation='add_accounts'))
+            return [(account['username'], 'error') for account in accounts]
+    
+    @timed('db.update_cookies_many')
+    def update_cookies_many(self, updates: Iterable[Tuple[str, List[Dict], str]]) -> List[Tuple[str, str]]:
+        """
+        Update cookies and user agent for many accounts in one transaction.
+        Takes (username, cookies, user_agent) tuples and returns
+        (username, 'updated' | 'not_found') for every one.
+        """
+        updates = list(updates)
+        if not updates:
+            return []
+        
+        try:
+            with self._transaction() as conn:
+                existing = self._account_ids(conn, (u[0] for u in updates))
+                conn.executemany(
+                    """UPDATE accounts 
+                       SET user_agent = ?, updated_at = CURRENT_TIMESTAMP, is_active = 1
+                       WHERE username = ?""",
+                    [(user_agent, username) for username, _, user_agent in updates if username in existing]
+                )
+                # Later entries for the same username win, as with sequential updates
+                self._write_cookies(conn, {
+                    existing[username]: cookies for username, cookies, _ in updates if username in existing
+                })
+                
+            return [(username, 'updated' if username in existing else 'not_found') for username, _, _ in updates]
+        except Exception as e:
+            logger.error("Error updating account cookies: %s", e,
+                         extra=event('db.error', operation='update_cookies_many'))
+            return [(username, 'error') for username, _, _ in updates]
+    
+    @timed('db.remove_accounts')
+    def remove_accounts(self, usernames: Iterable[str]) -> List[Tuple[str, str]]:
+        """
+        Remove many accounts in one transaction. Returns
+        (username, 'removed' | 'not_found') for every username.
+        """
+        usernames = list(usernames)
+        if not usernames:
+            return []
+        
+        try:
+            with self._transaction() as conn:
+                existing = self._account_ids(conn, usernames)
+                conn.executemany(
+                    "DELETE FROM accounts WHERE username = ?",
+                    [(username,) for username in existing]
+                )
+            
+            results = []
+            removed = set()
+            for username in usernames:
+                if username in existing and username not in removed:
+                    removed.add(username)
+                    results.append((username, 'removed'))
+                else:
+                    results.append((username, 'not_found'))
+            return results
+        except Exception as e:
+            logger.error("Error removing accounts: %s", e, extra=event('db.error', operation='remove_accounts'))
+            return [(username, 'error') for username in usernames]
+    
+    @timed('db.get_active_accounts')
     def get_active_accounts(self) -> List[Dict]:
         """Get only active accounts"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._reading() as conn:
                 cursor = conn.execute('''
                     SELECT * FROM accounts 
                     WHERE is_active = 1 
                     ORDER BY created_at DESC
                 ''')
+                rows = cursor.fetchall()
+                cookies = self._load_cookies(conn, [row['id'] for row in rows])
+            
+            accounts = []
+            for row in rows:
+                account = dict(row)
+                account['cookies'] = cookies.get(account['id'])
+                # Parse JSON fields
+                if account['session_data']:
+                    account['session_data'] = json.loads(account['session_data'])
+                if account['storage_state']:
+                    account['storage_state'] = json.loads(account['storage_state'])
+                accounts.append(account)
+            
+            return accounts
+        except Exception as e:
+            logger.error("Error getting active accounts: %s", e,
+                         extra=event('db.error', operation='get_active_accounts'))
+            return []
+    
+    @timed('db.get_validation')
+    def get_validation(self, account_id: int) -> Optional[Dict]:
+        """Get the last recorded validation result of an account"""
+        try:
+            with self._reading() as conn:
+                row = conn.execute(
+                    "SELECT * FROM validation_results WHERE account_id = ?", (account_id,)
+                ).fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            logger.error("Error getting validation result: %s", e,
+                         extra=event('db.error', operation='get_validation'))
+            return None
+    
+    @timed('db.record_validations')
+    def record_validations(self, records: List[Dict]) -> int:
+        """
+        Store validation results in one transaction, replacing older ones.
+        Anything but a 'valid' outcome extends the account's failure streak.
+        """
+        if not records:
+            return 0
+        
+        try:
+            with self._transaction() as conn:
+                conn.executemany('''
+                    INSERT INTO validation_results
+                    (account_id, checked_at, outcome, method, user_id, cookie_fingerprint, failures)
+                    VALUES (:account_id, :checked_at, :outcome, :method, :user_id, :cookie_fingerprint,
+                            CASE WHEN :outcome = 'valid' THEN 0 ELSE 1 END)
+                    ON CONFLICT(account_id) DO UPDATE SET
+                        checked_at = excluded.checked_at,
+                        outcome = excluded.outcome,
+                        method = excluded.method,
+                        user_id = excluded.user_id,
+                        cookie_fingerprint = excluded.cookie_fingerprint,
+                        failures = CASE WHEN excluded.outcome = 'valid' THEN 0
+                                        ELSE validation_results.failures + 1 END
+                ''', records)
+            return len(records)
+        except Exception as e:
+            logger.error("Error recording validation results: %s", e,
+                         extra=event('db.error', operation='record_validations'))
+            return 0
+    
+    @timed('db.expire_accounts_locally')
+    def expire_accounts_locally(self, now: Optional[float] = None, name: str = AUTH_COOKIE_NAME) -> List[str]:
+        """
+        Mark active accounts inactive when none of their auth cookies is still
+        unexpired, going only by the stored expiry times. Returns the usernames.
+        """
+        now = time.time() if now is None else now
+        try:
+            with self._transaction() as conn:
+                rows = conn.execute('''
+                    SELECT a.id, a.username FROM accounts a
+                    WHERE a.is_active = 1 AND NOT EXISTS (
+                        SELECT 1 FROM cookies c
+                        WHERE c.account_id = a.id AND c.name = ? AND (c.expires IS NULL OR c.expires > ?)
+                    )
+                ''', (name, now)).fetchall()
+                if not rows:
+                    return []
                 
-                accounts = []
-                for row in cursor.fetchall():
-                    account = dict(row)
-                    # Parse JSON fields
-                    if account['cookies']:
-                        account['cookies'] = json.loads(account['cookies'])
-                    if account['session_data']:
-                        account['session_data'] = json.loads(account['session_data'])
-                    accounts.append(account)
-                
-                return accounts
+                conn.executemany(
+                    "UPDATE accounts SET is_active = 0, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    [(row['id'],) for row in rows]
+                )
+                self.record_validations([{
+                    'account_id': row['id'],
+                    'checked_at': now,
+                    'outcome': 'invalid',
+                    'method': 'local expiry',
+                    'user_id': None,
+                    'cookie_fingerprint': None
+                } for row in rows])
+            return [row['username'] for row in rows]
         except Exception as e:
-            print(f"Error getting active accounts: {e}")
+            logger.error("Error expiring accounts: %s", e,
+                         extra=event('db.error', operation='expire_accounts_locally'))
             return []
     
+    @timed('db.get_validation_queue')
+    def get_validation_queue(self, limit: Optional[int] = None, now: Optional[float] = None,
+                             name: str = AUTH_COOKIE_NAME) -> List[Dict]:
+        """
+        Active accounts ordered by how urgently they need validating. The
+        priority adds up three weighted scores (see SCHEDULE_* in config):
+        how close the auth cookie is to expiring, how long since the last
+        check, and how many checks in a row have failed. With `limit`, only
+        the most urgent accounts are returned.
+        """
+        now = time.time() if now is None else now
+        try:
+            with self._reading() as conn:
+                rows = conn.execute('''
+                    SELECT a.username, e.expires AS auth_expires, v.checked_at,
+                           COALESCE(v.failures, 0) AS failures,
+                           (CASE WHEN e.expires IS NULL THEN 0.0
+                                 ELSE 1.0 / (1.0 + MAX(e.expires - :now, 0) / :horizon) END) * :w_expiry
+                           + MIN(COALESCE((:now - v.checked_at) / :ttl, :max_stale), :max_stale) * :w_stale
+                           + MIN(COALESCE(v.failures, 0), :max_failures) * :w_failures AS priority
+                    FROM accounts a
+                    LEFT JOIN (
+                        SELECT account_id, MAX(expires) AS expires FROM cookies
+                        WHERE name = :name GROUP BY account_id
+                    ) e ON e.account_id = a.id
+                    LEFT JOIN validation_results v ON v.account_id = a.id
+                    WHERE a.is_active = 1
+                    ORDER BY priority DESC, a.id
+                    LIMIT :limit
+                ''', {
+                    'now': now,
+                    'name': name,
+                    'horizon': float(SCHEDULE_EXPIRY_HORIZON),
+                    'ttl': float(VALIDATION_CACHE_TTL),
+                    'max_stale': float(SCHEDULE_MAX_STALENESS),
+                    'max_failures': SCHEDULE_MAX_FAILURES,
+                    'w_expiry': SCHEDULE_WEIGHTS['expiry'],
+                    'w_stale': SCHEDULE_WEIGHTS['staleness'],
+                    'w_failures': SCHEDULE_WEIGHTS['failures'],
+                    'limit': -1 if limit is None else limit
+                }).fetchall()
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error("Error building validation queue: %s", e,
+                         extra=event('db.error', operation='get_validation_queue'))
+            return []
+    
+    def iter_accounts(self, columns: Optional[Sequence[str]] = None, active_only: bool = False,
+                      batch_size: int = ITER_BATCH_SIZE,
+                      updated_since: Optional[str] = None) -> Iterator[LazyAccount]:
+        """
+        Stream accounts in id order without loading them all at once.
+        
+        Only the requested columns are selected (`id` is always included).
+        Rows are fetched in keyset-paginated batches, so the connection is
+        free between batches and memory use does not grow with the number
+        of accounts. JSON fields and cookies are decoded on first access.
+        `updated_since` ('YYYY-MM-DD HH:MM:SS', UTC like updated_at) keeps
+        only accounts updated at or after that time.
+        """
+        columns = list(columns) if columns else list(ACCOUNT_COLUMNS)
+        unknown = [c for c in columns if c not in ACCOUNT_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown account columns: {', '.join(unknown)}")
+        
+        want_cookies = 'cookies' in columns
+        select = ['id'] + [c for c in columns if c not in ('id', 'cookies')]
+        query = f"SELECT {', '.join(select)} FROM accounts WHERE id > ?"
+        params: List[Any] = []
+        if active_only:
+            query += " AND is_active = 1"
+        if updated_since is not None:
+            query += " AND updated_at >= ?"
+            params.append(updated_since)
+        query += " ORDER BY id LIMIT ?"
+        
+        last_id = 0
+        while True:
+            with self._reading() as conn:
+                rows = conn.execute(query, (last_id, *params, batch_size)).fetchall()
+            if not rows:
+                return
+            
+            for row in rows:
+                values = dict(zip(select, row))
+                if want_cookies:
+                    values['cookies'] = _NOT_LOADED
+                yield LazyAccount(self, values)
+            
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+    
+    @timed('db.cleanup_inactive_accounts')
     def cleanup_inactive_accounts(self) -> int:
         """Remove accounts that are marked as inactive"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.execute("DELETE FROM accounts WHERE is_active = 0")
-                conn.commit()
                 return cursor.rowcount
         except Exception as e:
-            print(f"Error cleaning up inactive accounts: {e}")
+            logger.error("Error cleaning up inactive accounts: %s", e,
+                         extra=event('db.error', operation='cleanup_inactive_accounts'))
             return 0
     
+    @timed('db.get_account_count')
     def get_account_count(self) -> Dict[str, int]:
         """Get count of total and active accounts"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("SELECT COUNT(*) as total FROM accounts")
-                total = cursor.fetchone()[0]
-                
-                cursor = conn.execute("SELECT COUNT(*) as active FROM accounts WHERE is_active = 1")
-                active = cursor.fetchone()[0]
+            with self._reading() as conn:
+                cursor = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(is_active = 1), 0) FROM accounts"
+                )
+                total, active = cursor.fetchone()
                 
                 return {"total": total, "active": active}
         except Exception as e:
-            print(f"Error getting account count: {e}")
+            logger.error("Error getting account count: %s", e, extra=event('db.error', operation='get_account_count'))
             return {"total": 0, "active": 0}
     
+    @timed('db.update_account_cookies')
     def update_account_cookies(self, username: str, cookies: List[Dict], user_agent: str) -> bool:
         """Update cookies and user agent for an existing account"""
         try:
-            cookies_json = json.dumps(cookies) if cookies else None
-            
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.execute(
                     """UPDATE accounts 
-                       SET cookies = ?, user_agent = ?, updated_at = CURRENT_TIMESTAMP, is_active = 1
+                       SET user_agent = ?, updated_at = CURRENT_TIMESTAMP, is_active = 1
                        WHERE username = ?""",
-                    (cookies_json, user_agent, username)
+                    (user_agent, username)
                 )
-                
-                if cursor.rowcount > 0:
-                    conn.commit()
-                    return True
-                else:
+                if cursor.rowcount == 0:
                     return False
+                
+                account_ids = self._account_ids(conn, [username])
+                self._write_cookies(conn, {account_ids[username]: cookies})
+                return True
                     
         except Exception as e:
-            print(f"Error updating account cookies: {e}")
+            logger.error("Error updating account cookies: %s", e,
+                         extra=event('db.error', operation='update_account_cookies'))
             return False
     
+    @timed('db.backup_database')
     def backup_database(self, backup_path: Optional[str] = None) -> bool:
-        """Create a backup of the database"""
-        if backup_path is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = f"roblox_accounts_backup_{timestamp}.db"
-        
+        """
+        Create a backup of the database with the online backup API. Without
+        a path, a compressed backup goes to BACKUP_DIR under the rotation
+        policy (see backup.py).
+        """
         try:
-            import shutil
-            shutil.copy2(self.db_path, backup_path)
-            print(f"Database backed up to: {backup_path}")
+            # Backing up through the shared connection means the app's own
+            # writes don't restart the backup
+            if backup_path is None:
+                backup_path = backup.create_backup(self.db_path, source=self.conn)
+            else:
+                backup.copy_database(self.conn, backup_path)
+            logger.info("Database backed up to: %s", backup_path, extra=event('db.backup', path=backup_path))
             return True
         except Exception as e:
-            print(f"Error creating database backup: {e}")
+            logger.error("Error creating database backup: %s", e,
+                         extra=event('db.error', operation='backup_database'))
             return False
\ No newline at end of file
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Streaming account export to NDJSON.
+
+Accounts are read from the database in keyset-paginated batches and written
+one JSON object per line, so memory use stays flat however many accounts are
+exported. Output ending in .gz is gzip-compressed and .zst uses zstandard
+(if installed); '-' writes to stdout. The default columns produce lines
+bulk_import.py reads back directly.
+
+    python exporter.py OUTPUT [--columns a,b,...] [--active-only]
+                              [--updated-since TIME] [--watermark FILE]
+
+With --watermark, only accounts updated since the previous export that used
+the same watermark file are written, and the file is moved forward after a
+successful export. Removed accounts are not part of incremental exports.
+"""
+import argparse
+import gzip
+import io
+import json
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, IO, List, Optional, Sequence
+
+from config import EXPORT_BATCH_SIZE
+from database import AccountDatabase, ACCOUNT_COLUMNS
+from log import setup_logging
+
+DEFAULT_EXPORT_COLUMNS = ('username', 'display_name', 'user_agent', 'is_active', 'updated_at', 'cookies')
+
+# Same layout as SQLite's CURRENT_TIMESTAMP, which fills updated_at (UTC)
+SQL_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def to_sql_timestamp(value: str) -> str:
+    """
+    Convert a user-supplied time into the UTC 'YYYY-MM-DD HH:MM:SS' form
+    updated_at uses. Takes ISO 8601 (a year, year-month, date or datetime;
+    UTC unless it has an offset) or a Unix timestamp prefixed with '@', so
+    '2020' is the year 2020 and '@2020' the 2020th second of 1970.
+    Raises ValueError for anything else.
+    """
+    text = value.strip()
+    try:
+        if text.startswith('@'):
+            return datetime.fromtimestamp(float(text[1:]), tz=timezone.utc).strftime(SQL_TIMESTAMP_FORMAT)
+        if re.fullmatch(r'\d{4}(-\d{2})?', text):
+            # Year or year-month: from the start of it
+            text += '-01' * (2 - text.count('-'))
+        moment = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except (ValueError, OverflowError, OSError):
+        raise ValueError(f"Not an ISO 8601 time or @unix-timestamp: {value}") from None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).strftime(SQL_TIMESTAMP_FORMAT)
+
+
+def open_output(path: str) -> IO[str]:
+    """Open an export destination as text, compressed according to its extension"""
+    if path == '-':
+        # A duplicate of the stdout descriptor, so closing the export leaves stdout open
+        return io.TextIOWrapper(os.fdopen(os.dup(sys.stdout.fileno()), 'wb'), encoding='utf-8')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+    if path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd output needs the 'zstandard' package (pip install zstandard)")
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(open(path, 'wb')), encoding='utf-8')
+    return open(path, 'w', encoding='utf-8')
+
+
+def read_watermark(path: str) -> Optional[str]:
+    """The updated_at time the previous export covered, if any"""
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file).get('updated_at')
+    except (OSError, ValueError):
+        return None
+
+
+def write_watermark(path: str, updated_at: str, count: int):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump({'updated_at': updated_at, 'exported': count}, file)
+    os.replace(temp_path, path)
+
+
+def export_accounts(output: str, db: Optional[AccountDatabase] = None,
+                    columns: Sequence[str] = DEFAULT_EXPORT_COLUMNS, active_only: bool = False,
+                    updated_since: Optional[str] = None, watermark_path: Optional[str] = None,
+                    batch_size: int = EXPORT_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Write accounts to `output` as NDJSON and return the number exported and
+    the watermark for the next incremental export. `updated_since` is an
+    updated_at time as produced by to_sql_timestamp(); a watermark file,
+    when given and present, takes its place.
+    """
+    db = db or AccountDatabase()
+    columns = list(columns)
+    unknown = [c for c in columns if c not in ACCOUNT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown account columns: {', '.join(unknown)}")
+
+    if watermark_path:
+        updated_since = read_watermark(watermark_path) or updated_since
+
+    # Taken before reading, so accounts changed during the export are picked
+    # up again next time. Comparisons are inclusive (>=) because updated_at
+    # has one-second resolution; re-importing a repeated account is harmless.
+    next_watermark = datetime.now(timezone.utc).strftime(SQL_TIMESTAMP_FORMAT)
+
+    want_cookies = 'cookies' in columns
+    select = [c for c in columns if c != 'cookies']
+    accounts = db.iter_accounts(select or ['id'], active_only=active_only, batch_size=batch_size,
+                                updated_since=updated_since)
+
+    count = 0
+    with open_output(output) as out:
+        batch: List[Any] = []
+
+        def flush():
+            cookies = db.get_cookies_many([a['id'] for a in batch]) if want_cookies else {}
+            for account in batch:
+                record = {column: account[column] for column in select}
+                if want_cookies:
+                    record['cookies'] = cookies.get(account['id'], [])
+                out.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+                out.write('\n')
+            batch.clear()
+
+        for account in accounts:
+            batch.append(account)
+            if len(batch) >= batch_size:
+                count += len(batch)
+                flush()
+        count += len(batch)
+        flush()
+
+    if watermark_path:
+        write_watermark(watermark_path, next_watermark, count)
+
+    return {'exported': count, 'watermark': next_watermark}
+
+
+def main(argv: List[str]) -> int:
+    """Command line entry point: exporter.py OUTPUT [options]"""
+    parser = argparse.ArgumentParser(description="Export accounts as NDJSON")
+    parser.add_argument('output', help="output file (.ndjson, .ndjson.gz, .ndjson.zst) or '-' for stdout")
+    parser.add_argument('--columns', help=f"comma-separated columns (default: {','.join(DEFAULT_EXPORT_COLUMNS)})")
+    parser.add_argument('--active-only', action='store_true', help="only export active accounts")
+    parser.add_argument('--updated-since', metavar='TIME',
+                        help="only accounts updated since TIME (ISO 8601, or @SECONDS for a Unix timestamp)")
+    parser.add_argument('--watermark', metavar='FILE',
+                        help="incremental export: start from and update the watermark in FILE")
+    args = parser.parse_args(argv)
+    setup_logging(stream=sys.stderr)
+
+    columns = [c.strip() for c in args.columns.split(',')] if args.columns else DEFAULT_EXPORT_COLUMNS
+
+    try:
+        updated_since = to_sql_timestamp(args.updated_since) if args.updated_since else None
+        with AccountDatabase() as db:
+            result = export_accounts(args.output, db, columns=columns, active_only=args.active_only,
+                                     updated_since=updated_since, watermark_path=args.watermark)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    # Keep stdout clean when it carries the export itself
+    print(f"✅ Exported {result['exported']} accounts (watermark {result['watermark']} UTC)",
+          file=sys.stderr if args.output == '-' else sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
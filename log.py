@@ -0,0 +1,221 @@
+"""
+Structured, leveled logging that never blocks the caller.
+
+Modules log through loggers under the `roblox_manager` namespace and tag
+records with an event name and fields:
+
+    logger = get_logger(__name__)
+    logger.info("✅ %s: Session renewed", username, extra=event('session.renewed', bulk=True, username=username))
+
+Records go onto an in-memory queue and are formatted and written by a
+QueueListener on a background thread, so a bulk run never waits on the
+terminal. The console shows the plain message, as print() did, or one JSON
+object per record with LOG_FORMAT=json; LOG_FILE always gets JSON lines
+(time, level, module, event, message and the event's fields).
+
+Levels are set for everything (LOG_LEVEL) and per module (LOG_MODULE_LEVELS,
+e.g. ROBLOX_LOG_MODULES="database=DEBUG,browser_manager=WARNING"). Records
+marked bulk=True are the per-item lines of bulk operations (one per account
+or cookie); in quiet mode the console drops those below WARNING, leaving
+summaries and failures. Until setup_logging() runs, only warnings and
+errors are shown, on stderr.
+"""
+import argparse
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import IO, Any, Dict, Optional
+
+from config import LOG_LEVEL, LOG_MODULE_LEVELS, LOG_QUIET, LOG_FORMAT, LOG_FILE
+
+ROOT_LOGGER = 'roblox_manager'
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+FLUSH_TIMEOUT = 2.0  # seconds flush() waits for the writer thread
+
+_listener: Optional["_Listener"] = None
+_lock = threading.Lock()
+_bulk_kept = True  # False when quiet mode drops bulk records from every destination
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for module `name` (pass __name__)"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def event(name: str, bulk: bool = False, **fields) -> Dict[str, Any]:
+    """
+    `extra` for a structured record. `bulk` marks a per-item line of a bulk
+    operation, which quiet mode leaves out unless it is a warning or error.
+    """
+    return {'event': name, 'bulk': bulk, 'fields': fields}
+
+
+def will_emit(logger: logging.Logger, level: int, bulk: bool = False) -> bool:
+    """
+    Whether a record logged now would be written anywhere, for skipping work
+    that only feeds a log line
+    """
+    if not logger.isEnabledFor(level):
+        return False
+    return _bulk_kept or not bulk or level >= logging.WARNING
+
+
+def parse_level(name: str) -> int:
+    level = logging.getLevelName(str(name).strip().upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level: {name}")
+    return level
+
+
+def parse_module_levels(spec: str) -> Dict[str, int]:
+    """'database=DEBUG,browser_manager=WARNING' -> {'database': 10, 'browser_manager': 30}"""
+    levels = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        module, separator, level = item.partition('=')
+        if not separator or not module.strip():
+            raise ValueError(f"Expected MODULE=LEVEL, got: {item.strip()}")
+        levels[module.strip()] = parse_level(level)
+    return levels
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': round(record.created, 3),
+            'level': record.levelname,
+            'module': record.name[len(ROOT_LOGGER) + 1:] if record.name.startswith(ROOT_LOGGER + '.') else record.name,
+            'event': getattr(record, 'event', None),
+            'message': record.getMessage(),
+            **getattr(record, 'fields', {})
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class QuietFilter(logging.Filter):
+    """Drops the per-item records of bulk operations, except warnings and errors"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or not getattr(record, 'bulk', False)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so the record is passed on as
+        # is and formatted on the writer thread instead of the caller's
+        return record
+
+
+class _Listener(QueueListener):
+    def handle(self, record):
+        if isinstance(record, threading.Event):
+            record.set()  # flush() marker: everything before it is written
+            return
+        super().handle(record)
+
+
+def setup_logging(level: str = LOG_LEVEL, module_levels: Optional[Dict[str, int]] = None,
+                  quiet: bool = LOG_QUIET, stream: Optional[IO[str]] = None,
+                  log_format: str = LOG_FORMAT, log_file: Optional[str] = LOG_FILE, console: bool = True):
+    """
+    Route every roblox_manager logger through the background writer. The
+    console gets `stream` (default stdout) unless `console` is False;
+    `log_file`, if set, gets JSON lines. Calling it again replaces the
+    previous setup.
+    """
+    global _listener, _bulk_kept
+    shutdown_logging()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(parse_level(level))
+    for module, module_level in {**parse_module_levels(LOG_MODULE_LEVELS), **(module_levels or {})}.items():
+        get_logger(module).setLevel(module_level)
+
+    handlers = []
+    if console:
+        handler = logging.StreamHandler(stream or sys.stdout)
+        handler.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter('%(message)s'))
+        if quiet:
+            handler.addFilter(QuietFilter())
+        handlers.append(handler)
+    if log_file:
+        handler = logging.FileHandler(log_file, encoding='utf-8')
+        handler.setFormatter(JsonFormatter())
+        handlers.append(handler)
+
+    _bulk_kept = bool(log_file) or (console and not quiet)
+    root.propagate = False
+    if not handlers:
+        root.addHandler(logging.NullHandler())
+        return
+
+    log_queue = queue.SimpleQueue()
+    root.addHandler(_QueueHandler(log_queue))
+    with _lock:
+        _listener = _Listener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def flush(timeout: float = FLUSH_TIMEOUT):
+    """Wait until everything logged so far is written, e.g. before prompting the user"""
+    listener = _listener
+    if listener is None:
+        return
+    marker = threading.Event()
+    listener.queue.put_nowait(marker)
+    marker.wait(timeout)
+
+
+def shutdown_logging():
+    """Write out whatever is still queued and stop the writer thread"""
+    global _listener, _bulk_kept
+    with _lock:
+        listener, _listener = _listener, None
+    _bulk_kept = True
+
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.propagate = True
+
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(shutdown_logging)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """The logging options shared by the menu and every subcommand"""
+    parser.add_argument('--log-level', type=str.upper, choices=LEVELS, default=LOG_LEVEL.upper(),
+                        help=f"least severe messages shown (default: {LOG_LEVEL.upper()})")
+    parser.add_argument('--log-module', action='append', default=[], metavar='MODULE=LEVEL',
+                        help="level for one module, e.g. database=DEBUG (repeatable)")
+    parser.add_argument('-q', '--quiet', action='store_true', default=LOG_QUIET,
+                        help="bulk operations report only summaries and failures")
+    parser.add_argument('--log-format', choices=('text', 'json'), default=LOG_FORMAT,
+                        help="console output as plain text or one JSON object per line")
+    parser.add_argument('--log-file', metavar='FILE', default=LOG_FILE, help="also write JSON lines to FILE")
+
+
+def setup_from_args(args: argparse.Namespace, stream: Optional[IO[str]] = None):
+    """setup_logging() with the options from add_arguments()"""
+    setup_logging(
+        level=args.log_level,
+        module_levels=parse_module_levels(','.join(args.log_module)),
+        quiet=args.quiet,
+        stream=stream,
+        log_format=args.log_format,
+        log_file=args.log_file
+    )
@@ -1,19 +1,33 @@
 #!/usr/bin/env python3
 
+import argparse
 import asyncio
 import os
 import sys
-from colorama import init, Fore, Style
+from colorama import Fore, Style
 from database import AccountDatabase
 from browser_manager import RobloxBrowserManager
+from typing import Optional
+from config import ACCOUNTS_PAGE_SIZE, METRICS_FILE
+from cookie_utils import cookies_from_json
+from backup import start_backup
+from utils import setup_colors, start_connectivity_probe, probe_internet_connection
+import cli
+import log
+import metrics
 
 # Initialize colorama for Windows
-init(autoreset=True)
+setup_colors()
 
 class RobloxAccountManager:
-    def __init__(self):
+    def __init__(self, force_validation: bool = False, validation_budget: Optional[int] = None):
         self.db = AccountDatabase()
-        self.browser_manager = RobloxBrowserManager()
+        self.browser_manager = RobloxBrowserManager(self.db)
+        # Re-check every account even if it was validated recently
+        self.force_validation = force_validation
+        # Most accounts checked over the network per validation run
+        self.validation_budget = validation_budget
+        self._backup_thread = None
     
     def display_header(self):
         """Display the application header"""
@@ -25,6 +39,8 @@ class RobloxAccountManager:
     
     def display_menu(self):
         """Display the main menu"""
+        # Anything still queued for the console comes before the menu
+        log.flush()
         print(f"\n{Fore.CYAN}{Style.BRIGHT}MAIN MENU:")
         print(f"{Fore.WHITE}1. {Fore.GREEN}Add New Account")
         print(f"{Fore.WHITE}2. {Fore.BLUE}List All Accounts")
@@ -34,6 +50,7 @@ class RobloxAccountManager:
         print(f"{Fore.WHITE}6. {Fore.CYAN}Validate Sessions")
         print(f"{Fore.WHITE}7. {Fore.YELLOW}Refresh Account Session")
         print(f"{Fore.WHITE}8. {Fore.GREEN}Import Account from JSON")
+        print(f"{Fore.WHITE}9. {Fore.BLUE}Backup Database")
         print(f"{Fore.WHITE}0. {Fore.RED}Exit")
         print(f"{Style.DIM}-" * 30)
     
@@ -141,7 +158,7 @@ class RobloxAccountManager:
                 success = self.db.update_account_cookies(username, cookies, user_agent)
                 action = "updated"
             else:
-                success = self.db.add_account(username, user_agent, cookies)
+                success = self.db.add_account(username, cookies=cookies, user_agent=user_agent)
                 action = "added"
             
             if success:
@@ -160,71 +177,13 @@ class RobloxAccountManager:
         except Exception as e:
             print(f"\n{Fore.RED}✗ Error importing account: {str(e)}")
     
-    def _sanitize_cookie(self, cookie_data):
-        """Sanitize a single cookie to ensure proper format"""
-        # Normalize sameSite value
-        same_site = cookie_data.get('sameSite', 'Lax')
-        if same_site not in ['Strict', 'Lax', 'None']:
-            same_site = 'Lax'
-        
-        # Clean and validate cookie
-        clean_cookie = {
-            'name': cookie_data.get('name', ''),
-            'value': cookie_data.get('value', ''),
-            'domain': cookie_data.get('domain', '.roblox.com'),
-            'path': cookie_data.get('path', '/'),
-            'secure': bool(cookie_data.get('secure', True)),
-            'httpOnly': bool(cookie_data.get('httpOnly', False)),
-            'sameSite': same_site
-        }
-        
-        # Fix domain if needed
-        if not clean_cookie['domain'].endswith('roblox.com'):
-            clean_cookie['domain'] = '.roblox.com'
-            
-        return clean_cookie
-    
     def _convert_json_to_cookies(self, json_data):
         """Convert various JSON formats to standard cookie format"""
-        cookies = []
-        
         try:
-            if isinstance(json_data, list):
-                # Format 1: Array of cookie objects
-                for item in json_data:
-                    if isinstance(item, dict) and 'name' in item and item.get('value'):
-                        cookie = self._sanitize_cookie(item)
-                        if cookie['name'] and cookie['value']:
-                            cookies.append(cookie)
-            
-            elif isinstance(json_data, dict):
-                # Check if it's a simple key-value format
-                if all(isinstance(v, str) for v in json_data.values()):
-                    # Format 2: Simple key-value object
-                    for name, value in json_data.items():
-                        cookie_data = {
-                            'name': name,
-                            'value': value,
-                            'domain': '.roblox.com',
-                            'path': '/',
-                            'secure': True,
-                            'httpOnly': False,
-                            'sameSite': 'Lax'
-                        }
-                        cookie = self._sanitize_cookie(cookie_data)
-                        cookies.append(cookie)
-                else:
-                    # Format 3: Complex object, try to extract cookies
-                    # Look for cookies in common locations
-                    if 'cookies' in json_data:
-                        return self._convert_json_to_cookies(json_data['cookies'])
-                    elif 'sessionData' in json_data:
-                        return self._convert_json_to_cookies(json_data['sessionData'])
-        
+            return cookies_from_json(json_data)
         except Exception as e:
             print(f"{Fore.YELLOW}⚠️  Warning during cookie conversion: {str(e)}")
-        
-        return cookies
+            return []
     
     async def _test_imported_session(self, username):
         """Test the imported session by validating login"""
@@ -243,12 +202,10 @@ class RobloxAccountManager:
     def list_accounts(self):
         """List all saved accounts"""
         print(f"\n{Fore.CYAN}{Style.BRIGHT}SAVED ACCOUNTS")
-        accounts = self.db.get_all_accounts()
-        
-        if not accounts:
-            print(f"{Fore.YELLOW}No accounts found. Add an account first.")
-            return
-        
+        self._browse_accounts()
+    
+    def _print_account_rows(self, accounts):
+        """Print one page of account summaries"""
         print(f"{Fore.WHITE}{'ID':<5} {'Username':<20} {'Added Date':<20} {'Status'}")
         print(f"{Style.DIM}" + "-" * 70)
         
@@ -256,102 +213,147 @@ class RobloxAccountManager:
             status = f"{Fore.GREEN}Active" if account['is_active'] else f"{Fore.RED}Inactive"
             print(f"{Fore.WHITE}{i:<5} {account['username']:<20} {account['created_at']:<20} {status}")
     
-    async def launch_account(self):
-        """Launch Roblox with selected account"""
-        accounts = self.db.get_all_accounts()
-        if not accounts:
+    def _browse_accounts(self, action=None):
+        """
+        Page through accounts, newest first, or search them by username and
+        display name. With an `action` (e.g. "launch") the user picks an
+        account by its number in the list and its summary is returned;
+        otherwise the listing is browse-only.
+        """
+        if self.db.get_account_count()['total'] == 0:
             print(f"{Fore.YELLOW}No accounts found. Add an account first.")
-            return
+            return None
+        
+        prefix = None
+        search = None
+        page = 1
+        accounts = self.db.get_accounts_page()
         
+        while True:
+            if accounts:
+                self._print_account_rows(accounts)
+            elif search:
+                print(f"{Fore.YELLOW}No accounts match '{search}'.")
+            else:
+                print(f"{Fore.YELLOW}No accounts match '{prefix}'.")
+            
+            # Search results are a single best-match list, only listings page
+            has_next = not search and len(accounts) == ACCOUNTS_PAGE_SIZE
+            has_prev = not search and page > 1
+            
+            options = []
+            if action and accounts:
+                options.append(f"number to {action}")
+            options.append("text to search")
+            if has_next:
+                options.append("n = next page")
+            if has_prev:
+                options.append("p = previous page")
+            options.append("/text = usernames starting with text")
+            options.append("Enter = back")
+            
+            if search:
+                print(f"{Style.DIM}Search results for '{search}'")
+            else:
+                print(f"{Style.DIM}Page {page}{f' (prefix: {prefix})' if prefix else ''}")
+            choice = input(f"\n{Fore.WHITE}{', '.join(options)}: ").strip()
+            
+            if not choice:
+                return None
+            elif choice.lower() == 'n' and has_next:
+                next_page = self.db.get_accounts_page(after=accounts[-1]['page_key'], prefix=prefix)
+                if next_page:
+                    accounts = next_page
+                    page += 1
+                else:
+                    print(f"{Fore.YELLOW}No more accounts.")
+            elif choice.lower() == 'p' and has_prev:
+                accounts = self.db.get_accounts_page(before=accounts[0]['page_key'], prefix=prefix)
+                page -= 1
+            elif choice.startswith('/'):
+                prefix = choice[1:].strip() or None
+                search = None
+                accounts = self.db.get_accounts_page(prefix=prefix)
+                page = 1
+            elif choice.isdigit() and action:
+                index = int(choice)
+                if 1 <= index <= len(accounts):
+                    return accounts[index - 1]
+                print(f"{Fore.RED}Invalid choice!")
+            else:
+                search = choice
+                accounts = self.db.search_accounts(search)
+                # A single hit is picked straight away
+                if action and len(accounts) == 1:
+                    print(f"{Fore.CYAN}Found: {accounts[0]['username']}")
+                    return accounts[0]
+    
+    async def launch_account(self):
+        """Launch Roblox with selected account"""
         print(f"\n{Fore.CYAN}{Style.BRIGHT}LAUNCH ACCOUNT")
-        self.list_accounts()
+        account_summary = self._browse_accounts("launch")
+        if not account_summary:
+            return
         
         try:
-            choice = int(input(f"\n{Fore.WHITE}Enter account number to launch: "))
-            if 1 <= choice <= len(accounts):
-                account_summary = accounts[choice - 1]
-                # Get full account data including cookies
-                account = self.db.get_account(account_summary['username'])
-                if not account:
-                    print(f"{Fore.RED}✗ Account data not found!")
-                    return
-                
-                print(f"\n{Fore.YELLOW}Launching Roblox for account: {account['username']}")
-                
-                success = await self.browser_manager.launch_with_account(account)
-                if success:
-                    print(f"{Fore.GREEN}✓ Successfully launched Roblox!")
-                else:
-                    print(f"{Fore.RED}✗ Failed to launch Roblox")
+            # Get full account data including cookies
+            account = self.db.get_account(account_summary['username'])
+            if not account:
+                print(f"{Fore.RED}✗ Account data not found!")
+                return
+            
+            print(f"\n{Fore.YELLOW}Launching Roblox for account: {account['username']}")
+            
+            success = await self.browser_manager.launch_with_account(account)
+            if success:
+                print(f"{Fore.GREEN}✓ Successfully launched Roblox!")
             else:
-                print(f"{Fore.RED}Invalid choice!")
-        except ValueError:
-            print(f"{Fore.RED}Please enter a valid number!")
+                print(f"{Fore.RED}✗ Failed to launch Roblox")
         except Exception as e:
             print(f"{Fore.RED}✗ Error launching account: {str(e)}")
     
     def remove_account(self):
         """Remove an account"""
-        accounts = self.db.get_all_accounts()
-        if not accounts:
-            print(f"{Fore.YELLOW}No accounts found.")
+        print(f"\n{Fore.CYAN}{Style.BRIGHT}REMOVE ACCOUNT")
+        account = self._browse_accounts("remove")
+        if not account:
             return
         
-        print(f"\n{Fore.CYAN}{Style.BRIGHT}REMOVE ACCOUNT")
-        self.list_accounts()
+        confirm = input(f"{Fore.RED}Are you sure you want to remove '{account['username']}'? (y/N): ").lower()
         
-        try:
-            choice = int(input(f"\n{Fore.WHITE}Enter account number to remove: "))
-            if 1 <= choice <= len(accounts):
-                account = accounts[choice - 1]
-                confirm = input(f"{Fore.RED}Are you sure you want to remove '{account['username']}'? (y/N): ").lower()
-                
-                if confirm == 'y':
-                    if self.db.remove_account(account['username']):
-                        print(f"{Fore.GREEN}✓ Account '{account['username']}' removed successfully!")
-                    else:
-                        print(f"{Fore.RED}✗ Failed to remove account")
-                else:
-                    print(f"{Fore.YELLOW}Operation cancelled")
+        if confirm == 'y':
+            if self.db.remove_account(account['username']):
+                print(f"{Fore.GREEN}✓ Account '{account['username']}' removed successfully!")
             else:
-                print(f"{Fore.RED}Invalid choice!")
-        except ValueError:
-            print(f"{Fore.RED}Please enter a valid number!")
+                print(f"{Fore.RED}✗ Failed to remove account")
+        else:
+            print(f"{Fore.YELLOW}Operation cancelled")
     
     def update_account(self):
         """Update account status"""
-        accounts = self.db.get_all_accounts()
-        if not accounts:
-            print(f"{Fore.YELLOW}No accounts found.")
+        print(f"\n{Fore.CYAN}{Style.BRIGHT}UPDATE ACCOUNT STATUS")
+        account = self._browse_accounts("update")
+        if not account:
             return
         
-        print(f"\n{Fore.CYAN}{Style.BRIGHT}UPDATE ACCOUNT STATUS")
-        self.list_accounts()
+        new_status = not account['is_active']
+        status_text = "activate" if new_status else "deactivate"
         
-        try:
-            choice = int(input(f"\n{Fore.WHITE}Enter account number to update: "))
-            if 1 <= choice <= len(accounts):
-                account = accounts[choice - 1]
-                new_status = not account['is_active']
-                status_text = "activate" if new_status else "deactivate"
-                
-                if self.db.update_account_status(account['username'], new_status):
-                    print(f"{Fore.GREEN}✓ Account '{account['username']}' {status_text}d successfully!")
-                else:
-                    print(f"{Fore.RED}✗ Failed to update account")
-            else:
-                print(f"{Fore.RED}Invalid choice!")
-        except ValueError:
-            print(f"{Fore.RED}Please enter a valid number!")
+        if self.db.update_account_status(account['username'], new_status):
+            print(f"{Fore.GREEN}✓ Account '{account['username']}' {status_text}d successfully!")
+        else:
+            print(f"{Fore.RED}✗ Failed to update account")
     
     async def run(self):
         """Main application loop"""
+        # Ready by the time a network operation needs it, without delaying the menu
+        start_connectivity_probe()
         self.display_header()
         
         while True:
             self.display_menu()
             try:
-                choice = input(f"{Fore.WHITE}Enter your choice (0-8): ").strip()
+                choice = input(f"{Fore.WHITE}Enter your choice (0-9): ").strip()
                 
                 if choice == "0":
                     print(f"\n{Fore.GREEN}Thank you for using Roblox Account Manager!")
@@ -373,11 +375,14 @@ class RobloxAccountManager:
                     await self.refresh_single_session()
                 elif choice == "8":
                     await self.import_account_from_json()
+                elif choice == "9":
+                    self.backup_database()
                 else:
                     print(f"{Fore.RED}Invalid choice! Please try again.")
                 
                 # Wait for user input before showing menu again
                 if choice != "0":
+                    log.flush()
                     input(f"\n{Fore.CYAN}Press Enter to continue...")
                     
             except KeyboardInterrupt:
@@ -386,14 +391,44 @@ class RobloxAccountManager:
             except Exception as e:
                 print(f"\n{Fore.RED}An error occurred: {str(e)}")
                 print(f"{Fore.CYAN}Press Enter to continue...")
+        
+        if self._backup_thread and self._backup_thread.is_alive():
+            print(f"{Fore.CYAN}Waiting for the running backup to finish...")
+            self._backup_thread.join()
+        
+        # Shut down the pooled browsers kept warm between operations
+        await self.browser_manager.close()
+        self.db.close()
+    
+    def backup_database(self):
+        """Start a database backup in the background"""
+        if self._backup_thread and self._backup_thread.is_alive():
+            print(f"{Fore.YELLOW}A backup is already running.")
+            return
+        
+        def done(path, error):
+            if error:
+                print(f"\n{Fore.RED}✗ Backup failed: {error}")
+            else:
+                print(f"\n{Fore.GREEN}✓ Database backed up to: {path}")
+        
+        self._backup_thread = start_backup(self.db.db_path, on_done=done, source=self.db.conn)
+        print(f"{Fore.CYAN}Backup started in the background; you can keep using the menu.")
 
     async def validate_sessions(self):
         """Validate all account sessions"""
         print(f"\n{Fore.CYAN}{Style.BRIGHT}VALIDATE SESSIONS")
         print(f"{Fore.YELLOW}This will check all accounts for expired sessions...")
+        if not self.force_validation:
+            print(f"{Style.DIM}Recently validated accounts are skipped (run with --force to re-check all).")
+        if not await probe_internet_connection():
+            print(f"{Fore.RED}No internet connection detected; sessions that can't be checked keep their status.")
         
         try:
-            expired_count = await self.browser_manager.clean_expired_sessions()
+            expired_count = await self.browser_manager.clean_expired_sessions(
+                force=self.force_validation, budget=self.validation_budget
+            )
+            log.flush()
             if expired_count > 0:
                 print(f"\n{Fore.YELLOW}Found {expired_count} expired sessions.")
                 print(f"{Fore.CYAN}You can refresh them using menu option 7.")
@@ -404,44 +439,62 @@ class RobloxAccountManager:
     
     async def refresh_single_session(self):
         """Refresh a single account session"""
-        accounts = self.db.get_all_accounts()
-        if not accounts:
-            print(f"{Fore.YELLOW}No accounts found.")
-            return
-        
         print(f"\n{Fore.CYAN}{Style.BRIGHT}REFRESH ACCOUNT SESSION")
-        self.list_accounts()
+        account = self._browse_accounts("refresh")
+        if not account:
+            return
         
         try:
-            choice = int(input(f"\n{Fore.WHITE}Enter account number to refresh: "))
-            if 1 <= choice <= len(accounts):
-                account = accounts[choice - 1]
-                print(f"\n{Fore.YELLOW}Refreshing session for: {account['username']}")
-                
-                success = await self.browser_manager.refresh_account_session(account['username'])
-                if success:
-                    print(f"{Fore.GREEN}✓ Session refreshed successfully!")
-                    # Reactivate the account
-                    self.db.update_account_status(account['username'], True)
-                else:
-                    print(f"{Fore.RED}✗ Failed to refresh session")
+            print(f"\n{Fore.YELLOW}Refreshing session for: {account['username']}")
+            
+            success = await self.browser_manager.refresh_account_session(account['username'])
+            if success:
+                print(f"{Fore.GREEN}✓ Session refreshed successfully!")
+                # Reactivate the account
+                self.db.update_account_status(account['username'], True)
             else:
-                print(f"{Fore.RED}Invalid choice!")
-        except ValueError:
-            print(f"{Fore.RED}Please enter a valid number!")
+                print(f"{Fore.RED}✗ Failed to refresh session")
         except Exception as e:
             print(f"{Fore.RED}Error refreshing session: {str(e)}")
 
 def main():
     """Main entry point"""
+    # Subcommands run unattended; anything else opens the interactive menu
+    if len(sys.argv) > 1 and sys.argv[1] in cli.COMMANDS:
+        sys.exit(cli.main(sys.argv[1:]))
+    
+    parser = argparse.ArgumentParser(
+        description="Roblox Account Manager",
+        epilog=f"Non-interactive commands: {', '.join(cli.COMMANDS)} (see 'main.py COMMAND --help')"
+    )
+    parser.add_argument('--force', action='store_true',
+                        help="re-validate every session, ignoring recently cached results")
+    parser.add_argument('--budget', type=int, metavar='N',
+                        help="validate at most N sessions per run, most at-risk first")
+    parser.add_argument('--metrics', metavar='FILE', nargs='?', const=METRICS_FILE,
+                        help="time browser and database phases and write p50/p95/p99 to FILE on exit "
+                             f"(.prom or .txt: Prometheus text format, otherwise JSON; default {METRICS_FILE})")
+    log.add_arguments(parser)
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+    try:
+        log.setup_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    
     try:
-        app = RobloxAccountManager()
+        app = RobloxAccountManager(force_validation=args.force, validation_budget=args.budget)
         asyncio.run(app.run())
     except KeyboardInterrupt:
         print(f"\n{Fore.YELLOW}Program interrupted. Goodbye!")
     except Exception as e:
         print(f"{Fore.RED}Fatal error: {str(e)}")
         sys.exit(1)
+    finally:
+        log.shutdown_logging()
+        if metrics.is_enabled():
+            print(f"{Fore.CYAN}Phase timings written to {metrics.export(args.metrics or METRICS_FILE)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
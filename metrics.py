@@ -0,0 +1,226 @@
+"""
+Timing spans and per-phase latency histograms.
+
+Hot paths are wrapped in named spans:
+
+    with metrics.span('launch.goto'):
+        await page.goto(url)
+
+    @metrics.timed('db.get_account')
+    def get_account(self, username): ...
+
+Each name collects its durations; snapshot() reports count, sum and
+p50/p95/p99 per phase and export() writes them as JSON or, for .prom/.txt
+files, in the Prometheus text format. Collection is off unless
+METRICS_ENABLED is set (ROBLOX_METRICS=1) or enable() is called; while it
+is off, span() hands back a shared no-op context manager and timed()
+wrappers go straight to the wrapped function.
+"""
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from config import METRICS_ENABLED, METRICS_MAX_SAMPLES
+
+PROMETHEUS_PREFIX = 'roblox_manager'
+QUANTILES = (0.5, 0.95, 0.99)
+
+_enabled = METRICS_ENABLED
+_lock = threading.Lock()
+_NOOP = contextlib.nullcontext()
+
+
+class Histogram:
+    """
+    Durations of one phase. Keeps exact count, sum, min and max, and a
+    uniform sample of at most `max_samples` durations for the percentiles.
+    """
+    __slots__ = ('count', 'total', 'minimum', 'maximum', 'errors', 'samples', 'max_samples')
+
+    def __init__(self, max_samples: int = METRICS_MAX_SAMPLES):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float('inf')
+        self.maximum = 0.0
+        self.errors = 0
+        self.samples: List[float] = []
+        self.max_samples = max_samples
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.minimum = min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+        if len(self.samples) < self.max_samples:
+            self.samples.append(seconds)
+        else:
+            # Reservoir sampling keeps the sample uniform over every observation
+            slot = random.randrange(self.count)
+            if slot < self.max_samples:
+                self.samples[slot] = seconds
+
+    def quantile(self, q: float, ordered: Optional[List[float]] = None) -> float:
+        ordered = ordered if ordered is not None else sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, max(0, int(q * len(ordered) + 0.5) - 1))]
+
+    def summary(self) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'sum': round(self.total, 6),
+            'min': round(self.minimum, 6) if self.count else 0.0,
+            'max': round(self.maximum, 6),
+            **{f"p{int(q * 100)}": round(self.quantile(q, ordered), 6) for q in QUANTILES}
+        }
+
+
+_histograms: Dict[str, Histogram] = {}
+
+
+def enable():
+    """Start collecting timings"""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Stop collecting timings; what was collected is kept"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Drop every collected timing"""
+    with _lock:
+        _histograms.clear()
+
+
+def observe(name: str, seconds: float, error: bool = False):
+    """Record one duration for phase `name` (ignored while collection is off)"""
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+        if error:
+            histogram.errors += 1
+
+
+class _Span:
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        observe(self.name, time.perf_counter() - self.started, error=exc_type is not None)
+        return False
+
+
+def span(name: str):
+    """Context manager timing the enclosed block as phase `name`"""
+    if not _enabled:
+        return _NOOP
+    return _Span(name)
+
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of a function or coroutine function as phase `name`"""
+    def decorate(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await func(*args, **kwargs)
+                with _Span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    """Summary of every phase, in seconds, sorted by name"""
+    with _lock:
+        return {name: _histograms[name].summary() for name in sorted(_histograms)}
+
+
+def to_prometheus(summaries: Dict[str, Dict[str, float]]) -> str:
+    """Render snapshot() output in the Prometheus text exposition format"""
+    metric = f"{PROMETHEUS_PREFIX}_phase_seconds"
+    lines = [
+        f"# HELP {metric} Duration of instrumented phases.",
+        f"# TYPE {metric} summary"
+    ]
+    for name, summary in summaries.items():
+        label = name.replace('\\', '\\\\').replace('"', '\\"')
+        for q in QUANTILES:
+            lines.append(f'{metric}{{phase="{label}",quantile="{q}"}} {summary[f"p{int(q * 100)}"]}')
+        lines.append(f'{metric}_sum{{phase="{label}"}} {summary["sum"]}')
+        lines.append(f'{metric}_count{{phase="{label}"}} {summary["count"]}')
+
+    errors = f"{PROMETHEUS_PREFIX}_phase_errors_total"
+    lines.append(f"# HELP {errors} Instrumented phases that ended with an exception.")
+    lines.append(f"# TYPE {errors} counter")
+    for name, summary in summaries.items():
+        label = name.replace('\\', '\\\\').replace('"', '\\"')
+        lines.append(f'{errors}{{phase="{label}"}} {summary["errors"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def export(path: str) -> str:
+    """
+    Write the current snapshot to `path`: Prometheus text for .prom and .txt
+    files (e.g. for node_exporter's textfile collector), JSON otherwise.
+    Returns the path.
+    """
+    summaries = snapshot()
+    if path.endswith(('.prom', '.txt')):
+        content = to_prometheus(summaries)
+    else:
+        content = json.dumps({'generated_at': time.time(), 'unit': 'seconds', 'phases': summaries}, indent=2)
+
+    # Written to a temporary file and renamed so scrapers never read half a file
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        file.write(content)
+    os.replace(temp_path, path)
+    return path
+
+
+def format_table(summaries: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """Phase summaries as a plain-text table in milliseconds"""
+    summaries = snapshot() if summaries is None else summaries
+    rows = [f"{'phase':<36} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+    for name, s in summaries.items():
+        rows.append(f"{name:<36} {s['count']:>7} {s['p50'] * 1000:>9.1f} {s['p95'] * 1000:>9.1f} "
+                    f"{s['p99'] * 1000:>9.1f} {s['max'] * 1000:>9.1f}")
+    return '\n'.join(rows)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for the account database.
+
+The schema version lives in PRAGMA user_version. Each migration runs in its
+own transaction together with the version bump, so a failure leaves the
+database at the last version that fully applied. Migrations are snapshots:
+once released, a migration must not change, add a new one instead.
+"""
+import json
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+from typing import Callable, Dict, List, Optional
+
+from config import DATABASE_NAME, MIGRATION_TIME_BUDGET
+
+Migration = namedtuple('Migration', ['version', 'description', 'apply'])
+
+
+def _create_accounts_table(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            display_name TEXT,
+            cookies TEXT,
+            user_agent TEXT,
+            session_data TEXT,
+            is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _create_cookies_table(conn: sqlite3.Connection):
+    # One row per cookie so expiry and auth-cookie lookups don't have to
+    # parse every account's cookie list
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS cookies (
+            account_id INTEGER NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            domain TEXT NOT NULL DEFAULT '',
+            path TEXT NOT NULL DEFAULT '/',
+            value TEXT NOT NULL,
+            expires REAL,
+            http_only INTEGER,
+            secure INTEGER,
+            same_site TEXT,
+            PRIMARY KEY (account_id, name, domain, path)
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cookies_name_expires ON cookies(name, expires)
+    ''')
+
+    # Move cookies still stored as JSON in accounts.cookies
+    rows = []
+    migrated = []
+    for account_id, blob in conn.execute("SELECT id, cookies FROM accounts WHERE cookies IS NOT NULL"):
+        try:
+            cookies = json.loads(blob)
+        except ValueError:
+            print(f"Skipping unreadable cookie data for account id {account_id}")
+            continue
+
+        migrated.append((account_id,))
+        for cookie in cookies if isinstance(cookies, list) else []:
+            if not isinstance(cookie, dict) or not cookie.get('name'):
+                continue
+            try:
+                expires = float(cookie['expires']) if cookie.get('expires') is not None else None
+            except (TypeError, ValueError):
+                expires = None
+            if expires is not None and expires <= 0:
+                expires = None
+            rows.append((
+                account_id,
+                cookie['name'],
+                cookie.get('domain') or '',
+                cookie.get('path') or '/',
+                cookie.get('value', ''),
+                expires,
+                None if cookie.get('httpOnly') is None else int(bool(cookie['httpOnly'])),
+                None if cookie.get('secure') is None else int(bool(cookie['secure'])),
+                cookie.get('sameSite')
+            ))
+
+    conn.executemany('''
+        INSERT OR REPLACE INTO cookies
+        (account_id, name, domain, path, value, expires, http_only, secure, same_site)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.executemany("UPDATE accounts SET cookies = NULL WHERE id = ?", migrated)
+
+
+def _drop_username_index(conn: sqlite3.Connection):
+    # UNIQUE on accounts.username already creates an automatic index, so
+    # idx_username only doubled the write cost
+    conn.execute("DROP INDEX IF EXISTS idx_username")
+
+
+def _add_created_index(conn: sqlite3.Connection):
+    # Backs keyset pagination of the newest-first account listing
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_accounts_created ON accounts(created_at, id)")
+
+
+def _add_search_index(conn: sqlite3.Connection):
+    # Full-text index over usernames and display names, kept in sync with
+    # accounts by triggers. '_' is part of a token so usernames stay whole.
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS accounts_fts USING fts5(
+                username, display_name,
+                content='accounts', content_rowid='id',
+                tokenize="unicode61 remove_diacritics 2 tokenchars '_'",
+                prefix='1 2 3'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        if 'fts5' not in str(e):
+            raise
+        # SQLite built without FTS5: search falls back to LIKE matching
+        print("⚠️  SQLite has no FTS5 support, account search will be slower")
+        return
+
+    # Separate execute() calls: executescript() would commit the migration early
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS accounts_fts_insert AFTER INSERT ON accounts BEGIN
+            INSERT INTO accounts_fts(rowid, username, display_name)
+            VALUES (new.id, new.username, new.display_name);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS accounts_fts_delete AFTER DELETE ON accounts BEGIN
+            INSERT INTO accounts_fts(accounts_fts, rowid, username, display_name)
+            VALUES ('delete', old.id, old.username, old.display_name);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS accounts_fts_update AFTER UPDATE OF username, display_name ON accounts BEGIN
+            INSERT INTO accounts_fts(accounts_fts, rowid, username, display_name)
+            VALUES ('delete', old.id, old.username, old.display_name);
+            INSERT INTO accounts_fts(rowid, username, display_name)
+            VALUES (new.id, new.username, new.display_name);
+        END
+    ''')
+    conn.execute("INSERT INTO accounts_fts(accounts_fts) VALUES ('rebuild')")
+
+
+def _add_validation_results(conn: sqlite3.Connection):
+    # Last validation outcome per account, so recent checks can be reused
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS validation_results (
+            account_id INTEGER PRIMARY KEY REFERENCES accounts(id) ON DELETE CASCADE,
+            checked_at REAL NOT NULL,
+            outcome TEXT NOT NULL,
+            method TEXT,
+            user_id INTEGER,
+            cookie_fingerprint TEXT
+        )
+    ''')
+
+
+def _add_validation_failures(conn: sqlite3.Connection):
+    # Consecutive failed checks, used to prioritize the validation queue
+    conn.execute("ALTER TABLE validation_results ADD COLUMN failures INTEGER NOT NULL DEFAULT 0")
+
+
+def _add_storage_state(conn: sqlite3.Connection):
+    # Browser storage saved with a session (localStorage origins and
+    # sessionStorage); cookies stay in the cookies table
+    conn.execute("ALTER TABLE accounts ADD COLUMN storage_state TEXT")
+
+
+def _normalize_stored_cookies(conn: sqlite3.Connection):
+    # Bring cookies written before normalize-on-write up to the same rules
+    # as cookie_utils.normalize_cookie, so they can go to Playwright as-is.
+    # Spelled out in SQL so this migration doesn't change with that module.
+    conn.execute("DELETE FROM cookies WHERE value = ''")
+    conn.execute('''
+        DELETE FROM cookies
+        WHERE domain != '' AND NOT (ltrim(lower(domain), '.') = 'roblox.com'
+                                    OR lower(domain) LIKE '%.roblox.com')
+    ''')
+    conn.execute('''
+        UPDATE OR REPLACE cookies SET
+            domain = CASE WHEN domain = '' THEN '.roblox.com' ELSE domain END,
+            path = CASE WHEN path = '' THEN '/' ELSE path END,
+            http_only = COALESCE(http_only, 0),
+            same_site = CASE lower(COALESCE(same_site, ''))
+                            WHEN 'strict' THEN 'Strict'
+                            WHEN 'none' THEN 'None'
+                            WHEN 'no_restriction' THEN 'None'
+                            ELSE 'Lax' END
+    ''')
+    conn.execute('''
+        UPDATE cookies SET secure = CASE WHEN same_site = 'None' THEN 1 ELSE COALESCE(secure, 1) END
+    ''')
+    conn.execute('''
+        UPDATE OR REPLACE cookies
+        SET domain = '.roblox.com', secure = 1, http_only = 1, same_site = 'None'
+        WHERE name = '.ROBLOSECURITY'
+    ''')
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create accounts table", _create_accounts_table),
+    Migration(2, "Move cookies into a normalized cookies table", _create_cookies_table),
+    Migration(3, "Drop redundant idx_username index", _drop_username_index),
+    Migration(4, "Index accounts by (created_at, id) for paginated listing", _add_created_index),
+    Migration(5, "Add full-text search index over usernames and display names", _add_search_index),
+    Migration(6, "Add validation_results table for cached session checks", _add_validation_results),
+    Migration(7, "Track consecutive validation failures", _add_validation_failures),
+    Migration(8, "Add storage_state column for saved browser storage", _add_storage_state),
+    Migration(9, "Normalize stored cookies for direct use by Playwright", _normalize_stored_cookies),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Read the schema version stored in the database header"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def pending_migrations(conn: sqlite3.Connection) -> List[Migration]:
+    """Migrations newer than the database's current version"""
+    current = get_schema_version(conn)
+    return [m for m in MIGRATIONS if m.version > current]
+
+
+def migrate(conn: sqlite3.Connection, dry_run: bool = False,
+            time_budget: float = MIGRATION_TIME_BUDGET,
+            report: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    """
+    Bring the database up to LATEST_VERSION.
+
+    The connection must be in autocommit mode (isolation_level=None). With
+    dry_run=True every pending migration still runs, so its timing on this
+    database is measured, but everything is rolled back at the end. A
+    migration slower than `time_budget` seconds is flagged in its result.
+    """
+    current = get_schema_version(conn)
+    if current > LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema version {current} is newer than this program supports ({LATEST_VERSION})"
+        )
+
+    results = []
+    pending = pending_migrations(conn)
+    if not pending:
+        return results
+
+    if dry_run:
+        conn.execute("BEGIN IMMEDIATE")
+
+    try:
+        for migration in pending:
+            if not dry_run:
+                conn.execute("BEGIN IMMEDIATE")
+
+            start = time.perf_counter()
+            try:
+                migration.apply(conn)
+                conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+            except BaseException:
+                if not dry_run:
+                    conn.execute("ROLLBACK")
+                raise
+            elapsed = time.perf_counter() - start
+
+            if not dry_run:
+                conn.execute("COMMIT")
+
+            result = {
+                'version': migration.version,
+                'description': migration.description,
+                'seconds': round(elapsed, 4),
+                'over_budget': elapsed > time_budget,
+                'dry_run': dry_run
+            }
+            results.append(result)
+            if report:
+                report(result)
+            elif result['over_budget']:
+                print(f"⚠️  Migration {migration.version} took {elapsed:.1f}s (budget {time_budget:.1f}s)")
+    finally:
+        if dry_run and conn.in_transaction:
+            conn.execute("ROLLBACK")
+
+    return results
+
+
+def main(argv: List[str]) -> int:
+    """Show or apply pending migrations: migrations.py [--dry-run] [db_path]"""
+    dry_run = '--dry-run' in argv
+    paths = [arg for arg in argv if not arg.startswith('--')]
+    db_path = paths[0] if paths else DATABASE_NAME
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        print(f"Database: {db_path} (schema version {get_schema_version(conn)}, latest {LATEST_VERSION})")
+        results = migrate(conn, dry_run=dry_run, report=lambda r: print(
+            f"  {'[dry run] ' if r['dry_run'] else ''}v{r['version']}: {r['description']} "
+            f"- {r['seconds']:.3f}s{'  ⚠️  over budget' if r['over_budget'] else ''}"
+        ))
+        if not results:
+            print("Nothing to migrate.")
+        return 1 if any(r['over_budget'] for r in results) else 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
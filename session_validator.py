@@ -0,0 +1,142 @@
+import asyncio
+import http.client
+import json
+import queue
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from config import ROBLOX_USERS_API_URL, HTTP_VALIDATION_TIMEOUT, VALIDATION_CONCURRENCY, DEFAULT_USER_AGENT
+
+# Possible outcomes of a browserless session check
+VALID = "valid"
+INVALID = "invalid"
+AMBIGUOUS = "ambiguous"
+
+AUTHENTICATED_PATH = "/v1/users/authenticated"
+
+
+class HttpSessionValidator:
+    """
+    Check .ROBLOSECURITY sessions with plain HTTP requests against the users
+    API, reusing a small pool of keep-alive connections
+    """
+    
+    def __init__(self, base_url: str = ROBLOX_USERS_API_URL, pool_size: int = VALIDATION_CONCURRENCY,
+                 timeout: float = HTTP_VALIDATION_TIMEOUT):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Invalid users API base URL: {base_url}")
+        
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(maxsize=max(1, pool_size))
+    
+    def _new_connection(self) -> http.client.HTTPConnection:
+        """Open a new connection to the users API"""
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+    
+    def _acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """Take an idle connection from the pool, or open a new one"""
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+    
+    def _release(self, conn: http.client.HTTPConnection):
+        """Return a connection to the pool, closing it if the pool is full"""
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+    
+    @staticmethod
+    def _cookie_header(cookies: List[Dict]) -> str:
+        """Build a Cookie header from stored cookie dicts"""
+        return '; '.join(
+            f"{c['name']}={c['value']}" for c in cookies
+            if c.get('name') and c.get('value') and c.get('domain', '.roblox.com').endswith('roblox.com')
+        )
+    
+    def _request(self, headers: Dict[str, str]) -> Tuple[int, bytes]:
+        """Send the authenticated-user request, retrying once on a stale pooled connection"""
+        path = self.base_path + AUTHENTICATED_PATH
+        
+        for attempt in range(2):
+            conn, reused = self._acquire()
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                    ConnectionResetError, BrokenPipeError):
+                conn.close()
+                # Keep-alive connections can be dropped by the server while idle
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, body
+        
+        raise ConnectionError("Users API request failed")
+    
+    def check(self, cookies: List[Dict], user_agent: Optional[str] = None) -> Tuple[str, Optional[int]]:
+        """
+        Check a session synchronously. Returns (outcome, user_id) where
+        outcome is VALID, INVALID or AMBIGUOUS.
+        """
+        cookie_header = self._cookie_header(cookies)
+        if '.ROBLOSECURITY=' not in cookie_header:
+            return INVALID, None
+        
+        headers = {
+            'Cookie': cookie_header,
+            'User-Agent': user_agent or DEFAULT_USER_AGENT,
+            'Accept': 'application/json',
+            'Connection': 'keep-alive',
+        }
+        
+        try:
+            status, body = self._request(headers)
+        except Exception:
+            # Network trouble says nothing about the session itself
+            return AMBIGUOUS, None
+        
+        if status == 200:
+            try:
+                user_id = json.loads(body).get('id')
+            except (ValueError, AttributeError):
+                return AMBIGUOUS, None
+            return (VALID, user_id) if user_id else (AMBIGUOUS, None)
+        
+        if status == 401:
+            return INVALID, None
+        
+        # A 403 comes from CSRF, challenge or IP blocks rather than a rejected
+        # session; like rate limits, server errors and redirects it needs a
+        # closer look
+        return AMBIGUOUS, None
+    
+    async def check_async(self, cookies: List[Dict], user_agent: Optional[str] = None) -> Tuple[str, Optional[int]]:
+        """Run check() on a worker thread so the event loop keeps going"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.check, cookies, user_agent)
+    
+    def close(self):
+        """Close every pooled connection"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
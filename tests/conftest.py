@@ -0,0 +1,99 @@
+import os
+import sys
+from contextlib import asynccontextmanager
+
+import pytest
+
+# The application modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import browser_manager
+import log
+from session_validator import VALID, INVALID, AMBIGUOUS
+
+
+def session_cookies(outcome: str, marker: str = 'x') -> list:
+    """Cookies whose auth value tells FakeUsersApi what to answer"""
+    return [{'name': '.ROBLOSECURITY', 'value': outcome + marker * 60, 'domain': '.roblox.com', 'path': '/'}]
+
+
+class FakeUsersApi:
+    """Stands in for HttpSessionValidator; answers with the outcome the auth cookie starts with"""
+    calls = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def check_async(self, cookies, user_agent=None):
+        FakeUsersApi.calls += 1
+        value = next((c['value'] for c in cookies if c['name'] == '.ROBLOSECURITY'), '')
+        for outcome in (VALID, INVALID, AMBIGUOUS):
+            if value.startswith(outcome):
+                return outcome, 1 if outcome == VALID else None
+        return INVALID, None
+
+    def close(self):
+        pass
+
+
+class FakePage:
+    def __init__(self, url: str):
+        self.url = url
+
+    async def goto(self, url, **kwargs):
+        pass
+
+    async def evaluate(self, script):
+        return self.url, {}
+
+
+class FakeContext:
+    def __init__(self, account: dict, url: str):
+        self.account = account
+        self.url = url
+
+    async def new_page(self):
+        return FakePage(self.url)
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def cookies(self):
+        # The saved cookies come straight back, as a browser that was
+        # handed an expired session would return them
+        return self.account.get('cookies') or []
+
+    async def storage_state(self):
+        return {'cookies': await self.cookies(), 'origins': []}
+
+
+class OfflineBrowser:
+    """
+    Replaces Chromium for RobloxBrowserManager. With `landing_url` unset,
+    opening a context fails as it does without an installed browser.
+    """
+
+    def __init__(self):
+        self.landing_url = None
+
+    @asynccontextmanager
+    async def session_context(self, manager, account, headless=True, **kwargs):
+        if self.landing_url is None:
+            raise RuntimeError("Chromium is not available")
+        yield FakeContext(account, self.landing_url)
+
+
+@pytest.fixture
+def offline_browser(monkeypatch):
+    browser = OfflineBrowser()
+    FakeUsersApi.calls = 0
+    monkeypatch.setattr(browser_manager, 'HttpSessionValidator', FakeUsersApi)
+    monkeypatch.setattr(browser_manager.RobloxBrowserManager, '_session_context',
+                        lambda manager, account, **kwargs: browser.session_context(manager, account, **kwargs))
+    yield browser
+
+
+@pytest.fixture(autouse=True)
+def reset_logging():
+    yield
+    log.shutdown_logging()
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from browser_manager import RobloxBrowserManager
+from config import ROBLOX_HOME_URL, ROBLOX_LOGIN_URL, VALIDATION_CACHE_TTL
+from conftest import FakeUsersApi, session_cookies
+from database import AccountDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    with AccountDatabase(str(tmp_path / 'accounts.db')) as db:
+        yield db
+
+
+@pytest.fixture
+def manager(db, offline_browser):
+    return RobloxBrowserManager(db)
+
+
+def validate(manager: RobloxBrowserManager, username: str, force: bool = False) -> bool:
+    return asyncio.run(manager.validate_account_session(username, force=force))
+
+
+def test_cached_result_is_reused_until_cookies_change(db, manager):
+    db.add_account('someone', cookies=session_cookies('valid'))
+
+    assert validate(manager, 'someone') is True
+    assert validate(manager, 'someone') is True
+    assert FakeUsersApi.calls == 1
+
+    assert validate(manager, 'someone', force=True) is True
+    assert FakeUsersApi.calls == 2
+
+    db.update_account('someone', cookies=session_cookies('invalid'))
+    assert validate(manager, 'someone') is False
+    assert FakeUsersApi.calls == 3
+
+
+def test_cached_result_expires_after_the_ttl(db, manager):
+    db.add_account('someone', cookies=session_cookies('valid'))
+    validate(manager, 'someone')
+
+    account_id = db.get_account('someone')['id']
+    with db._transaction() as conn:
+        conn.execute("UPDATE validation_results SET checked_at = checked_at - ? WHERE account_id = ?",
+                     (VALIDATION_CACHE_TTL + 1, account_id))
+    validate(manager, 'someone')
+    assert FakeUsersApi.calls == 2
+
+
+def test_check_without_a_verdict_is_not_cached_and_keeps_the_account(db, manager):
+    # Ambiguous API answer, then the browser check fails to start
+    db.add_account('someone', cookies=session_cookies('ambiguous'))
+
+    is_valid, record = asyncio.run(manager._validate_session('someone'))
+    assert is_valid is None
+    assert record['outcome'] == 'error'
+
+    db.record_validations([record])
+    asyncio.run(manager._validate_session('someone'))
+    assert FakeUsersApi.calls == 2
+
+    results = asyncio.run(manager.validate_sessions_concurrently(['someone']))
+    assert results == {'someone': None}
+    assert db.get_account('someone')['is_active']
+
+
+def test_renewal_confirmed_by_the_users_api_is_stored(db, manager, offline_browser):
+    db.add_account('someone', cookies=session_cookies('valid'))
+    db.update_account_status('someone', False)
+    offline_browser.landing_url = ROBLOX_HOME_URL + 'home'
+
+    assert asyncio.run(manager.renew_session('someone')) is True
+    assert db.get_account('someone')['is_active']
+
+
+@pytest.mark.parametrize('outcome', ['invalid', 'ambiguous'])
+def test_unconfirmed_renewal_leaves_the_account_alone(db, manager, offline_browser, outcome):
+    # The expired cookie is still in the jar and the landing page is not a
+    # login URL, yet the session is dead
+    db.add_account('someone', cookies=session_cookies(outcome))
+    db.update_account_status('someone', False)
+    before = db.get_account('someone')
+    offline_browser.landing_url = ROBLOX_HOME_URL + 'home'
+
+    assert asyncio.run(manager.renew_session('someone')) is False
+    after = db.get_account('someone')
+    assert not after['is_active']
+    assert after['updated_at'] == before['updated_at']
+
+
+def test_renewal_landing_on_the_login_page_fails(db, manager, offline_browser):
+    db.add_account('someone', cookies=session_cookies('valid'))
+    db.update_account_status('someone', False)
+    offline_browser.landing_url = ROBLOX_LOGIN_URL
+
+    assert asyncio.run(manager.renew_session('someone')) is False
+    assert not db.get_account('someone')['is_active']
+    assert FakeUsersApi.calls == 0
@@ -0,0 +1,29 @@
+import json
+
+from bulk_import import bulk_import
+from database import AccountDatabase
+
+
+def auth_cookie(value: str) -> dict:
+    return {'name': '.ROBLOSECURITY', 'value': value * 60, 'domain': '.roblox.com', 'path': '/'}
+
+
+def test_username_repeated_within_a_batch(tmp_path):
+    db = AccountDatabase(str(tmp_path / 'accounts.db'))
+    db.add_account('existing', cookies=[auth_cookie('a')])
+
+    lines = [json.dumps({'username': f"user{i}", 'cookies': [auth_cookie('b')]}) for i in range(7)]
+    lines.append(json.dumps({'username': 'user3', 'cookies': [auth_cookie('c')]}))
+    lines.append(json.dumps({'username': 'existing', 'cookies': [auth_cookie('d')]}))
+    lines.append('{not json')
+    source = tmp_path / 'accounts.ndjson'
+    source.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    with db:
+        stats = bulk_import(str(source), db, batch_size=100, workers=1,
+                            checkpoint_path=str(tmp_path / 'checkpoint.json'))
+        assert stats == {'added': 7, 'updated': 2, 'failed': 1}
+        assert db.get_account_count()['total'] == 8
+        # The later record for a repeated username wins
+        assert db.get_account('user3')['cookies'][0]['value'] == 'c' * 60
+        assert db.get_account('existing')['cookies'][0]['value'] == 'd' * 60
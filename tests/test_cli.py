@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+import cli
+from config import ROBLOX_HOME_URL
+from conftest import session_cookies
+from database import AccountDatabase
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # cli.main() opens the default database in the working directory
+    monkeypatch.chdir(tmp_path)
+    with AccountDatabase() as db:
+        yield db
+
+
+def run(capsys, *argv) -> tuple:
+    code = cli.main(list(argv))
+    lines = capsys.readouterr().out.splitlines()
+    return code, [json.loads(line) for line in lines]
+
+
+def test_validate_all_valid(db, offline_browser, capsys):
+    db.add_account('one', cookies=session_cookies('valid', 'a'))
+    db.add_account('two', cookies=session_cookies('valid', 'b'))
+
+    code, results = run(capsys, 'validate')
+    assert code == cli.EXIT_OK
+    assert {r['username']: r['ok'] for r in results} == {'one': True, 'two': True}
+
+
+def test_validate_with_an_invalid_account(db, offline_browser, capsys):
+    db.add_account('good', cookies=session_cookies('valid'))
+    db.add_account('expired', cookies=session_cookies('invalid'))
+
+    code, results = run(capsys, 'validate', 'good', 'expired')
+    assert code == cli.EXIT_FAILED
+    assert {r['username']: r['ok'] for r in results} == {'good': True, 'expired': False}
+    assert not db.get_account('expired')['is_active']
+
+
+def test_validate_without_a_verdict_is_inconclusive(db, offline_browser, capsys):
+    db.add_account('good', cookies=session_cookies('valid'))
+    db.add_account('unsure', cookies=session_cookies('ambiguous'))
+
+    code, results = run(capsys, 'validate')
+    assert code == cli.EXIT_INCONCLUSIVE
+    assert {r['username']: r['ok'] for r in results} == {'good': True, 'unsure': None}
+    assert db.get_account('unsure')['is_active']
+
+
+def test_validate_budget_applies_to_selectors(db, offline_browser, capsys):
+    for i in range(5):
+        db.add_account(f"user{i}", cookies=session_cookies('valid', str(i)))
+
+    code, results = run(capsys, 'validate', '--prefix', 'user', '--budget', '2')
+    assert code == cli.EXIT_OK
+    assert len(results) == 2
+
+
+def test_refresh_reports_unconfirmed_renewals_as_failed(db, offline_browser, capsys):
+    db.add_account('alive', cookies=session_cookies('valid'))
+    db.add_account('dead', cookies=session_cookies('invalid'))
+    db.set_status_many({'alive': False, 'dead': False})
+    offline_browser.landing_url = ROBLOX_HOME_URL + 'home'
+
+    code, results = run(capsys, 'refresh')
+    assert code == cli.EXIT_FAILED
+    assert {r['username']: r['ok'] for r in results} == {'alive': True, 'dead': False}
+    assert db.get_account('alive')['is_active']
+    assert not db.get_account('dead')['is_active']
+
+
+def test_list_missing_account_fails(db, capsys):
+    db.add_account('someone')
+
+    code, results = run(capsys, 'list', 'someone', 'nobody', '--columns', 'username')
+    assert code == cli.EXIT_FAILED
+    assert {'username': 'someone'} in results
+    assert {'username': 'nobody', 'ok': False, 'error': 'not found'} in results
+
+
+def test_usage_errors(db, capsys):
+    assert run(capsys, 'list', '--columns', 'username,password')[0] == cli.EXIT_ERROR
+    code, results = run(capsys, 'export', 'out.ndjson', '--updated-since', 'yesterday')
+    assert code == cli.EXIT_ERROR
+    assert 'ISO 8601' in results[0]['error']
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(['nonsense'])
+    assert exit_info.value.code == cli.EXIT_ERROR
+
+
+def test_import_with_a_bad_record_fails(db, tmp_path, capsys):
+    source = tmp_path / 'accounts.ndjson'
+    source.write_text(json.dumps({'username': 'new', 'cookies': session_cookies('valid')}) + '\n{broken\n',
+                      encoding='utf-8')
+
+    code, _ = run(capsys, 'import', str(source))
+    assert code == cli.EXIT_FAILED
+    assert db.account_exists('new')
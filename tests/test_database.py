@@ -0,0 +1,138 @@
+import pytest
+
+from config import VALIDATION_CACHE_TTL
+from database import AccountDatabase, cookie_fingerprint
+
+NOW = 1_800_000_000.0
+DAY = 24 * 3600
+
+
+def auth_cookie(value: str = 'a', expires: float = -1) -> dict:
+    return {'name': '.ROBLOSECURITY', 'value': value * 60, 'domain': '.roblox.com', 'path': '/', 'expires': expires}
+
+
+@pytest.fixture
+def db(tmp_path):
+    with AccountDatabase(str(tmp_path / 'accounts.db')) as db:
+        yield db
+
+
+def validation(db: AccountDatabase, username: str, outcome: str, checked_at: float = NOW) -> dict:
+    return {'account_id': db.get_account(username)['id'], 'checked_at': checked_at, 'outcome': outcome,
+            'method': 'http api', 'user_id': None, 'cookie_fingerprint': None}
+
+
+def test_keyset_pages_cover_every_account_once(db):
+    # Accounts added within the same second share created_at; id breaks the tie
+    for i in range(25):
+        db.add_account(f"user{i:02d}")
+
+    pages = [db.get_accounts_page(limit=10)]
+    while pages[-1]:
+        pages.append(db.get_accounts_page(limit=10, after=pages[-1][-1]['page_key']))
+    usernames = [a['username'] for page in pages for a in page]
+    assert usernames == [f"user{i:02d}" for i in reversed(range(25))]
+    assert [len(page) for page in pages] == [10, 10, 5, 0]
+
+    # Stepping back from the second page returns the first one
+    assert db.get_accounts_page(limit=10, before=pages[1][0]['page_key']) == pages[0]
+
+
+def test_page_prefix_is_case_insensitive_and_literal(db):
+    for username in ['alpha_1', 'Alpha2', 'alphaX', 'beta']:
+        db.add_account(username)
+
+    assert {a['username'] for a in db.get_accounts_page(prefix='ALPHA')} == {'alpha_1', 'Alpha2', 'alphaX'}
+    # '_' is matched literally, not as a LIKE wildcard
+    assert [a['username'] for a in db.get_accounts_page(prefix='alpha_')] == ['alpha_1']
+
+
+def test_search_matches_word_prefixes_of_usernames_and_display_names(db):
+    db.add_account('speedy_runner', display_name='Fast Gamer')
+    db.add_account('slow_walker', display_name='Casual Gamer')
+    db.add_account('gamer_pro')
+
+    assert {a['username'] for a in db.search_accounts('gam')} == {'speedy_runner', 'slow_walker', 'gamer_pro'}
+    assert [a['username'] for a in db.search_accounts('casual gam')] == ['slow_walker']
+    assert [a['username'] for a in db.search_accounts('speedy_r')] == ['speedy_runner']
+    # FTS5 syntax in the query is taken literally
+    assert db.search_accounts('"gamer" OR') == []
+    assert db.search_accounts('   ') == []
+
+    # The index follows renames and deletes
+    db.update_account('gamer_pro', display_name='Retired')
+    assert [a['username'] for a in db.search_accounts('retired')] == ['gamer_pro']
+    db.remove_account('speedy_runner')
+    assert {a['username'] for a in db.search_accounts('gamer')} == {'slow_walker', 'gamer_pro'}
+
+
+def test_cookie_fingerprint_follows_cookie_content_not_order():
+    first = [auth_cookie('a'), {'name': 'RBXEventTrackerV2', 'value': 'x', 'domain': '.roblox.com', 'path': '/'}]
+    assert cookie_fingerprint(first) == cookie_fingerprint(list(reversed(first)))
+    assert cookie_fingerprint(first) != cookie_fingerprint([auth_cookie('b'), first[1]])
+    assert cookie_fingerprint(None) == cookie_fingerprint([])
+
+
+def test_failure_streak_resets_on_a_valid_result(db):
+    db.add_account('someone', cookies=[auth_cookie()])
+    account_id = db.get_account('someone')['id']
+
+    db.record_validations([validation(db, 'someone', 'invalid')])
+    db.record_validations([validation(db, 'someone', 'error')])
+    assert db.get_validation(account_id)['failures'] == 2
+    db.record_validations([validation(db, 'someone', 'valid')])
+    assert db.get_validation(account_id)['failures'] == 0
+
+
+def test_expire_accounts_locally(db):
+    db.add_account('expired', cookies=[auth_cookie(expires=NOW - 60)])
+    db.add_account('current', cookies=[auth_cookie(expires=NOW + DAY)])
+    db.add_account('session_cookie', cookies=[auth_cookie()])
+    db.add_account('one_of_two_expired', cookies=[auth_cookie(expires=NOW - 60),
+                                                  {**auth_cookie('b', expires=NOW + DAY), 'path': '/games'}])
+    db.add_account('no_auth_cookie', cookies=[{'name': 'RBXEventTrackerV2', 'value': 'x', 'domain': '.roblox.com'}])
+    db.add_account('already_inactive', cookies=[auth_cookie(expires=NOW - 60)])
+    db.update_account_status('already_inactive', False)
+
+    assert sorted(db.expire_accounts_locally(now=NOW)) == ['expired', 'no_auth_cookie']
+    assert {a['username'] for a in db.get_active_accounts()} == {'current', 'session_cookie', 'one_of_two_expired'}
+    result = db.get_validation(db.get_account('expired')['id'])
+    assert (result['outcome'], result['method'], result['checked_at']) == ('invalid', 'local expiry', NOW)
+    assert db.get_validation(db.get_account('already_inactive')['id']) is None
+
+    assert db.expire_accounts_locally(now=NOW) == []
+
+
+def test_validation_queue_puts_the_most_at_risk_first(db):
+    far = NOW + 30 * DAY
+    db.add_account('fresh', cookies=[auth_cookie(expires=far)])
+    db.add_account('expiring', cookies=[auth_cookie(expires=NOW + 60)])
+    db.add_account('never_checked', cookies=[auth_cookie(expires=far)])
+    db.add_account('failing', cookies=[auth_cookie(expires=far)])
+    db.add_account('inactive', cookies=[auth_cookie(expires=NOW + 60)])
+    db.update_account_status('inactive', False)
+
+    db.record_validations([validation(db, name, 'valid') for name in ('fresh', 'expiring', 'failing')])
+    db.record_validations([validation(db, 'failing', 'invalid')])
+    db.record_validations([validation(db, 'failing', 'error')])
+
+    queue = db.get_validation_queue(now=NOW)
+    assert [row['username'] for row in queue] == ['never_checked', 'failing', 'expiring', 'fresh']
+    assert queue[1]['failures'] == 2
+    assert [row['username'] for row in db.get_validation_queue(limit=2, now=NOW)] == ['never_checked', 'failing']
+
+    # A result older than the cache TTL raises the account again
+    db.record_validations([validation(db, 'fresh', 'valid', checked_at=NOW - 2.5 * VALIDATION_CACHE_TTL)])
+    assert [row['username'] for row in db.get_validation_queue(now=NOW)] == \
+        ['never_checked', 'fresh', 'failing', 'expiring']
+
+
+def test_iter_accounts_streams_in_batches(db):
+    for i in range(7):
+        db.add_account(f"user{i}", cookies=[auth_cookie(str(i))])
+    db.update_account_status('user3', False)
+
+    accounts = list(db.iter_accounts(['username', 'cookies'], batch_size=3))
+    assert [a['username'] for a in accounts] == [f"user{i}" for i in range(7)]
+    assert accounts[5]['cookies'][0]['value'] == '5' * 60
+    assert len(list(db.iter_accounts(['username'], active_only=True, batch_size=3))) == 6
@@ -0,0 +1,126 @@
+import json
+import sqlite3
+
+import pytest
+
+import migrations
+from database import AccountDatabase
+
+
+def legacy_database(path) -> None:
+    """A database as the first release left it: version 0, cookies as JSON"""
+    conn = sqlite3.connect(str(path), isolation_level=None)
+    conn.execute('''
+        CREATE TABLE accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            display_name TEXT,
+            cookies TEXT,
+            user_agent TEXT,
+            session_data TEXT,
+            is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute("CREATE INDEX idx_username ON accounts(username)")
+    cookies = [
+        {'name': '.ROBLOSECURITY', 'value': 'a' * 60, 'domain': 'www.roblox.com', 'expires': 2e9, 'secure': False},
+        {'name': 'RBXEventTrackerV2', 'value': 'tracker', 'domain': '.roblox.com', 'sameSite': 'no_restriction'},
+        {'name': 'empty', 'value': '', 'domain': '.roblox.com'},
+        {'name': 'other', 'value': 'x', 'domain': '.example.com'},
+    ]
+    conn.execute("INSERT INTO accounts (username, display_name, cookies) VALUES (?, ?, ?)",
+                 ('legacy_user', 'Legacy User', json.dumps(cookies)))
+    conn.execute("INSERT INTO accounts (username, cookies) VALUES (?, ?)", ('broken', '{not json'))
+    conn.close()
+
+
+def test_fresh_database_is_at_latest_version(tmp_path):
+    with AccountDatabase(str(tmp_path / 'accounts.db')) as db:
+        assert migrations.get_schema_version(db.conn) == migrations.LATEST_VERSION
+        assert migrations.pending_migrations(db.conn) == []
+
+
+def test_versions_are_sequential():
+    assert [m.version for m in migrations.MIGRATIONS] == list(range(1, migrations.LATEST_VERSION + 1))
+
+
+def test_legacy_database_migrates_through_every_version(tmp_path):
+    path = tmp_path / 'accounts.db'
+    legacy_database(path)
+    conn = sqlite3.connect(str(path), isolation_level=None)
+    conn.row_factory = sqlite3.Row
+
+    results = migrations.migrate(conn, report=lambda result: None)
+    assert [r['version'] for r in results] == [m.version for m in migrations.MIGRATIONS]
+    assert migrations.get_schema_version(conn) == migrations.LATEST_VERSION
+
+    # Cookies moved out of the JSON column and normalized (migrations 2 and 9)
+    assert conn.execute("SELECT COUNT(*) FROM accounts WHERE username = 'legacy_user' AND cookies IS NOT NULL"
+                        ).fetchone()[0] == 0
+    rows = {row['name']: dict(row) for row in conn.execute("SELECT * FROM cookies")}
+    assert set(rows) == {'.ROBLOSECURITY', 'RBXEventTrackerV2'}
+    auth = rows['.ROBLOSECURITY']
+    assert (auth['domain'], auth['secure'], auth['http_only'], auth['same_site'], auth['expires']) == \
+        ('.roblox.com', 1, 1, 'None', 2e9)
+    assert (rows['RBXEventTrackerV2']['same_site'], rows['RBXEventTrackerV2']['secure']) == ('None', 1)
+    # Unreadable cookie data is left where it was
+    assert conn.execute("SELECT cookies FROM accounts WHERE username = 'broken'").fetchone()[0] == '{not json'
+
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert 'idx_username' not in indexes
+    assert 'idx_accounts_created' in indexes
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(validation_results)")}
+    assert 'failures' in columns
+    conn.close()
+
+    # The migrated database is usable as is
+    with AccountDatabase(str(path)) as db:
+        account = db.get_account('legacy_user')
+        assert account['cookies'][0]['value'] == 'a' * 60
+        assert [a['username'] for a in db.search_accounts('legacy')] == ['legacy_user']
+
+
+def test_dry_run_measures_every_migration_and_rolls_back(tmp_path):
+    path = tmp_path / 'accounts.db'
+    legacy_database(path)
+    conn = sqlite3.connect(str(path), isolation_level=None)
+
+    results = migrations.migrate(conn, dry_run=True, report=lambda result: None)
+    assert len(results) == len(migrations.MIGRATIONS)
+    assert all(r['dry_run'] for r in results)
+    assert migrations.get_schema_version(conn) == 0
+    assert not conn.in_transaction
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert 'cookies' not in tables
+    assert conn.execute("SELECT cookies FROM accounts WHERE username = 'legacy_user'").fetchone()[0] is not None
+    conn.close()
+
+
+def test_failed_migration_keeps_the_last_applied_version(tmp_path, monkeypatch):
+    path = tmp_path / 'accounts.db'
+    legacy_database(path)
+    conn = sqlite3.connect(str(path), isolation_level=None)
+
+    def fail(conn):
+        conn.execute("ALTER TABLE accounts ADD COLUMN half_done TEXT")
+        raise RuntimeError("migration failed")
+
+    failing = migrations.MIGRATIONS[4]._replace(apply=fail)
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS[:4] + [failing] + migrations.MIGRATIONS[5:])
+    with pytest.raises(RuntimeError):
+        migrations.migrate(conn, report=lambda result: None)
+
+    assert migrations.get_schema_version(conn) == 4
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(accounts)")}
+    assert 'half_done' not in columns
+    conn.close()
+
+
+def test_newer_schema_is_refused(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'accounts.db'), isolation_level=None)
+    conn.execute(f"PRAGMA user_version = {migrations.LATEST_VERSION + 1}")
+    with pytest.raises(RuntimeError):
+        migrations.migrate(conn)
+    conn.close()
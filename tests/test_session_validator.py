@@ -0,0 +1,96 @@
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from session_validator import HttpSessionValidator, AUTHENTICATED_PATH, VALID, INVALID, AMBIGUOUS
+
+AUTH_COOKIES = [{'name': '.ROBLOSECURITY', 'value': 'a' * 60, 'domain': '.roblox.com', 'path': '/'}]
+
+
+class UsersApi(BaseHTTPRequestHandler):
+    """Answers the authenticated-user endpoint with the server's canned response"""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('Cookie')))
+        status, body = self.server.response
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def users_api():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), UsersApi)
+    server.requests = []
+    server.response = (200, '{}')
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def validator(users_api):
+    validator = HttpSessionValidator(base_url=f"http://127.0.0.1:{users_api.server_address[1]}/api", timeout=5)
+    yield validator
+    validator.close()
+
+
+@pytest.mark.parametrize('status, body, expected', [
+    (200, json.dumps({'id': 42, 'name': 'someone'}), (VALID, 42)),
+    (200, '{}', (AMBIGUOUS, None)),
+    (200, 'not json', (AMBIGUOUS, None)),
+    (401, '{"errors": []}', (INVALID, None)),
+    # CSRF, challenge and IP blocks say nothing about the session
+    (403, '{"errors": []}', (AMBIGUOUS, None)),
+    (429, '{"errors": []}', (AMBIGUOUS, None)),
+    (302, '', (AMBIGUOUS, None)),
+    (500, '', (AMBIGUOUS, None)),
+    (503, '', (AMBIGUOUS, None)),
+])
+def test_status_mapping(users_api, validator, status, body, expected):
+    users_api.response = (status, body)
+    assert validator.check(AUTH_COOKIES) == expected
+
+    path, cookie_header = users_api.requests[-1]
+    assert path == '/api' + AUTHENTICATED_PATH
+    assert cookie_header == '.ROBLOSECURITY=' + 'a' * 60
+
+
+def test_missing_auth_cookie_is_invalid_without_a_request(users_api, validator):
+    cookies = [{'name': 'RBXEventTrackerV2', 'value': 'tracker', 'domain': '.roblox.com'},
+               {'name': '.ROBLOSECURITY', 'value': 'a' * 60, 'domain': '.example.com'}]
+    assert validator.check(cookies) == (INVALID, None)
+    assert users_api.requests == []
+
+
+def test_connections_are_reused(users_api, validator):
+    users_api.response = (200, json.dumps({'id': 7}))
+    for _ in range(3):
+        assert validator.check(AUTH_COOKIES) == (VALID, 7)
+    assert validator._pool.qsize() == 1
+
+
+def test_unreachable_api_is_ambiguous():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    validator = HttpSessionValidator(base_url=f"http://127.0.0.1:{port}", timeout=1)
+    assert validator.check(AUTH_COOKIES) == (AMBIGUOUS, None)
+
+
+def test_invalid_base_url():
+    with pytest.raises(ValueError):
+        HttpSessionValidator(base_url='ftp://users.roblox.com')
@@ -3,8 +3,24 @@ import sys
 import time
 import json
 import shutil
+import asyncio
+import threading
+import urllib.error
+import urllib.request
 from datetime import datetime
 from typing import Optional
+from colorama import init, Fore, Style
+from backup import copy_database, is_sqlite_file
+from config import CONNECTIVITY_CHECK_URL, CONNECTIVITY_CHECK_TIMEOUT, CONNECTIVITY_CACHE_TTL
+
+_colors_ready = False
+
+def setup_colors():
+    """Initialize colorama once; initializing again would wrap stdout twice"""
+    global _colors_ready
+    if not _colors_ready:
+        init(autoreset=True)
+        _colors_ready = True
 
 def clear_screen():
     """Clear the console screen"""
@@ -40,8 +56,11 @@ def backup_file(file_path: str, backup_dir: str = "backups") -> Optional[str]:
         backup_name = f"{name}_backup_{timestamp}{ext}"
         backup_path = os.path.join(backup_dir, backup_name)
         
-        # Copy file
-        shutil.copy2(file_path, backup_path)
+        # A live SQLite file can't be copied safely; use the online backup API
+        if is_sqlite_file(file_path):
+            copy_database(file_path, backup_path)
+        else:
+            shutil.copy2(file_path, backup_path)
         return backup_path
         
     except Exception as e:
@@ -52,14 +71,49 @@ def is_windows() -> bool:
     """Check if running on Windows"""
     return os.name == 'nt'
 
-def check_internet_connection() -> bool:
-    """Check if internet connection is available"""
-    try:
-        import urllib.request
-        urllib.request.urlopen('https://www.google.com', timeout=5)
-        return True
-    except:
-        return False
+# Last probe result and its time.monotonic() timestamp
+_connectivity = {'online': None, 'checked_at': 0.0}
+_connectivity_lock = threading.Lock()
+
+def cached_internet_connection(max_age: float = CONNECTIVITY_CACHE_TTL) -> Optional[bool]:
+    """The last connectivity result if it is recent enough, otherwise None"""
+    if _connectivity['online'] is None or time.monotonic() - _connectivity['checked_at'] > max_age:
+        return None
+    return _connectivity['online']
+
+def check_internet_connection(max_age: float = CONNECTIVITY_CACHE_TTL) -> bool:
+    """Check if internet connection is available, reusing a recent result"""
+    # Concurrent callers wait for the probe in flight instead of starting their own
+    with _connectivity_lock:
+        online = cached_internet_connection(max_age)
+        if online is not None:
+            return online
+        
+        try:
+            request = urllib.request.Request(CONNECTIVITY_CHECK_URL, method='HEAD')
+            urllib.request.urlopen(request, timeout=CONNECTIVITY_CHECK_TIMEOUT).close()
+            online = True
+        except urllib.error.HTTPError:
+            # Any HTTP answer means the network is up
+            online = True
+        except Exception:
+            online = False
+        
+        _connectivity.update(online=online, checked_at=time.monotonic())
+        return online
+
+async def probe_internet_connection(max_age: float = CONNECTIVITY_CACHE_TTL) -> bool:
+    """check_internet_connection() without blocking the event loop"""
+    online = cached_internet_connection(max_age)
+    if online is not None:
+        return online
+    return await asyncio.get_running_loop().run_in_executor(None, check_internet_connection, max_age)
+
+def start_connectivity_probe() -> threading.Thread:
+    """Probe connectivity on a background thread so the result is ready when needed"""
+    thread = threading.Thread(target=check_internet_connection, name='connectivity-probe', daemon=True)
+    thread.start()
+    return thread
 
 def wait_with_spinner(seconds: int, message: str = "Please wait"):
     """Display a spinner while waiting"""
@@ -110,38 +164,42 @@ def confirm_action(message: str, default: bool = False) -> bool:
 
 def print_error(message: str):
     """Print error message in red"""
-    from colorama import Fore, Style
     print(f"{Fore.RED}❌ ERROR: {message}{Style.RESET_ALL}")
 
 def print_success(message: str):
     """Print success message in green"""
-    from colorama import Fore, Style
     print(f"{Fore.GREEN}✅ SUCCESS: {message}{Style.RESET_ALL}")
 
 def print_warning(message: str):
     """Print warning message in yellow"""
-    from colorama import Fore, Style
     print(f"{Fore.YELLOW}⚠️  WARNING: {message}{Style.RESET_ALL}")
 
 def print_info(message: str):
     """Print info message in blue"""
-    from colorama import Fore, Style
     print(f"{Fore.CYAN}ℹ️  INFO: {message}{Style.RESET_ALL}")
 
-def check_system_requirements() -> dict:
-    """Check system requirements"""
+def check_system_requirements(wait_for_network: bool = True) -> dict:
+    """
+    Check system requirements. With wait_for_network=False, 'internet' is
+    the cached probe result, or None while a background probe runs.
+    """
+    if wait_for_network:
+        internet = check_internet_connection()
+    else:
+        internet = cached_internet_connection()
+        if internet is None:
+            start_connectivity_probe()
+    
     requirements = {
         'os': is_windows(),
         'python': sys.version_info >= (3, 7),
-        'internet': check_internet_connection()
+        'internet': internet
     }
     
     return requirements
 
 def display_system_info():
     """Display system information"""
-    from colorama import Fore, Style
-    
     print(f"{Fore.CYAN}{Style.BRIGHT}SYSTEM INFORMATION:")
     print(f"{Fore.WHITE}OS: {os.name} ({sys.platform})")
     print(f"{Fore.WHITE}Python: {sys.version}")